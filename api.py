@@ -0,0 +1,268 @@
+"""Local JSON scoring API for other apps, separate from the Streamlit page.
+
+Serves batch.score_submissions(), the same analysis as the results page,
+over HTTP without re-running the page script:
+
+- GET  /health
+- POST /score          one profile (JSON object) -> its analysis
+- POST /score/batch    {"profiles": [...]} (at most MAX_BATCH) -> {"results": [...]}
+- POST /score/stream   NDJSON, one profile per line -> NDJSON, one result per line
+
+Profiles use the form variable names (batch.SUBMISSION_COLUMNS) or the
+widget keys, with "age" in place of "dob" if preferred. Any "id" is echoed
+back. Every number must be one the form's widget can produce (in range and
+on its step), and an age a whole number of years, as the page derives it. Invalid profiles get a 422 listing every problem; in a stream, an
+invalid line gets {"line": n, "errors": [...]} in its place and the rest
+carries on. Validation and scoring run in a worker thread, so a large
+batch never blocks the event loop, and streams are read, scored and written STREAM_CHUNK lines
+at a time.
+
+    python api.py --port 8600            # or: uvicorn api:app --port 8600
+
+benchmarks/api_throughput.py measures it.
+"""
+import argparse
+import json
+import math
+from datetime import date
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from batch import ANALYSIS_COLUMNS, score_submissions
+from fields import FIELDS, GENDERS, WIDGET_KEY_ALIASES, on_step
+from scoring import ACTIVITY_MAP
+
+MAX_BATCH = 10_000
+STREAM_CHUNK = 1_000
+
+MAX_AGE = 130
+
+
+# --- Validation ---
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_profile(profile):
+    """
+    Checks one profile against the form's domains.
+
+    Returns:
+    - tuple: (profile with widget keys renamed, list of {"field", "message"} errors).
+    """
+    if not isinstance(profile, dict):
+        return None, [{"field": None, "message": "profile must be a JSON object"}]
+    profile = {WIDGET_KEY_ALIASES.get(key, key): value for key, value in profile.items()}
+    errors = []
+
+    def error(field, message):
+        errors.append({"field": field, "message": message})
+
+    for name, field in FIELDS.items():
+        value = profile.get(name)
+        if value is None:
+            error(name, "required")
+        elif field.options is not None:
+            if value not in field.options:
+                error(name, f"must be one of {', '.join(field.options)}")
+        elif not _number(value):
+            error(name, "must be a number")
+        elif not field.low <= value <= field.high:
+            error(name, f"must be between {field.low} and {field.high}")
+        elif not on_step(name, value):
+            error(name, "must be a whole number" if field.step == 1 else f"must be in steps of {field.step}")
+    if profile.get("gender") not in GENDERS:
+        error("gender", f"must be one of {', '.join(GENDERS)}")
+    if profile.get("activity_str") not in ACTIVITY_MAP:
+        error("activity_str", f"must be one of {', '.join(ACTIVITY_MAP)}")
+    if "age" in profile:
+        if not _number(profile["age"]) or not 0 <= profile["age"] <= MAX_AGE:
+            error("age", f"must be a number between 0 and {MAX_AGE}")
+        elif profile["age"] != int(profile["age"]):
+            error("age", "must be a whole number")
+    else:
+        try:
+            dob = date.fromisoformat(profile["dob"])
+            profile["dob"] = dob.isoformat()
+            if dob > date.today():
+                error("dob", "must not be in the future")
+        except KeyError:
+            error("dob", "required unless age is given")
+        except (TypeError, ValueError):
+            error("dob", "must be an ISO date (YYYY-MM-DD)")
+    return profile, errors
+
+
+# --- Scoring ---
+def _plain(value):
+    """JSON-safe version of one result value (NaN becomes null)."""
+    if value is None or isinstance(value, str):
+        return value
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def score_profiles(profiles, today=None):
+    """Scores already-validated profiles in one batch; returns one result dict per profile."""
+    if not profiles:
+        return []
+    uses_age = ["age" in profile for profile in profiles]
+    columns = {name: [profile.get(name) for profile in profiles] for name in FIELDS}
+    columns["gender"] = [profile["gender"] for profile in profiles]
+    columns["activity_str"] = [profile["activity_str"] for profile in profiles]
+    if all(uses_age):
+        columns["age"] = [profile["age"] for profile in profiles]
+    elif not any(uses_age):
+        columns["dob"] = [profile["dob"] for profile in profiles]
+    else:
+        # Mixed batch: derive the missing ages the way score_submissions() would.
+        from batch import get_age
+        dobs = [profile.get("dob", "NaT") for profile in profiles]
+        derived = get_age(dobs, today)
+        columns["age"] = [profile["age"] if has_age else derived[i] for i, (profile, has_age) in enumerate(zip(profiles, uses_age))]
+    results = score_submissions(columns, today=today)
+    lists = {name: results[name].tolist() for name in ANALYSIS_COLUMNS}
+    scored = []
+    for i, profile in enumerate(profiles):
+        result = {name: _plain(lists[name][i]) for name in ANALYSIS_COLUMNS}
+        if "id" in profile:
+            result = {"id": profile["id"], **result}
+        scored.append(result)
+    return scored
+
+
+# --- Endpoints ---
+async def _json_body(request):
+    try:
+        return await request.json(), None
+    except ValueError:
+        return None, JSONResponse({"errors": [{"field": None, "message": "body must be valid JSON"}]}, status_code=400)
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def score_one(request):
+    body, failure = await _json_body(request)
+    if failure:
+        return failure
+    profile, errors = validate_profile(body)
+    if errors:
+        return JSONResponse({"errors": errors}, status_code=422)
+    return JSONResponse((await run_in_threadpool(score_profiles, [profile]))[0])
+
+
+async def score_many(request):
+    body, failure = await _json_body(request)
+    if failure:
+        return failure
+    profiles = body.get("profiles") if isinstance(body, dict) else None
+    if not isinstance(profiles, list):
+        return JSONResponse({"errors": [{"field": "profiles", "message": "must be a list of profiles"}]}, status_code=422)
+    if len(profiles) > MAX_BATCH:
+        return JSONResponse({"errors": [{"field": "profiles", "message": f"at most {MAX_BATCH} per batch; use /score/stream for more"}]},
+                            status_code=413)
+    results, errors = await run_in_threadpool(_validate_and_score, profiles)
+    if errors:
+        return JSONResponse({"errors": errors}, status_code=422)
+    return JSONResponse({"results": results})
+
+
+def _validate_and_score(profiles):
+    """(results, []) for a valid batch, or (None, errors with their "index") if any profile is invalid."""
+    cleaned, errors = [], []
+    for index, profile in enumerate(profiles):
+        profile, profile_errors = validate_profile(profile)
+        cleaned.append(profile)
+        errors.extend(dict(error, index=index) for error in profile_errors)
+    return (None, errors) if errors else (score_profiles(cleaned), [])
+
+
+def _score_lines(lines):
+    """NDJSON output for (line number, raw line) pairs: a result or {"line", "errors"} per line."""
+    parsed = []
+    for number, line in lines:
+        try:
+            profile, errors = validate_profile(json.loads(line))
+        except ValueError:
+            profile, errors = None, [{"field": None, "message": "line must be valid JSON"}]
+        parsed.append((number, profile, errors))
+    scored = iter(score_profiles([profile for _, profile, errors in parsed if not errors]))
+    return "".join(
+        json.dumps({"line": number, "errors": errors} if errors else next(scored), separators=(",", ":")) + "\n"
+        for number, _, errors in parsed
+    )
+
+
+async def _ndjson_lines(request):
+    """Yields (line number, text) for every non-blank line of the request body, as it arrives."""
+    pending, number = b"", 0
+    async for block in request.stream():
+        pending += block
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if pending.strip():
+        yield number + 1, pending
+
+
+class _ScoredStream(Response):
+    """
+    NDJSON response that scores the request body while it is still arriving.
+
+    StreamingResponse would listen for client disconnects on the same
+    receive channel and swallow the body, so this reads and writes itself.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, request):
+        super().__init__(media_type=self.media_type)
+        self.raw_headers = [(key, value) for key, value in self.raw_headers if key != b"content-length"]  # sent chunked
+        self.request = request
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        chunk = []  # (line number, raw line)
+        async for numbered_line in _ndjson_lines(self.request):
+            chunk.append(numbered_line)
+            if len(chunk) >= STREAM_CHUNK:
+                out = await run_in_threadpool(_score_lines, chunk)
+                await send({"type": "http.response.body", "body": out.encode("utf-8"), "more_body": True})
+                chunk = []
+        if chunk:
+            out = await run_in_threadpool(_score_lines, chunk)
+            await send({"type": "http.response.body", "body": out.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def score_stream(request):
+    return _ScoredStream(request)
+
+
+app = Starlette(routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/score", score_one, methods=["POST"]),
+    Route("/score/batch", score_many, methods=["POST"]),
+    Route("/score/stream", score_stream, methods=["POST"]),
+])
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the well-being scoring pipeline as a local JSON API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8600, help="Port (default: 8600).")
+    args = parser.parse_args(argv)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
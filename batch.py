@@ -0,0 +1,399 @@
+"""Vectorized NumPy versions of the well-being scoring functions.
+
+Every function here mirrors the scalar function of the same name in scoring.py,
+but takes whole columns (NumPy arrays, pandas Series or lists) and returns
+NumPy float arrays. Results match the scalar functions exactly, including
+Python's round-half-even rounding, the min/max clamps and the exercise
+intensity multipliers.
+
+Missing values (NaN, NaT, None) behave like ``None``/``0`` in the scalar
+functions; where a scalar function would return ``None`` the batch version
+returns NaN.
+"""
+from datetime import date
+
+import numpy as np
+
+from scoring import ACTIVITY_MAP, INTENSITY_MULTIPLIERS, PROTEIN_PER_KG
+
+# Columns score_batch() expects, named after the form variables in doc.py.
+INPUT_COLUMNS = (
+    "weight_kg", "height_cm", "waist_cm",
+    "f_exercise_freq", "intensity",
+    "sleep_h", "sleep_q", "bedtime_consistency_score", "water_liters",
+    "fruit_veg_servings", "whole_grains_freq", "processed_freq",
+    "l_stress", "md_mindful_days", "a_focus_hours", "learn_hrs", "purpose_score", "screen_hrs",
+    "c_social_connection", "i_meaningful_interactions", "sm_mood_stability",
+    "resilience_score", "gratitude_days", "nature_hrs",
+)
+
+# Arrays returned by score_batch(), in pipeline order.
+OUTPUT_COLUMNS = (
+    "exercise_score", "sqs", "wthr_score", "dqs", "hs",
+    "p_score", "m_score", "e_score", "wbs",
+)
+
+# Extra columns score_submissions() needs on top of INPUT_COLUMNS ("age" may replace "dob").
+SUBMISSION_COLUMNS = INPUT_COLUMNS + ("gender", "activity_str", "dob")
+
+# Arrays returned by score_submissions(), in the order the results page shows them.
+ANALYSIS_COLUMNS = (
+    "age", "bmi", "bmr", "tdee", "wthr_value",
+    "wthr_score", "dqs", "hs", "exercise_score", "sqs",
+    "protein_needs_grams", "zone2", "zone3", "zone4",
+    "circadian_alignment_score", "burnout_risk_score",
+    "p_score", "m_score", "e_score", "wbs", "level",
+)
+
+# Pillar -> (term, weight) for every term of its weighted sum, in sum order.
+PILLAR_TERMS = {
+    "p_score": (("exercise", 0.30), ("sleep", 0.25), ("waist", 0.20), ("diet", 0.20), ("hydration", 0.05)),
+    "m_score": (("stress", 0.25), ("focus", 0.20), ("mindfulness", 0.20), ("growth", 0.20), ("screen", 0.15)),
+    "e_score": (("social", 0.25), ("mood", 0.20), ("resilience", 0.25), ("gratitude", 0.15), ("nature", 0.15)),
+}
+
+# Arrays returned by pillar_contributions(): "<pillar letter>_<term>", e.g. "m_stress".
+CONTRIBUTION_COLUMNS = tuple(f"{pillar[0]}_{term}" for pillar, terms in PILLAR_TERMS.items() for term, _ in terms)
+
+_SPLITTER = 134217729.0  # 2**27 + 1, Dekker split constant for doubles
+
+
+# --- Helpers ---
+def _as_float(values):
+    return np.asarray(values, dtype=float)
+
+
+def _missing(values):
+    """Mask of entries the scalar functions treat as falsy (0 or None/NaN)."""
+    return (values == 0) | np.isnan(values)
+
+
+def _missing_text(values):
+    """Mask of text entries the scalar functions treat as falsy ("" or None/NaN)."""
+    values = np.asarray(values, dtype=object)
+    return np.array([not isinstance(value, str) or not value for value in values.ravel().tolist()], dtype=bool).reshape(values.shape)
+
+
+def _lookup(values, table):
+    """Maps each text value through ``table``; unknown values become NaN."""
+    values = np.asarray(values, dtype=object)
+    out = np.full(values.shape, np.nan)
+    for key, number in table.items():
+        out[values == key] = number
+    return out
+
+
+def _product_error(a, b, product):
+    """Exact rounding error of ``product = a * b`` (Dekker's two-product)."""
+    a_split = _SPLITTER * a
+    a_hi = a_split - (a_split - a)
+    a_lo = a - a_hi
+    b_split = _SPLITTER * b
+    b_hi = b_split - (b_split - b)
+    b_lo = b - b_hi
+    return ((a_hi * b_hi - product) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+
+
+def py_round(values, ndigits=0):
+    """Vectorized equivalent of Python's built-in ``round(value, ndigits)``.
+
+    Python rounds the exact binary value half-to-even, so ``round(2.675, 2)``
+    is 2.67. ``np.round`` rounds the already-scaled float instead and can
+    disagree on near-ties. The exact scaled value is recovered as
+    ``product + error`` and used to break those ties the way Python does.
+    """
+    values = _as_float(values)
+    scale = 10.0 ** ndigits
+    product = values * scale
+    error = _product_error(values, scale, product)
+    floor = np.floor(product)
+    frac = product - floor
+    tie = frac == 0.5
+    round_up = (frac > 0.5) | (tie & (error > 0)) | (tie & (error == 0) & (np.mod(floor, 2) == 1))
+    return (floor + round_up) / scale
+
+
+# --- Core Calculations ---
+def get_age(dob, today=None):
+    """Whole years between each date of birth and ``today`` (default: now)."""
+    today = today or date.today()
+    dob = np.asarray(dob, dtype="datetime64[D]")
+    missing = np.isnat(dob)
+    years = dob.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = dob.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    days = (dob - dob.astype("datetime64[M]")).astype(np.int64) + 1
+    before_birthday = (today.month < months) | ((today.month == months) & (today.day < days))
+    return np.where(missing, np.nan, today.year - years - before_birthday)
+
+
+def calculate_bmi(weight_kg, height_cm):
+    weight_kg, height_cm = np.broadcast_arrays(_as_float(weight_kg), _as_float(height_cm))
+    missing = _missing(weight_kg) | _missing(height_cm)
+    height_m = height_cm / 100.0
+    bmi = np.divide(weight_kg, height_m ** 2, out=np.zeros_like(weight_kg), where=~missing)
+    return np.where(missing, np.nan, py_round(bmi, 1))
+
+
+def calculate_bmr(weight_kg, height_cm, age, gender):
+    weight_kg, height_cm, age = _as_float(weight_kg), _as_float(height_cm), np.trunc(_as_float(age))
+    gender_lower = np.char.lower(np.asarray(gender, dtype=object).astype(str))
+    bmr_m = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
+    bmr_f = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
+    bmr = np.where(gender_lower == "male", bmr_m, np.where(gender_lower == "female", bmr_f, (bmr_m + bmr_f) / 2))
+    missing = _missing(weight_kg) | _missing(height_cm) | np.isnan(age) | _missing_text(gender)
+    return np.where(missing, np.nan, py_round(bmr))
+
+
+def calculate_tdee(bmr, activity_multiplier):
+    return py_round(_as_float(bmr) * _as_float(activity_multiplier))
+
+
+def calculate_protein_needs(weight_kg, activity_level):
+    weight_kg = _as_float(weight_kg)
+    activity_level = np.asarray(activity_level, dtype=object)
+    protein_per_kg = np.full(np.broadcast(weight_kg, activity_level).shape, 1.8)
+    for level, grams in PROTEIN_PER_KG.items():
+        protein_per_kg[np.broadcast_to(activity_level == level, protein_per_kg.shape)] = grams
+    return np.where(_missing(weight_kg), np.nan, py_round(weight_kg * protein_per_kg))
+
+
+def get_heart_rate_zones(age):
+    """Zone 2/3/4 BPM ranges as "low-high" strings, or None where age is missing or <= 0."""
+    # Ages repeat heavily, so build the strings once per distinct age.
+    unique_ages, inverse = np.unique(_as_float(age), return_inverse=True)
+    missing = np.isnan(unique_ages) | (unique_ages <= 0)
+    mhr = 220 - np.where(missing, 0.0, unique_ages)
+    bounds = [py_round(mhr * fraction).astype(np.int64).astype(str) for fraction in (0.60, 0.70, 0.80, 0.90)]
+    zones = []
+    for low, high in zip(bounds, bounds[1:]):
+        zone = np.char.add(np.char.add(low, "-"), high).astype(object)
+        zone[missing] = None
+        zones.append(zone[inverse.reshape(np.shape(age))])
+    return tuple(zones)
+
+
+def calculate_circadian_alignment_score(wake_hour, sleep_consistency_score):
+    """Batch form of the scalar version; takes the wake-up hour (NaN for none) instead of a time."""
+    wake_hour = _as_float(wake_hour)
+    score = np.where((wake_hour >= 5) & (wake_hour <= 7), 0.5, np.where((wake_hour >= 8) & (wake_hour <= 9), 0.2, 0.0))
+    score = score + (_as_float(sleep_consistency_score) / 10) * 0.5
+    return py_round(score * 100, 1)
+
+
+def calculate_burnout_risk(l_stress, sleep_h, a_focus_hours):
+    stress_factor = (_as_float(l_stress) / 10.0) * 0.4
+    sleep_factor = (1.0 - (np.minimum(_as_float(sleep_h), 8.0) / 8.0)) * 0.3
+    work_factor = (np.maximum(0.0, _as_float(a_focus_hours) - 8.0) / 4.0) * 0.3
+    raw_risk = (stress_factor + sleep_factor + work_factor)
+    return np.minimum(100.0, py_round(raw_risk * 100, 1))
+
+
+# --- Normalized Score Components (0-1 range) ---
+def calculate_exercise_score(frequency_per_week, intensity_level):
+    frequency = _as_float(frequency_per_week)
+    score = np.select(
+        [frequency == 0, frequency <= 2, frequency <= 4, frequency <= 6],
+        [0.0, 0.3, 0.6, 0.85],
+        default=1.0,
+    )
+    intensity_level = np.asarray(intensity_level, dtype=object)
+    multiplier = np.ones(np.broadcast(score, intensity_level).shape)
+    for level, factor in INTENSITY_MULTIPLIERS.items():
+        multiplier[np.broadcast_to(intensity_level == level, multiplier.shape)] = factor
+    return np.minimum(1.0, score * multiplier)
+
+
+def calculate_sqs(sleep_h, sleep_q, bedtime_consistency_score):
+    term1_sleep_duration = np.minimum(1.0, _as_float(sleep_h) / 8.0)
+    term2_sleep_quality = _as_float(sleep_q) / 10.0
+    term3_consistency = _as_float(bedtime_consistency_score) / 10.0
+    return py_round((term1_sleep_duration + term2_sleep_quality + term3_consistency) / 3.0, 3)
+
+
+def calculate_wthr_score(waist_cm, height_cm):
+    waist_cm, height_cm = np.broadcast_arrays(_as_float(waist_cm), _as_float(height_cm))
+    missing = _missing(waist_cm) | _missing(height_cm)
+    wthr_value = np.divide(waist_cm, height_cm, out=np.zeros_like(waist_cm), where=~missing)
+    score = np.where(wthr_value <= 0.4, 1.0, np.where(wthr_value >= 0.6, 0.0, py_round((0.6 - wthr_value) / 0.2, 3)))
+    return np.where(missing, 0.0, score)
+
+
+def calculate_dqs(fruit_veg, whole_grains, processed_foods):
+    term1_fruit_veg = np.minimum(1.0, _as_float(fruit_veg) / 8.0)
+    term2_whole_grains = _as_float(whole_grains) / 5.0
+    term3_processed = _as_float(processed_foods) / 5.0
+    return py_round(np.minimum(1.0, (term1_fruit_veg + term2_whole_grains + term3_processed) / 3.0), 3)
+
+
+def calculate_hs(water_liters, weight_kg):
+    water_liters, weight_kg = np.broadcast_arrays(_as_float(water_liters), _as_float(weight_kg))
+    target_water = weight_kg * 0.033
+    missing = _missing(water_liters) | _missing(weight_kg) | (target_water == 0)
+    ratio = np.divide(water_liters, target_water, out=np.zeros_like(water_liters), where=~missing)
+    return np.where(missing, 0.0, py_round(np.minimum(1.0, ratio), 3))
+
+
+# --- Main Pillar Scores (0-100%) ---
+# Each pillar is the PILLAR_TERMS weighted sum of 0-1 term scores; the _*_terms() functions compute those.
+def _p_terms(exercise_score, sqs, wthr_score, dqs, hs):
+    return {"exercise": _as_float(exercise_score), "sleep": _as_float(sqs), "waist": _as_float(wthr_score),
+            "diet": _as_float(dqs), "hydration": _as_float(hs)}
+
+
+def _m_terms(l_stress, a_focus, md_mindful, learn_hrs, purpose_score, screen_hrs):
+    return {
+        "stress": (10.0 - _as_float(l_stress) + 1.0) / 10.0,
+        "focus": np.minimum(1.0, _as_float(a_focus) / 6.0),
+        "mindfulness": _as_float(md_mindful) / 7.0,
+        "growth": (np.minimum(1.0, _as_float(learn_hrs) / 5.0) + (_as_float(purpose_score) / 10.0)) / 2.0,
+        "screen": np.maximum(0.0, (5.0 - _as_float(screen_hrs)) / 5.0),
+    }
+
+
+def _e_terms(c_social, i_interactions, sm_mood, resilience, gratitude, nature_hrs):
+    i_interactions_capped = np.minimum(_as_float(i_interactions), 14.0)
+    return {
+        "social": ((_as_float(c_social) / 10.0) + (i_interactions_capped / 14.0)) / 2.0,
+        "mood": _as_float(sm_mood) / 10.0,
+        "resilience": _as_float(resilience) / 10.0,
+        "gratitude": _as_float(gratitude) / 7.0,
+        "nature": np.minimum(1.0, _as_float(nature_hrs) / 3.0),
+    }
+
+
+def _pillar_score(pillar, terms):
+    # Summed left to right like the scalar expressions, so the rounding matches them exactly.
+    raw = 0.0
+    for term, weight in PILLAR_TERMS[pillar]:
+        raw = raw + weight * terms[term]
+    return np.minimum(100.0, py_round(raw * 100, 1))
+
+
+def calculate_p_score(exercise_score, sqs, wthr_score, dqs, hs):
+    return _pillar_score("p_score", _p_terms(exercise_score, sqs, wthr_score, dqs, hs))
+
+
+def calculate_m_score(l_stress, a_focus, md_mindful, learn_hrs, purpose_score, screen_hrs):
+    return _pillar_score("m_score", _m_terms(l_stress, a_focus, md_mindful, learn_hrs, purpose_score, screen_hrs))
+
+
+def calculate_e_score(c_social, i_interactions, sm_mood, resilience, gratitude, nature_hrs):
+    return _pillar_score("e_score", _e_terms(c_social, i_interactions, sm_mood, resilience, gratitude, nature_hrs))
+
+
+def calculate_wbs(p, m, e):
+    return py_round((0.4 * _as_float(p)) + (0.3 * _as_float(m)) + (0.3 * _as_float(e)), 1)
+
+
+def get_wbs_level(wbs_score):
+    """The level label get_wbs_interpretation() gives each score ("N/A" for NaN)."""
+    wbs_score = _as_float(wbs_score)
+    return np.select(
+        [np.isnan(wbs_score), wbs_score >= 85, wbs_score >= 70, wbs_score >= 55],
+        ["N/A", "Optimal", "Good", "Needs Improvement"],
+        default="At Risk",
+    ).astype(object)
+
+
+# --- Full Pipeline ---
+def score_batch(data):
+    """
+    Scores a whole batch of form submissions in one vectorized pass.
+
+    Parameters:
+    - data (DataFrame or mapping): One column per name in INPUT_COLUMNS.
+
+    Returns:
+    - dict: One NumPy array per name in OUTPUT_COLUMNS.
+    """
+    missing_columns = [name for name in INPUT_COLUMNS if name not in data]
+    if missing_columns:
+        raise KeyError(f"Missing input columns: {', '.join(missing_columns)}")
+    c = {name: np.asarray(data[name]) for name in INPUT_COLUMNS}
+
+    exercise_score = calculate_exercise_score(c["f_exercise_freq"], c["intensity"])
+    sqs = calculate_sqs(c["sleep_h"], c["sleep_q"], c["bedtime_consistency_score"])
+    wthr_score = calculate_wthr_score(c["waist_cm"], c["height_cm"])
+    dqs = calculate_dqs(c["fruit_veg_servings"], c["whole_grains_freq"], c["processed_freq"])
+    hs = calculate_hs(c["water_liters"], c["weight_kg"])
+
+    p_score = calculate_p_score(exercise_score, sqs, wthr_score, dqs, hs)
+    m_score = calculate_m_score(c["l_stress"], c["a_focus_hours"], c["md_mindful_days"], c["learn_hrs"], c["purpose_score"], c["screen_hrs"])
+    e_score = calculate_e_score(c["c_social_connection"], c["i_meaningful_interactions"], c["sm_mood_stability"], c["resilience_score"], c["gratitude_days"], c["nature_hrs"])
+    wbs = calculate_wbs(p_score, m_score, e_score)
+
+    return {
+        "exercise_score": exercise_score, "sqs": sqs, "wthr_score": wthr_score, "dqs": dqs, "hs": hs,
+        "p_score": p_score, "m_score": m_score, "e_score": e_score, "wbs": wbs,
+    }
+
+
+def score_submissions(data, today=None, wake_hour=7):
+    """
+    Runs the full results-page analysis for a batch of form submissions.
+
+    Parameters:
+    - data (DataFrame or mapping): One column per name in SUBMISSION_COLUMNS.
+      An "age" column, if present, is used instead of deriving it from "dob".
+    - today (date): Reference date for ages (default: today).
+    - wake_hour (float or array): Wake-up hour for the circadian score; the
+      results page uses a 7 AM placeholder.
+
+    Returns:
+    - dict: One NumPy array per name in ANALYSIS_COLUMNS.
+    """
+    required = [name for name in SUBMISSION_COLUMNS if name != "dob" or "age" not in data]
+    missing_columns = [name for name in required if name not in data]
+    if missing_columns:
+        raise KeyError(f"Missing input columns: {', '.join(missing_columns)}")
+
+    age = _as_float(data["age"]) if "age" in data else get_age(data["dob"], today)
+    weight_kg, height_cm, waist_cm = (_as_float(data[name]) for name in ("weight_kg", "height_cm", "waist_cm"))
+    scores = score_batch(data)
+
+    bmr = calculate_bmr(weight_kg, height_cm, age, data["gender"])
+    zone2, zone3, zone4 = get_heart_rate_zones(age)
+    results = {
+        "age": age,
+        "bmi": calculate_bmi(weight_kg, height_cm),
+        "bmr": bmr,
+        "tdee": calculate_tdee(bmr, _lookup(data["activity_str"], ACTIVITY_MAP)),
+        "wthr_value": np.divide(waist_cm, height_cm, out=np.zeros_like(waist_cm), where=height_cm > 0),
+        "protein_needs_grams": calculate_protein_needs(weight_kg, data["activity_str"]),
+        "zone2": zone2, "zone3": zone3, "zone4": zone4,
+        "circadian_alignment_score": calculate_circadian_alignment_score(
+            np.broadcast_to(_as_float(wake_hour), age.shape), data["bedtime_consistency_score"]),
+        "burnout_risk_score": calculate_burnout_risk(data["l_stress"], data["sleep_h"], data["a_focus_hours"]),
+        "level": get_wbs_level(scores["wbs"]),
+        **scores,
+    }
+    return {name: results[name] for name in ANALYSIS_COLUMNS}
+
+
+def pillar_contributions(data, scores=None):
+    """
+    Splits the P, M and E scores into what each of their terms adds, in one vectorized pass.
+
+    A pillar is the PILLAR_TERMS weighted sum of 0-1 term scores, so a term
+    adds weight * term score * 100 points and a pillar's contributions sum
+    to its score before the final rounding to 0.1. A term's full weight * 100
+    less its contribution is what it costs the pillar.
+
+    Parameters:
+    - data (DataFrame or mapping): One column per name in INPUT_COLUMNS, or single values for one profile.
+    - scores (mapping): score_batch() or score_submissions() results for ``data``,
+      whose physical sub-scores are reused; computed if omitted.
+
+    Returns:
+    - dict: One NumPy array per name in CONTRIBUTION_COLUMNS, in score points.
+    """
+    scores = score_batch(data) if scores is None else scores
+    terms = {
+        "p_score": _p_terms(scores["exercise_score"], scores["sqs"], scores["wthr_score"], scores["dqs"], scores["hs"]),
+        "m_score": _m_terms(data["l_stress"], data["a_focus_hours"], data["md_mindful_days"], data["learn_hrs"], data["purpose_score"], data["screen_hrs"]),
+        "e_score": _e_terms(data["c_social_connection"], data["i_meaningful_interactions"], data["sm_mood_stability"], data["resilience_score"], data["gratitude_days"], data["nature_hrs"]),
+    }
+    return {
+        f"{pillar[0]}_{term}": weight * terms[pillar][term] * 100
+        for pillar, pillar_terms in PILLAR_TERMS.items() for term, weight in pillar_terms
+    }
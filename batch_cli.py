@@ -0,0 +1,191 @@
+"""Streams a survey export through the well-being scoring pipeline.
+
+Reads CSV or Parquet input in fixed-size chunks, scores each chunk with
+batch.score_submissions() (the same analysis as the results page) and
+appends the results, followed by every pillar term's contribution in score
+points (batch.CONTRIBUTION_COLUMNS, from batch.pillar_contributions()), to
+a CSV or Parquet output, so memory use is bounded by the chunk size rather
+than the file size.
+
+    python batch_cli.py survey.csv scores.parquet --chunk-size 50000 --map "Weight (kg)=weight_kg"
+
+With --workers N each chunk is split across N processes (see parallel.py).
+Unless --chunk-size is given, chunks then grow to parallel_chunk_size(N)
+rows so every worker gets at least two tasks of MIN_ROWS_PER_TASK rows;
+benchmarks/parallel_scaling.py measures the speed-up per worker count.
+
+Input columns are matched to the form fields by the variable names in
+doc.py (see batch.SUBMISSION_COLUMNS), by the widget keys ("weight",
+"height", "waist", "dob", "gender_radio"), or by explicit --map options.
+Parquet needs pyarrow (pip install pyarrow).
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from batch import ANALYSIS_COLUMNS, CONTRIBUTION_COLUMNS, SUBMISSION_COLUMNS, pillar_contributions, score_submissions
+from fields import WIDGET_KEY_ALIASES
+from parallel import MIN_ROWS_PER_TASK, ParallelScorer
+
+# Input columns copied through to the output so results can be joined back.
+DEFAULT_ID_COLUMNS = ("id",)
+
+FORMATS = ("csv", "parquet")
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def parallel_chunk_size(workers):
+    """Default rows per chunk for ``workers`` processes (None: one per CPU): two full tasks per worker."""
+    workers = workers or os.cpu_count() or 1
+    return DEFAULT_CHUNK_SIZE if workers == 1 else max(DEFAULT_CHUNK_SIZE, workers * 2 * MIN_ROWS_PER_TASK)
+
+
+def _format_for(path, explicit=None):
+    fmt = explicit or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise SystemExit(f"Cannot tell the format of {path!r}; pass --input-format/--output-format ({', '.join(FORMATS)}).")
+    return fmt
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet support needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def parse_column_map(pairs):
+    """Turns ["source=field", ...] into a rename mapping, on top of the widget-key aliases."""
+    mapping = dict(WIDGET_KEY_ALIASES)
+    for pair in pairs or ():
+        source, sep, field = pair.partition("=")
+        if not sep or field not in SUBMISSION_COLUMNS + ("age",):
+            raise SystemExit(f"Invalid --map {pair!r}; expected SOURCE=FIELD with FIELD one of: {', '.join(SUBMISSION_COLUMNS)}, age")
+        mapping[source] = field
+    return mapping
+
+
+def read_chunks(path, fmt, chunk_size):
+    """Yields DataFrames of at most ``chunk_size`` rows."""
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        pyarrow = _require_pyarrow()
+        for record_batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, frame):
+        if self.fmt == "csv":
+            frame.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+        pyarrow = _require_pyarrow()
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_chunk(chunk, column_map, id_columns=DEFAULT_ID_COLUMNS, today=None, scorer=None):
+    """Scores one input DataFrame (on ``scorer``'s pool if given) and returns the output DataFrame."""
+    chunk = chunk.rename(columns=column_map)
+    if "age" not in chunk and "dob" in chunk:
+        chunk["dob"] = pd.to_datetime(chunk["dob"], errors="coerce").to_numpy(dtype="datetime64[D]")
+    results = scorer.score(chunk, today=today) if scorer else score_submissions(chunk, today=today)
+    contributions = pillar_contributions(chunk, results)
+    output = pd.DataFrame({**{name: results[name] for name in ANALYSIS_COLUMNS},
+                           **{name: contributions[name] for name in CONTRIBUTION_COLUMNS}}, index=chunk.index)
+    passthrough = [name for name in id_columns if name in chunk]
+    return pd.concat([chunk[passthrough], output], axis=1) if passthrough else output
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(input_path, output_path, chunk_size=None, column_map=None, input_format=None, output_format=None,
+        id_columns=DEFAULT_ID_COLUMNS, progress=None, workers=1):
+    """Scores ``input_path`` into ``output_path`` chunk by chunk (default size: parallel_chunk_size(workers)); returns (rows, seconds)."""
+    chunk_size = chunk_size or parallel_chunk_size(workers)
+    input_format = _format_for(input_path, input_format)
+    output_format = _format_for(output_path, output_format)
+    column_map = column_map if column_map is not None else dict(WIDGET_KEY_ALIASES)
+
+    writer = ChunkWriter(output_path, output_format)
+    scorer = ParallelScorer(workers) if workers != 1 else None
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in read_chunks(input_path, input_format, chunk_size):
+            writer.write(score_chunk(chunk, column_map, id_columns, scorer=scorer))
+            rows += len(chunk)
+            if progress:
+                progress(rows, time.perf_counter() - start)
+    finally:
+        writer.close()
+        if scorer:
+            scorer.close()
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a survey export (CSV or Parquet) in fixed-size chunks.")
+    parser.add_argument("input", help="Input .csv or .parquet file.")
+    parser.add_argument("output", help="Output .csv or .parquet file (overwritten).")
+    parser.add_argument("--chunk-size", type=int, help=f"Rows per chunk (default: {DEFAULT_CHUNK_SIZE}, or two tasks per worker with --workers).")
+    parser.add_argument("--map", action="append", metavar="SOURCE=FIELD", help="Map an input column to a form field; repeatable.")
+    parser.add_argument("--id-column", action="append", help="Input column copied to the output (default: id).")
+    parser.add_argument("--input-format", choices=FORMATS, help="Override the format guessed from the input extension.")
+    parser.add_argument("--output-format", choices=FORMATS, help="Override the format guessed from the output extension.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes per chunk; 0 means one per CPU (default: 1).")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary.")
+    args = parser.parse_args(argv)
+    if args.chunk_size is not None and args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.workers < 0:
+        parser.error("--workers must be 0 or positive")
+
+    def report(rows, seconds):
+        print(f"  {rows:,} rows  {rows / seconds if seconds else 0:,.0f} rows/s", file=sys.stderr)
+
+    rows, seconds = run(
+        args.input, args.output, args.chunk_size, parse_column_map(args.map),
+        args.input_format, args.output_format, tuple(args.id_column or DEFAULT_ID_COLUMNS),
+        progress=None if args.quiet else report, workers=args.workers or None,
+    )
+    peak = peak_rss_mb()
+    print(
+        f"Scored {rows:,} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/s)"
+        + (f", peak RSS {peak:.0f} MB" if peak is not None else ""),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
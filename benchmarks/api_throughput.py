@@ -0,0 +1,228 @@
+"""Throughput benchmark of the local scoring API (api.py) with a local client.
+
+Starts ``python api.py`` on a free port (or targets --url) and drives it
+over keep-alive HTTP/1.1 connections from asyncio, with random valid
+profiles drawn from the form's domains:
+
+- single: --concurrency clients each POSTing one profile at a time to /score;
+- batch: the same clients POSTing --batch-size profiles to /score/batch;
+- stream: one POST of --stream-rows NDJSON profiles to /score/stream,
+  timed to the first and the last result line.
+
+Reported per scenario: requests/s, profiles/s and p50/p95/p99 request
+latency (time to first result line for the stream).
+
+    python benchmarks/api_throughput.py --concurrency 16 --seconds 10 --json api.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from fields import FIELDS, GENDERS, domain  # noqa: E402
+from scoring import ACTIVITY_MAP  # noqa: E402
+
+from load_test import percentile  # noqa: E402
+
+
+def random_profiles(n, seed=0):
+    """``n`` valid profiles with every input drawn uniformly from its widget's domain."""
+    rng = random.Random(seed)
+    domains = {name: domain(name) for name in FIELDS}
+    activities = list(ACTIVITY_MAP)
+    return [
+        dict({name: rng.choice(values) for name, values in domains.items()},
+             id=i, gender=rng.choice(GENDERS), activity_str=rng.choice(activities), age=rng.randint(18, 90))
+        for i in range(n)
+    ]
+
+
+# --- Minimal keep-alive HTTP/1.1 client ---
+class Connection:
+    """One keep-alive connection; post() sends a request and reads the whole response."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=2 ** 24)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.writer.close()
+
+    async def post(self, path, body, on_first_byte=None):
+        """Returns (status, body bytes); ``on_first_byte`` is called when the first body chunk arrives."""
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+        )
+        # Drain while reading: a streamed response can start before the body is fully sent.
+        sending = asyncio.ensure_future(self.writer.drain())
+        try:
+            return await self._read_response(on_first_byte)
+        finally:
+            await sending
+
+    async def _read_response(self, on_first_byte):
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            data = await self.reader.readexactly(int(headers["content-length"]))
+            if on_first_byte:
+                on_first_byte()
+            return status, data
+        chunks = []
+        while True:  # chunked transfer encoding
+            size = int((await self.reader.readline()).strip(), 16)
+            if size == 0:
+                await self.reader.readline()
+                return status, b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+            if on_first_byte and len(chunks) == 1:
+                on_first_byte()
+
+
+# --- Scenarios ---
+async def _closed_loop(host, port, path, bodies, profiles_per_request, concurrency, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+
+    async def client(index):
+        async with Connection(host, port) as connection:
+            i = index
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _ = await connection.post(path, bodies[i % len(bodies)])
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(f"{path}: HTTP {status}")
+                i += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+    return _report(latencies, wall, profiles_per_request, errors)
+
+
+async def _stream(host, port, rows, seed):
+    body = "\n".join(json.dumps(profile) for profile in random_profiles(rows, seed)).encode("utf-8")
+    first = []
+    async with Connection(host, port) as connection:
+        start = time.perf_counter()
+        status, data = await connection.post("/score/stream", body, on_first_byte=lambda: first.append(time.perf_counter()))
+        wall = time.perf_counter() - start
+    lines = data.count(b"\n")
+    errors = [] if status == 200 and lines == rows else [f"/score/stream: HTTP {status}, {lines} of {rows} lines"]
+    report = _report([first[0] - start] if first else [], wall, rows, errors)
+    report["requests_per_second"] = None
+    return report
+
+
+def _report(latencies, wall, profiles_per_request, errors):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "wall_seconds": wall,
+        "requests_per_second": len(ordered) / wall if wall else 0.0,
+        "profiles_per_second": len(ordered) * profiles_per_request / wall if wall else 0.0,
+        "latency_ms": {f"p{round(q * 100)}": percentile(ordered, q) * 1000 if ordered else None for q in (0.5, 0.95, 0.99)},
+        "errors": errors[:10],
+    }
+
+
+async def run_benchmark(url, concurrency, seconds, batch_size, stream_rows, seed=0):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port
+    singles = [json.dumps(profile).encode("utf-8") for profile in random_profiles(1000, seed)]
+    batches = [json.dumps({"profiles": random_profiles(batch_size, seed + i)}).encode("utf-8") for i in range(8)]
+    async with Connection(host, port) as warmup:
+        await warmup.post("/score", singles[0])
+        await warmup.post("/score/batch", batches[0])
+    return {
+        "single": await _closed_loop(host, port, "/score", singles, 1, concurrency, seconds),
+        "batch": await _closed_loop(host, port, "/score/batch", batches, batch_size, concurrency, seconds),
+        "stream": await _stream(host, port, stream_rows, seed),
+    }
+
+
+# --- Server ---
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, timeout=60):
+    """Launches ``python api.py`` on ``port`` and waits until /health answers."""
+    server = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "api.py"), "--port", str(port)], cwd=REPO_ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"api.py did not become healthy on port {port} within {timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections (default: 8).")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of the single and batch runs (default: 5).")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Profiles per /score/batch request (default: 1000).")
+    parser.add_argument("--stream-rows", type=int, default=100_000, help="Profiles in the /score/stream run (default: 100000).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random profiles.")
+    parser.add_argument("--url", help="Base URL of a running API (http://host:port); default: start one.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = start_server(port)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        report = asyncio.run(run_benchmark(url, args.concurrency, args.seconds, args.batch_size, args.stream_rows, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    for name, result in report.items():
+        latency = result["latency_ms"]
+        rate = f"{result['requests_per_second']:8.1f} req/s" if result["requests_per_second"] is not None else " " * 14
+        label = "first line" if name == "stream" else "latency"
+        print(f"{name:<7}{rate}  {result['profiles_per_second']:10,.0f} profiles/s  "
+              f"{label} p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  p99 {latency['p99']:.1f} ms")
+    errors = [error for result in report.values() for error in result["errors"]]
+    for error in errors:
+        print(error, file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
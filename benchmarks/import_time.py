@@ -0,0 +1,74 @@
+"""Measures cold-import time of the scoring modules versus the full page stack.
+
+Each import runs in a fresh interpreter so nothing is cached in sys.modules.
+The last target is the whole cold start of the page: importing Streamlit
+and running doc.py once up to the empty form. --check-deferred also fails
+if that first view loads any of DEFERRED_MODULES.
+
+    python benchmarks/import_time.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Label -> import statement timed in a fresh interpreter.
+TARGETS = {
+    "scoring (headless core)": "import scoring",
+    "batch (core + numpy)": "import batch",
+    "page stack (streamlit, plotly, pandas, numpy)": "import streamlit, plotly.graph_objects, pandas, numpy",
+    "doc.py imports (streamlit + app modules)": "import streamlit, scoring, charts, history, timing, stylesheet, result_cache",
+    "doc.py first page view (AppTest, cold)": "from streamlit.testing.v1 import AppTest; AppTest.from_file('doc.py', default_timeout=120).run()",
+}
+
+# Modules a cold first page view should not load; charts and history pull them in on first use.
+DEFERRED_MODULES = ("numpy", "pandas")
+
+_TIMER = "import time; _t = time.perf_counter(); {statement}; print(time.perf_counter() - _t)"
+
+
+def cold_import_seconds(statement, repeat=5):
+    """Median wall time of ``statement`` over ``repeat`` fresh interpreters."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(statement=statement)],
+            cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def loaded_after_first_view(modules=DEFERRED_MODULES):
+    """Which of ``modules`` a fresh interpreter has imported after doc.py's first run."""
+    script = (
+        "import sys; from streamlit.testing.v1 import AppTest; "
+        "AppTest.from_file('doc.py', default_timeout=120).run(); "
+        f"print(','.join(m for m in {tuple(modules)!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    last_line = output.strip().splitlines()[-1] if output.strip() else ""
+    return [name for name in last_line.split(",") if name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target (default: 5).")
+    parser.add_argument("--check-deferred", action="store_true", help="Exit 1 if the first page view loads a deferred module.")
+    args = parser.parse_args(argv)
+
+    for label, statement in TARGETS.items():
+        print(f"{label:<48} {cold_import_seconds(statement, args.repeat) * 1000:8.1f} ms")
+
+    loaded = loaded_after_first_view()
+    print(f"{'deferred modules loaded by the first view':<48} {', '.join(loaded) or 'none'}")
+    return 1 if args.check_deferred and loaded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""Concurrent-session load test of the page: rerun latency, throughput, memory.
+
+Starts ``streamlit run doc.py`` (or targets --url) and opens N websocket
+sessions against it, speaking the same protobuf protocol as the browser.
+Each session loads the page, then repeatedly sets every form input to a
+random value within its widget's range and submits, reporting the cached
+message hashes like a browser would. Latency is the time from sending the
+rerun request until the server reports the script run finished.
+
+Reported:
+- p50/p95/p99 submit latency, throughput and websocket bytes per submit;
+- server resident memory per session (RSS growth over an idle, warmed-up
+  server, divided by N);
+- server RSS growth over the second half of the run, per session and
+  round, which stays near zero unless sessions retain figures or results.
+
+    python benchmarks/load_test.py --sessions 32 --rounds 20 --json load.json
+
+Memory is read from /proc/<pid>/status, so it needs Linux and a server
+started by this tool (or --server-pid).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+DOC_PATH = os.path.join(REPO_ROOT, "doc.py")
+
+# Form widgets that keep their defaults: they only change how the trend is shown.
+_FIXED_KEYS = {"trend_window", "trend_downsampling", "history_name"}
+
+
+def rss_mb(pid):
+    """Resident set size of process ``pid`` in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    return ordered[max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))]
+
+
+def _widget_key(widget_id):
+    """User key of a keyed widget ID ("$$ID-<hash>-<key>"), or None."""
+    return widget_id.split("-", 2)[2] if widget_id.startswith("$$ID-") and widget_id.count("-") >= 2 else None
+
+
+# --- One browser-like session ---
+class Session:
+    """
+    A websocket client that renders nothing but tracks widgets and cached messages.
+
+    Parameters:
+    - url (str): Websocket stream URL (ws://host:port/_stcore/stream).
+    - history_key (str): The session's private history key, sent as ?history= like a bookmarked link.
+    - rng (random.Random): Source of the form values.
+    """
+
+    def __init__(self, url, history_key, rng):
+        self.url = url
+        self.history_key = history_key
+        self.rng = rng
+        self.widgets = {}  # id -> (element type, proto)
+        self.cached_hashes = set()
+        self.errors = []
+        self._ws = None
+
+    async def __aenter__(self):
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._ws.close()
+
+    async def rerun(self, widget_states=()):
+        """Requests a script run; returns (seconds until it finished, bytes received)."""
+        back_msg = BackMsg()
+        client_state = back_msg.rerun_script
+        client_state.query_string = f"history={self.history_key}"
+        client_state.widget_states.widgets.extend(widget_states)
+        client_state.cached_message_hashes.extend(self.cached_hashes)
+        start = time.perf_counter()
+        await self._ws.send(back_msg.SerializeToString())
+        received = 0
+        while True:
+            payload = await self._ws.recv()
+            received += len(payload)
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            kind = msg.WhichOneof("type")
+            if kind == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.errors.append(f"script finished with status {msg.script_finished}")
+                return time.perf_counter() - start, received
+            if msg.metadata.cacheable:
+                self.cached_hashes.add(msg.hash)
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    self.errors.append(element.exception.message)
+                elif element_type in ("slider", "number_input", "radio", "selectbox", "button", "text_input"):
+                    proto = getattr(element, element_type)
+                    self.widgets[proto.id] = (element_type, proto)
+
+    def random_submit_states(self):
+        """Widget states for a submit with every form input randomized."""
+        states = []
+        for widget_id, (element_type, proto) in self.widgets.items():
+            key = _widget_key(widget_id)
+            state = BackMsg().rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if key in _FIXED_KEYS:
+                continue
+            elif element_type in ("slider", "number_input"):
+                steps = round((proto.max - proto.min) / proto.step)
+                value = round(proto.min + self.rng.randint(0, steps) * proto.step, 6)
+                if element_type == "slider":
+                    state.double_array_value.data.append(value)
+                else:
+                    state.double_value = value
+            elif element_type in ("radio", "selectbox"):
+                state.string_value = self.rng.choice(list(proto.options))
+            elif element_type == "button" and proto.is_form_submitter:
+                state.trigger_value = True
+            else:
+                continue
+            states.append(state)
+        return states
+
+
+async def run_session(url, index, rounds, seed, results, progress):
+    async with Session(url, secrets.token_urlsafe(16), random.Random(seed + index)) as session:
+        results["initial"].append((await session.rerun())[0])
+        for round_index in range(rounds):
+            seconds, received = await session.rerun(session.random_submit_states())
+            results["submit"].append(seconds)
+            results["bytes"].append(received)
+            progress[index] = round_index + 1
+        results["errors"].extend(f"session {index}: {error}" for error in session.errors)
+
+
+# --- Server ---
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, data_dir, timeout=60):
+    """Launches ``streamlit run doc.py`` headless on ``port``, storing its data in ``data_dir``, and waits until it is healthy."""
+    env = dict(os.environ, WELLBEING_HISTORY_DB=os.path.join(data_dir, "history.db"),
+               WELLBEING_SKETCH_DIR=os.path.join(data_dir, "sketches"),
+               WELLBEING_SUBMISSION_LOG=os.path.join(data_dir, "submissions.log"),
+               WELLBEING_COHORT_STATS=os.path.join(data_dir, "cohorts.npz"),
+               WELLBEING_NEIGHBOR_INDEX=os.path.join(data_dir, "neighbors.npz"),
+               WELLBEING_PERSONAS=os.path.join(data_dir, "personas.npz"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", DOC_PATH, "--server.headless=true",
+         f"--server.port={port}", "--server.address=127.0.0.1", "--server.enableXsrfProtection=false",
+         "--browser.gatherUsageStats=false"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"streamlit did not become healthy on port {port} within {timeout}s")
+
+
+# --- Load run ---
+async def run_load(url, sessions, rounds, seed=0, server_pid=None, sample_interval=0.25):
+    """Warms the server up with one session, then runs ``sessions`` concurrently; returns the report dict."""
+    warmup = {"initial": [], "submit": [], "bytes": [], "errors": []}
+    await run_session(url, -1, 1, seed, warmup, {-1: 0})
+    rss_start = rss_mb(server_pid) if server_pid else None
+
+    results = {"initial": [], "submit": [], "bytes": [], "errors": list(warmup["errors"])}
+    progress = [0] * sessions
+    rss_samples = []  # (average completed rounds, server RSS)
+
+    async def sample_rss():
+        while True:
+            rss_samples.append((sum(progress) / sessions, rss_mb(server_pid)))
+            await asyncio.sleep(sample_interval)
+
+    sampler = asyncio.create_task(sample_rss()) if rss_start is not None else None
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(run_session(url, i, rounds, seed, results, progress) for i in range(sessions)), return_exceptions=True
+    )
+    wall = time.perf_counter() - start
+    if sampler:
+        sampler.cancel()
+    results["errors"].extend(f"session {i}: {outcome!r}" for i, outcome in enumerate(outcomes) if isinstance(outcome, Exception))
+    rss_end = rss_mb(server_pid) if server_pid else None
+
+    ordered = sorted(results["submit"])
+    late = [(r, rss) for r, rss in rss_samples if r >= rounds / 2 and rss is not None]
+    growth = None
+    if len(late) >= 2 and late[-1][0] > late[0][0]:
+        growth = (late[-1][1] - late[0][1]) / (late[-1][0] - late[0][0]) / sessions
+    return {
+        "sessions": sessions,
+        "rounds": rounds,
+        "submits": len(ordered),
+        "errors": results["errors"],
+        "wall_seconds": wall,
+        "throughput_per_second": len(ordered) / wall if wall else 0.0,
+        "initial_load_ms_median": statistics.median(results["initial"]) * 1000 if results["initial"] else None,
+        "latency_ms": {
+            "mean": statistics.fmean(ordered) * 1000 if ordered else None,
+            "p50": percentile(ordered, 0.50) * 1000 if ordered else None,
+            "p95": percentile(ordered, 0.95) * 1000 if ordered else None,
+            "p99": percentile(ordered, 0.99) * 1000 if ordered else None,
+            "max": ordered[-1] * 1000 if ordered else None,
+        },
+        "bytes_per_submit_median": statistics.median(results["bytes"]) if results["bytes"] else None,
+        "server_rss_mb": {
+            "start": rss_start,
+            "end": rss_end,
+            "per_session": (rss_end - rss_start) / sessions if rss_start is not None and rss_end is not None else None,
+            "late_growth_per_session_per_round": growth,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions (default: 8).")
+    parser.add_argument("--rounds", type=int, default=20, help="Randomized submits per session (default: 20).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the form values.")
+    parser.add_argument("--url", help="Websocket URL of a running server (ws://host:port/_stcore/stream); default: start one.")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, for memory figures.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        url, server_pid = args.url, args.server_pid
+        if url is None:
+            port = _free_port()
+            server = start_server(port, tmp)
+            url, server_pid = f"ws://127.0.0.1:{port}/_stcore/stream", server.pid
+        try:
+            report = asyncio.run(run_load(url, args.sessions, args.rounds, args.seed, server_pid))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    latency, rss = report["latency_ms"], report["server_rss_mb"]
+    print(f"{report['sessions']} sessions x {report['rounds']} submits: {report['submits']} submits in "
+          f"{report['wall_seconds']:.1f}s ({report['throughput_per_second']:.1f}/s), "
+          f"initial load {report['initial_load_ms_median']:.0f} ms")
+    if report["submits"]:
+        print(f"latency  p50 {latency['p50']:.0f} ms  p95 {latency['p95']:.0f} ms  p99 {latency['p99']:.0f} ms  "
+              f"max {latency['max']:.0f} ms  ({report['bytes_per_submit_median'] / 1024:.0f} kB received per submit)")
+    if rss["per_session"] is not None:
+        growth = rss["late_growth_per_session_per_round"]
+        print(f"server   RSS {rss['start']:.0f} -> {rss['end']:.0f} MB, {rss['per_session']:.2f} MB per session"
+              + (f", {growth * 1024:.1f} kB per session per round in the second half" if growth is not None else ""))
+    for error in report["errors"]:
+        print(error, file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Full-history scan speed of the memory-mapped submission log (submission_log.py).
+
+Builds a log of --rows submissions in a temporary directory (--distinct
+random profiles scored once and appended over and over, spread evenly over
+--days), then times aggregations over zero-copy views of the mapped file:
+
+- mean and spread of the WBS over every row;
+- mean pillar scores by sex;
+- WBS level counts per age band;
+- a time-range seek to the last 30 days, and the mean WBS inside it.
+
+The log is written just before it is scanned, so it is read from a warm
+page cache; a cold read adds disk time at the disk's sequential speed.
+
+    python benchmarks/log_scan.py --rows 20000000 --json log_scan.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from batch import SUBMISSION_COLUMNS, score_submissions  # noqa: E402
+from fields import GENDERS  # noqa: E402
+from records import from_columns  # noqa: E402
+from submission_log import LOG_DTYPE, SubmissionLog  # noqa: E402
+
+from api_throughput import random_profiles  # noqa: E402
+
+# WBS level lower bounds (get_wbs_level()) and age band lower bounds for the grouped counts.
+LEVEL_BOUNDS = (55, 70, 85)
+AGE_BOUNDS = (18, 30, 40, 50, 60, 70)
+
+APPEND_CHUNK = 1_000_000
+
+
+def build_log(path, rows, distinct, days, seed=0):
+    """Fills a new log at ``path``; returns the seconds spent appending."""
+    profiles = random_profiles(distinct, seed)
+    columns = {name: [profile[name] for profile in profiles] for name in SUBMISSION_COLUMNS if name != "dob"}
+    columns["age"] = [profile["age"] for profile in profiles]
+    packed = from_columns(columns, score_submissions(columns))
+    times = time.time() - days * 86400 + np.arange(rows) * (days * 86400 / rows)
+    log = SubmissionLog(path)
+    start = time.perf_counter()
+    for offset in range(0, rows, APPEND_CHUNK):
+        n = min(APPEND_CHUNK, rows - offset)
+        log.append(np.resize(packed, n), times[offset:offset + n])
+    elapsed = time.perf_counter() - start
+    log.close()
+    return elapsed
+
+
+def _timed(function):
+    start = time.perf_counter()
+    value = function()
+    return time.perf_counter() - start, value
+
+
+def run_scans(path):
+    log = SubmissionLog(path)
+    open_seconds, rows = _timed(log.rows)
+    scans = {}
+
+    def wbs_stats():
+        wbs = rows["wbs"]
+        return {"mean": float(wbs.mean()), "std": float(wbs.std())}
+
+    def pillars_by_sex():
+        codes = rows["gender"]
+        counts = np.bincount(codes, minlength=len(GENDERS))
+        return {
+            name: {sex: float(total / count) for sex, total, count in
+                   zip(GENDERS, np.bincount(codes, weights=rows[name], minlength=len(GENDERS)), counts) if count}
+            for name in ("p_score", "m_score", "e_score")
+        }
+
+    def levels_by_age():
+        levels = np.digitize(rows["wbs"], LEVEL_BOUNDS)
+        bands = np.digitize(rows["age"], AGE_BOUNDS)
+        cells = np.bincount(bands * (len(LEVEL_BOUNDS) + 1) + levels, minlength=(len(AGE_BOUNDS) + 1) * (len(LEVEL_BOUNDS) + 1))
+        return cells.reshape(len(AGE_BOUNDS) + 1, len(LEVEL_BOUNDS) + 1).tolist()
+
+    def last_30_days():
+        recent = log.rows(since=time.time() - 30 * 86400)
+        return {"rows": len(recent), "mean_wbs": float(recent["wbs"].mean()) if len(recent) else None}
+
+    for name, scan in (("wbs_stats", wbs_stats), ("pillars_by_sex", pillars_by_sex),
+                       ("levels_by_age", levels_by_age), ("last_30_days", last_30_days)):
+        seconds, value = _timed(scan)
+        scans[name] = {"seconds": seconds, "rows_per_second": len(rows) / seconds if seconds else None, "result": value}
+    log.close()
+    return {"rows": len(rows), "bytes": len(rows) * LOG_DTYPE.itemsize, "open_seconds": open_seconds, "scans": scans}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000, help="Submissions in the log (default: 20,000,000).")
+    parser.add_argument("--distinct", type=int, default=100_000, help="Distinct random profiles repeated through the log.")
+    parser.add_argument("--days", type=float, default=365.0, help="Time span the rows are spread over (default: 365).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random profiles.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "submissions.log")
+        append_seconds = build_log(path, args.rows, args.distinct, args.days, args.seed)
+        report = run_scans(path)
+    report["append_seconds"] = append_seconds
+
+    print(f"{report['rows']:,} rows, {report['bytes'] / 1e9:.2f} GB; appended in {append_seconds:.1f} s "
+          f"({report['rows'] / append_seconds:,.0f} rows/s), mapped in {report['open_seconds'] * 1000:.1f} ms")
+    for name, scan in report["scans"].items():
+        rate = f"{scan['rows_per_second'] / 1e6:8.1f} M rows/s" if name != "last_30_days" else f"{scan['result']['rows']:>10,} rows"
+        print(f"{name:<16}{scan['seconds'] * 1000:9.1f} ms  {rate}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Speed-up of multi-core batch scoring (parallel.py, batch_cli --workers) per worker count.
+
+Builds --rows random profiles (--distinct of them, repeated) and, for every
+worker count in --workers, times:
+
+- score: one ParallelScorer.score() call over all rows (pool already started);
+- cli: batch_cli.run() over the same rows as a CSV, with the default chunk
+  size for that worker count (batch_cli.parallel_chunk_size()).
+
+Speed-ups are against the one-worker time. They can only exceed 1 on a
+machine with more than one core; the report records os.cpu_count().
+
+    python benchmarks/parallel_scaling.py --rows 2000000 --workers 1,2,4,8 --json parallel_scaling.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import batch_cli  # noqa: E402
+from batch import SUBMISSION_COLUMNS  # noqa: E402
+from parallel import MIN_ROWS_PER_TASK, ParallelScorer  # noqa: E402
+
+from api_throughput import random_profiles  # noqa: E402
+
+
+def build_frame(rows, distinct, seed=0):
+    profiles = random_profiles(distinct, seed)
+    frame = pd.DataFrame({name: [profile[name] for profile in profiles] for name in SUBMISSION_COLUMNS if name != "dob"})
+    frame["age"] = [profile["age"] for profile in profiles]
+    return frame.iloc[np.resize(np.arange(distinct), rows)].reset_index(drop=True)
+
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _worker_counts(text):
+    return [int(value) for value in text.split(",")]
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in sorted({1, 2, 4, 8, cpus}) if n <= max(cpus, 2))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to score (default: 1,000,000).")
+    parser.add_argument("--distinct", type=int, default=50_000, help="Distinct random profiles repeated through the rows.")
+    parser.add_argument("--workers", type=_worker_counts, default=_worker_counts(default_workers),
+                        help=f"Comma-separated worker counts (default: {default_workers}).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per worker count; the best is kept.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    frame = build_frame(args.rows, args.distinct)
+    report = {"rows": args.rows, "cpu_count": cpus, "runs": []}
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "input.csv")
+        frame.to_csv(input_path, index=False)
+        for workers in args.workers:
+            with ParallelScorer(workers) as scorer:
+                scorer.score(frame.iloc[:MIN_ROWS_PER_TASK * 2 * workers])  # starts the pool
+                score_seconds = min(_timed(lambda: scorer.score(frame)) for _ in range(args.repeat))
+            cli_seconds = min(_timed(lambda: batch_cli.run(input_path, os.path.join(directory, "output.csv"), workers=workers))
+                              for _ in range(args.repeat))
+            report["runs"].append({"workers": workers, "chunk_size": batch_cli.parallel_chunk_size(workers),
+                                   "score_seconds": score_seconds, "cli_seconds": cli_seconds})
+
+    base = report["runs"][0]
+    print(f"{args.rows:,} rows on {cpus} CPU(s)")
+    print(f"{'workers':>7} {'chunk':>9} {'score s':>8} {'speed-up':>8} {'cli s':>7} {'speed-up':>8}")
+    for run in report["runs"]:
+        run["score_speedup"] = base["score_seconds"] / run["score_seconds"]
+        run["cli_speedup"] = base["cli_seconds"] / run["cli_seconds"]
+        print(f"{run['workers']:>7} {run['chunk_size']:>9,} {run['score_seconds']:>8.2f} {run['score_speedup']:>7.2f}x "
+              f"{run['cli_seconds']:>7.2f} {run['cli_speedup']:>7.2f}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Micro and macro latency benchmarks with a stored baseline.
+
+Micro: every calculation function, in scalar form (scoring.py, per call)
+and in batch form (batch.py, per call on --rows rows).
+Macro: the whole page through Streamlit's AppTest harness: first load,
+submit with an empty result cache, submit again (cache hit) and a plain
+rerun, with the app's .streamlit/config.toml applied as ``streamlit run``
+would. AppTest compiles doc.py afresh on every run (twice while pages/
+exists), which a server does once per process.
+
+Results go to a JSON file keyed by benchmark name. With a baseline file,
+every benchmark slower than baseline * (1 + threshold) is reported and
+the exit status is 1.
+
+    python benchmarks/suite.py                       # run, compare with benchmarks/baseline.json
+    python benchmarks/suite.py --only micro --threshold 0.5
+    python benchmarks/suite.py --update-baseline     # store this run as the new baseline
+
+Baselines are machine-specific: refresh them when the benchmark host changes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, time as clock_time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import batch  # noqa: E402
+import scoring  # noqa: E402
+
+DOC_PATH = os.path.join(REPO_ROOT, "doc.py")
+# The form's default "Overall Daily Activity Level" (its selectbox starts at index 2).
+FORM_ACTIVITY = list(scoring.ACTIVITY_MAP)[2]
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+
+
+# --- Cases ---
+def scalar_cases():
+    """Benchmark name -> (function, args), with the form's default values."""
+    return {
+        "calculate_bmi": (scoring.calculate_bmi, (70.0, 170.0)),
+        "calculate_bmr": (scoring.calculate_bmr, (70.0, 170.0, 35, "Male")),
+        "calculate_tdee": (scoring.calculate_tdee, (1650.0, scoring.ACTIVITY_MAP[FORM_ACTIVITY])),
+        "calculate_wthr_score": (scoring.calculate_wthr_score, (80.0, 170.0)),
+        "calculate_dqs": (scoring.calculate_dqs, (5, 3, 3)),
+        "calculate_hs": (scoring.calculate_hs, (2.5, 70.0)),
+        "calculate_exercise_score": (scoring.calculate_exercise_score, (4, "Moderate")),
+        "calculate_sqs": (scoring.calculate_sqs, (7.5, 7, 7)),
+        "calculate_p_score": (scoring.calculate_p_score, (0.8, 0.78, 1.0, 0.6, 0.7)),
+        "calculate_m_score": (scoring.calculate_m_score, (5, 5.0, 2, 3, 7, 3.0)),
+        "calculate_e_score": (scoring.calculate_e_score, (7, 7, 7, 7, 3, 2.0)),
+        "calculate_wbs": (scoring.calculate_wbs, (62.8, 67.6, 56.4)),
+        "get_wbs_interpretation": (scoring.get_wbs_interpretation, (62.9,)),
+        "get_age": (scoring.get_age, (date(1990, 1, 1),)),
+        "calculate_protein_needs": (scoring.calculate_protein_needs, (70.0, FORM_ACTIVITY)),
+        "get_heart_rate_zones": (scoring.get_heart_rate_zones, (35,)),
+        "calculate_circadian_alignment_score": (scoring.calculate_circadian_alignment_score, (clock_time(7, 0), 7)),
+        "calculate_burnout_risk": (scoring.calculate_burnout_risk, (5, 7.5, 5.0)),
+        "get_expert_insight_detailed": (scoring.get_expert_insight_detailed, (62.8, "Physical Health")),
+    }
+
+
+def batch_cases(n_rows, seed=0):
+    """Benchmark name -> (function, args) over ``n_rows`` random submissions."""
+    rng = np.random.default_rng(seed)
+
+    def uniform(low, high):
+        return rng.uniform(low, high, n_rows)
+
+    def integers(low, high):
+        return rng.integers(low, high + 1, n_rows).astype(float)
+
+    weight, height, waist, age = uniform(40, 150), uniform(140, 210), uniform(60, 140), integers(18, 90)
+    activity = rng.choice(list(scoring.ACTIVITY_MAP), n_rows).astype(object)
+    intensity = rng.choice(list(scoring.INTENSITY_MULTIPLIERS), n_rows).astype(object)
+    gender = rng.choice(["Male", "Female", "Prefer not to say"], n_rows).astype(object)
+    dob = (np.datetime64("1990-01-01") + rng.integers(-20000, 10000, n_rows)).astype("datetime64[D]")
+    scores = [uniform(0, 1) for _ in range(5)]
+    pillars = [uniform(0, 100) for _ in range(3)]
+    data = {name: uniform(0, 10) for name in batch.INPUT_COLUMNS}
+    data.update(weight_kg=weight, height_cm=height, waist_cm=waist, intensity=intensity, activity_str=activity,
+                gender=gender, age=age)
+    return {
+        "calculate_bmi": (batch.calculate_bmi, (weight, height)),
+        "calculate_bmr": (batch.calculate_bmr, (weight, height, age, gender)),
+        "calculate_tdee": (batch.calculate_tdee, (uniform(1200, 2500), uniform(1.2, 1.9))),
+        "calculate_wthr_score": (batch.calculate_wthr_score, (waist, height)),
+        "calculate_dqs": (batch.calculate_dqs, (integers(0, 10), integers(1, 5), integers(1, 5))),
+        "calculate_hs": (batch.calculate_hs, (uniform(0, 10), weight)),
+        "calculate_exercise_score": (batch.calculate_exercise_score, (integers(0, 7), intensity)),
+        "calculate_sqs": (batch.calculate_sqs, (uniform(0, 12), integers(1, 10), integers(1, 10))),
+        "calculate_p_score": (batch.calculate_p_score, tuple(scores)),
+        "calculate_m_score": (batch.calculate_m_score, (integers(1, 10), uniform(0, 12), integers(0, 7), integers(0, 20), integers(1, 10), uniform(0, 12))),
+        "calculate_e_score": (batch.calculate_e_score, (integers(1, 10), integers(0, 21), integers(1, 10), integers(1, 10), integers(0, 7), uniform(0, 10))),
+        "calculate_wbs": (batch.calculate_wbs, tuple(pillars)),
+        "get_wbs_level": (batch.get_wbs_level, (pillars[0],)),
+        "get_age": (batch.get_age, (dob, date(2025, 1, 1))),
+        "calculate_protein_needs": (batch.calculate_protein_needs, (weight, activity)),
+        "get_heart_rate_zones": (batch.get_heart_rate_zones, (age,)),
+        "calculate_circadian_alignment_score": (batch.calculate_circadian_alignment_score, (7, integers(1, 10))),
+        "calculate_burnout_risk": (batch.calculate_burnout_risk, (integers(1, 10), uniform(0, 12), uniform(0, 12))),
+        "score_submissions": (batch.score_submissions, (data,)),
+    }
+
+
+# --- Runners ---
+def time_call(function, args, repeat=5):
+    """Best-of-``repeat`` seconds per call, each repeat sized by timeit's autorange."""
+    timer = timeit.Timer(lambda: function(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def micro_benchmarks(n_rows=100_000, repeat=5):
+    results = {}
+    for name, (function, args) in scalar_cases().items():
+        results[f"micro.scalar.{name}"] = time_call(function, args, repeat)
+    for name, (function, args) in batch_cases(n_rows).items():
+        results[f"micro.batch.{name}"] = time_call(function, args, repeat)
+    return results
+
+
+# Environment variables pointing the page at its data files -> throwaway file names for the benchmark.
+DATA_FILES = {
+    "WELLBEING_HISTORY_DB": "history.db",
+    "WELLBEING_SKETCH_DIR": "sketches",
+    "WELLBEING_SUBMISSION_LOG": "submissions.log",
+    "WELLBEING_COHORT_STATS": "cohorts.npz",
+    "WELLBEING_NEIGHBOR_INDEX": "neighbors.npz",
+    "WELLBEING_PERSONAS": "personas.npz",
+}
+
+def macro_benchmarks(repeat=5):
+    """Median seconds per page run through AppTest, against throwaway data files (DATA_FILES)."""
+    import streamlit as st
+    from streamlit import config
+    from streamlit.testing.v1 import AppTest
+
+    # `streamlit run doc.py` sets this too, so the config next to doc.py applies from any working directory.
+    previous_script_path, config._main_script_path = config._main_script_path, DOC_PATH
+    config.get_config_options(force_reparse=True)
+    samples = {"initial_run": [], "submit_uncached": [], "submit_cached": [], "rerun": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        previous = {name: os.environ.get(name) for name in DATA_FILES}
+        for name, filename in DATA_FILES.items():
+            os.environ[name] = os.path.join(tmp, filename)
+        try:
+            for _ in range(repeat + 1):  # the first round only warms up imports
+                st.cache_resource.clear()
+                app = AppTest.from_file(DOC_PATH, default_timeout=120)
+                timings = {}
+                start = time.perf_counter()
+                app.run()
+                timings["initial_run"] = time.perf_counter() - start
+                for label in ("submit_uncached", "submit_cached"):
+                    start = time.perf_counter()
+                    app.button[0].click().run()
+                    timings[label] = time.perf_counter() - start
+                start = time.perf_counter()
+                app.run()
+                timings["rerun"] = time.perf_counter() - start
+                if app.exception:
+                    raise RuntimeError(f"doc.py raised during the benchmark: {app.exception}")
+                for label, seconds in timings.items():
+                    samples[label].append(seconds)
+        finally:
+            st.cache_resource.clear()
+            config._main_script_path = previous_script_path
+            config.get_config_options(force_reparse=True)
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    return {f"macro.{label}": statistics.median(values[1:]) for label, values in samples.items()}
+
+
+# --- Baseline comparison ---
+def compare(results, baseline, threshold):
+    """Names whose time exceeds baseline * (1 + threshold), with their ratio."""
+    return {
+        name: seconds / baseline[name]
+        for name, seconds in results.items()
+        if baseline.get(name) and seconds > baseline[name] * (1 + threshold)
+    }
+
+
+def _format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.2f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.2f} us"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", choices=("micro", "macro"), help="Run one part of the suite.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per batch micro-benchmark (default: 100000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per benchmark (default: 5).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown over baseline as a fraction (default: 0.25).")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run to the baseline file instead of comparing.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.only in (None, "micro"):
+        results.update(micro_benchmarks(args.rows, args.repeat))
+    if args.only in (None, "macro"):
+        results.update(macro_benchmarks(args.repeat))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "rows": args.rows, "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "seconds": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)["seconds"]
+        report["seconds"] = dict(baseline, **results)  # --only keeps the other part's baseline
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        baseline = {}
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        baseline = stored["seconds"]
+        if stored["meta"].get("rows") != args.rows:
+            print(f"Baseline batch timings are for {stored['meta'].get('rows')} rows; not comparing micro.batch.*", file=sys.stderr)
+            baseline = {name: seconds for name, seconds in baseline.items() if not name.startswith("micro.batch.")}
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, seconds in results.items():
+        ratio = f"{seconds / baseline[name]:6.2f}x" if baseline.get(name) else "      -"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<52} {_format_seconds(seconds)}  {ratio}{flag}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Plotly figures for the results page, built from per-process templates.
+
+Each chart's static layout (axes, fonts, margins, gauge step bands) is built
+once per process as a plain figure dict. A submission only patches the data
+values into shallow copies of the template, so no go.Figure is constructed
+or validated per rerun. The returned dicts share their unpatched parts with
+the template: treat them as read-only. Show them with show_chart(): given a
+dict, st.plotly_chart builds and validates a go.Figure from it on every call
+(about 10 ms a chart), which would undo the templates' saving.
+
+Plotly (for the templates) and NumPy (for trend downsampling) are imported
+on first use, so importing this module for the page costs nothing extra
+before the first submit.
+"""
+from functools import lru_cache
+
+import streamlit as st
+
+
+# Function to convert hex color to rgba with alpha for Plotly
+@lru_cache(maxsize=None)
+def hex_to_rgba(hex_color, alpha):
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 6:
+        r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        return f'rgba({r},{g},{b},{alpha})'
+    return f'rgba(255,255,255,{alpha})' # Fallback to white with alpha if hex is invalid
+
+CHART_TEXT_COLOR = "#e0e0e0"
+CHART_SUBTEXT_COLOR = "#b0b0c0"
+CHART_GRID_COLOR = "rgba(255,255,255,0.1)" # Slightly more visible grid
+CHART_LINE_COLOR = "rgba(255,255,255,0.2)"
+CHART_PRIMARY_COLOR = "#00a9ff"
+CHART_PHYSICAL_COLOR = "#1f77b4"
+CHART_MENTAL_COLOR = "#ff7f0e"
+CHART_EMOTIONAL_COLOR = "#2ca02c"
+
+# Most points a trend line sends to the browser; longer histories are downsampled.
+TREND_MAX_POINTS = 500
+
+RADAR_CATEGORIES = ['Physical Health', 'Mental Health', 'Emotional Health']
+
+
+# --- Templates (built once per process) ---
+@lru_cache(maxsize=None)
+def _radar_template():
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    # Credible-interval ring: out along the highs, back along the lows (reversed), filled.
+    fig.add_trace(go.Scatterpolar(
+        r=[0] * 8,
+        theta=(RADAR_CATEGORIES + [RADAR_CATEGORIES[0]]) + ([RADAR_CATEGORIES[0]] + RADAR_CATEGORIES[:0:-1] + [RADAR_CATEGORIES[0]]),
+        fill='toself',
+        name='Likely range',
+        mode='lines',
+        line=dict(color=hex_to_rgba(CHART_PRIMARY_COLOR, 0.5), width=1, dash='dot'),
+        fillcolor=hex_to_rgba(CHART_PRIMARY_COLOR, 0.12),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatterpolar(
+        r=[0, 0, 0, 0],
+        theta=RADAR_CATEGORIES + [RADAR_CATEGORIES[0]],
+        fill='toself',
+        name='Well-being Scores',
+        line=dict(color=CHART_PRIMARY_COLOR, width=3),
+        fillcolor=hex_to_rgba(CHART_PRIMARY_COLOR, 0.3) # Slightly more opaque fill
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            bgcolor='rgba(0,0,0,0)',
+            radialaxis=dict(
+                visible=True, range=[0, 100], angle=90,
+                tickfont=dict(size=12, color=CHART_SUBTEXT_COLOR), # Increased tick font size
+                gridcolor=CHART_GRID_COLOR,
+                linecolor=CHART_LINE_COLOR,
+                showline=True, showticklabels=True
+            ),
+            angularaxis=dict(
+                tickfont=dict(size=14, color=CHART_TEXT_COLOR, family="Roboto, sans-serif", weight="bold"), # Increased tick font size
+                direction="clockwise",
+                gridcolor=CHART_GRID_COLOR,
+                linecolor=CHART_LINE_COLOR
+            )
+        ),
+        showlegend=False, height=400,
+        margin=dict(l=70, r=70, t=70, b=70), # Increased margins for labels
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _gauge_template():
+    # Shared by all three pillar gauges; value, title and pillar color are patched per call.
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={'text': '', 'font': {'size': 20, 'family': "Roboto, sans-serif", 'color': CHART_TEXT_COLOR}},
+        number={'font': {'size': 44, 'family': "Roboto, sans-serif", 'color': CHART_PRIMARY_COLOR}, 'suffix': "%"},
+        gauge={
+            'axis': {'range': [0, 100], 'tickwidth': 2, 'tickcolor': CHART_SUBTEXT_COLOR, 'tickfont': {'size':12, 'color':CHART_SUBTEXT_COLOR}}, # Added tickfont
+            'bar': {'color': CHART_PRIMARY_COLOR, 'thickness': 0.4},
+            'bgcolor': "rgba(255,255,255,0.05)",
+            'borderwidth': 0,
+            'steps': [
+                {'range': [0, 55], 'color': hex_to_rgba("#dc3545",0.7)},
+                {'range': [55, 70], 'color': hex_to_rgba("#ffc107",0.7)},
+                {'range': [70, 85], 'color': hex_to_rgba("#17a2b8",0.7)},
+                {'range': [85, 100], 'color': hex_to_rgba("#28a745",0.7)}
+            ],
+        }
+    ))
+    fig.update_layout(height=250, margin=dict(l=30, r=30, t=60, b=30), paper_bgcolor='rgba(0,0,0,0)')
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _time_series_template():
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='lines+markers', name='WBS Over Time',
+        line=dict(color=CHART_PRIMARY_COLOR, width=2.5),
+        marker=dict(color=hex_to_rgba(CHART_PRIMARY_COLOR,0.9), size=8, line=dict(width=1.5, color=st.get_option("theme.backgroundColor")))
+    ))
+    fig.update_layout(
+        title=dict(text="Well-Being Score Trend", font=dict(size=18, color=CHART_TEXT_COLOR)),
+        xaxis_title=None, yaxis_title="WBS",
+        xaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12)), # Increased tick font size
+        yaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), range=[30, 100]), # Increased tick font size
+        height=350, margin=dict(l=50, r=30, t=70, b=50), # Adjusted margins
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _heatmap_template():
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=[], y=[], z=[], zmin=0, zmax=100,
+        colorscale=[[0, "#dc3545"], [0.55, "#ffc107"], [0.70, "#17a2b8"], [0.85, "#28a745"], [1, "#28a745"]],
+        colorbar=dict(title=dict(text="WBS", font=dict(color=CHART_TEXT_COLOR)), tickfont=dict(color=CHART_SUBTEXT_COLOR)),
+        hovertemplate="%{x}, %{y}: WBS %{z:.1f}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='markers', name='You',
+        marker=dict(symbol='x', size=14, color='white', line=dict(width=2, color='black')),
+        hovertemplate="You: WBS %{text}<extra></extra>"
+    ))
+    fig.update_layout(
+        xaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), title=dict(font=dict(color=CHART_TEXT_COLOR))),
+        yaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), title=dict(font=dict(color=CHART_TEXT_COLOR))),
+        showlegend=False, height=450, margin=dict(l=60, r=30, t=30, b=60),
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig.to_dict()
+
+
+# Bar traces of the cohort chart, in trace order: (score, legend name, color).
+COHORT_BARS = (
+    ("p_score", "Physical", CHART_PHYSICAL_COLOR), ("m_score", "Mental", CHART_MENTAL_COLOR),
+    ("e_score", "Emotional", CHART_EMOTIONAL_COLOR), ("wbs", "WBS", CHART_PRIMARY_COLOR),
+)
+
+@lru_cache(maxsize=None)
+def _cohort_bar_template():
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for _, name, color in COHORT_BARS:
+        fig.add_trace(go.Bar(
+            x=[], y=[], name=name, marker=dict(color=hex_to_rgba(color, 0.85)),
+            error_y=dict(type='data', array=[], color=CHART_LINE_COLOR, thickness=1),
+            hovertemplate="%{x}: " + name + " %{y:.1f} (sd %{error_y.array:.1f})<extra></extra>"
+        ))
+    fig.update_layout(
+        barmode='group', yaxis_title="Mean score",
+        xaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12)),
+        yaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), range=[0, 100]),
+        legend=dict(orientation='h', y=1.1, font=dict(color=CHART_TEXT_COLOR)),
+        height=420, margin=dict(l=50, r=30, t=50, b=80),
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _waterfall_template():
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Waterfall(
+        x=[], y=[], measure=[], text=[], textposition='outside',
+        textfont=dict(color=CHART_SUBTEXT_COLOR, size=12),
+        decreasing=dict(marker=dict(color=hex_to_rgba("#dc3545", 0.75))),
+        increasing=dict(marker=dict(color=hex_to_rgba("#28a745", 0.75))),
+        totals=dict(marker=dict(color=CHART_PRIMARY_COLOR)),
+        connector=dict(line=dict(color=CHART_LINE_COLOR, width=1)),
+        hovertemplate="%{x}: %{text}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=dict(text="Where your points go", font=dict(size=16, color=CHART_TEXT_COLOR)),
+        xaxis=dict(tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12)),
+        yaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), range=[0, 110]),
+        showlegend=False, height=320, margin=dict(l=40, r=20, t=50, b=40),
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig.to_dict()
+
+
+# --- Charting Functions (patch data values into the templates) ---
+def create_wellbeing_radar_chart(p_score, m_score, e_score, intervals=None):
+    """Radar of the three pillars; ``intervals`` ((low, high) per pillar, P/M/E order) adds the likely-range ring."""
+    template = _radar_template()
+    scores = [p_score, m_score, e_score]
+    traces = [dict(template["data"][1], r=scores + [scores[0]])]
+    if intervals is not None:
+        lows, highs = [low for low, _ in intervals], [high for _, high in intervals]
+        traces.insert(0, dict(template["data"][0], r=(highs + [highs[0]]) + ([lows[0]] + lows[:0:-1] + [lows[0]])))
+    return {"data": traces, "layout": template["layout"]}
+
+def create_gauge_chart(score, title, pillar_color_hex, interval=None):
+    """Pillar gauge; ``interval`` (low, high) marks the likely range as a band and under the title."""
+    template = _gauge_template()
+    base = template["data"][0]
+    gauge = dict(base["gauge"], bar=dict(base["gauge"]["bar"], color=pillar_color_hex))
+    if interval is not None:
+        low, high = interval
+        gauge["steps"] = base["gauge"]["steps"] + [{'range': [low, high], 'color': 'rgba(255,255,255,0.45)', 'thickness': 0.25}]
+        title = f"{title}<br><span style='font-size:0.6em;color:{CHART_SUBTEXT_COLOR}'>likely {low:.0f}–{high:.0f}%</span>"
+    trace = dict(
+        base,
+        value=score,
+        title=dict(base["title"], text=title),
+        number=dict(base["number"], font=dict(base["number"]["font"], color=pillar_color_hex)),
+        gauge=gauge,
+    )
+    return {"data": [trace], "layout": template["layout"]}
+
+def create_time_series_chart(dates, scores, max_points=TREND_MAX_POINTS, method="lttb"):
+    """
+    Trend of a user's WBS over time; ``dates`` and ``scores`` come from HistoryStore.trend().
+    Series longer than ``max_points`` are reduced with downsample() ("lttb" or "minmax"),
+    or with method None cut to their latest ``max_points`` points, so the browser never
+    gets more than ``max_points``.
+    """
+    if len(scores) <= max_points:
+        dates, scores = list(dates), list(scores)
+    elif method is None:
+        dates, scores = list(dates[-max_points:]), list(scores[-max_points:])
+    else:
+        from downsample import downsample
+        dates, scores = downsample(dates, scores, max_points, method)
+    template = _time_series_template()
+    trace = dict(template["data"][0], x=dates, y=scores)
+    y_range = [min(30, min(scores)-5) if scores else 30, max(100, max(scores)+5) if scores else 100]
+    layout = dict(template["layout"], yaxis=dict(template["layout"]["yaxis"], range=y_range))
+    return {"data": [trace], "layout": layout}
+
+def create_heatmap_chart(x_values, y_values, z, x_label, y_label, current_x, current_y, current_wbs):
+    """WBS surface over two inputs (from surface.wbs_surface()), with the user's own answers marked."""
+    template = _heatmap_template()
+    heatmap = dict(template["data"][0], x=list(x_values), y=list(y_values), z=z)
+    marker = dict(template["data"][1], x=[current_x], y=[current_y], text=[f"{current_wbs:.1f}"])
+    layout = dict(
+        template["layout"],
+        xaxis=dict(template["layout"]["xaxis"], title=dict(template["layout"]["xaxis"]["title"], text=x_label)),
+        yaxis=dict(template["layout"]["yaxis"], title=dict(template["layout"]["yaxis"]["title"], text=y_label)),
+    )
+    return {"data": [heatmap, marker], "layout": layout}
+
+def create_cohort_bar_chart(groups, table):
+    """Mean P/M/E/WBS per cohort group, with standard deviation whiskers; ``table`` rows from CohortAggregates.table()."""
+    template = _cohort_bar_template()
+    traces = [
+        dict(trace, x=groups, y=[row[f"{score}_mean"] for row in table],
+             error_y=dict(trace["error_y"], array=[row[f"{score}_sd"] for row in table]))
+        for trace, (score, _, _) in zip(template["data"], COHORT_BARS)
+    ]
+    return {"data": traces, "layout": template["layout"]}
+
+def create_contribution_waterfall(labels, contributions, weights, score, pillar_color_hex):
+    """
+    Waterfall from the best possible 100 down to ``score``: one step per pillar term for the
+    points it falls short of its full weight (batch.pillar_contributions() and batch.PILLAR_TERMS).
+    """
+    template = _waterfall_template()
+    base = template["data"][0]
+    shortfalls = [weight * 100 - contribution for contribution, weight in zip(contributions, weights)]
+    trace = dict(
+        base,
+        x=["Best possible"] + list(labels) + ["Your score"],
+        y=[100.0] + [-shortfall for shortfall in shortfalls] + [0.0],
+        measure=["absolute"] + ["relative"] * len(labels) + ["total"],
+        text=["100"] + [f"{contribution:.1f} of {weight * 100:.0f}" for contribution, weight in zip(contributions, weights)] + [f"{score:.1f}"],
+        totals=dict(marker=dict(color=pillar_color_hex)),
+    )
+    return {"data": [trace], "layout": template["layout"]}
+
+
+# --- Display ---
+def show_chart(figure, **kwargs):
+    """st.plotly_chart() for a figure dict from this module, without validating it again (its template already was)."""
+    import plotly.graph_objects as go
+    return st.plotly_chart(go.Figure(figure, _validate=False), **kwargs)
@@ -0,0 +1,242 @@
+"""Materialized per-cohort aggregates of the scores, kept up to date from the submission log.
+
+A cohort is one (age band, sex, activity level) cell: the age bands of
+percentiles.AGE_BANDS, the sexes of percentiles.cohort_key() and the
+scoring.ACTIVITY_MAP levels. For every cell and every score in SCORES the
+aggregates hold the count, sum and sum of squares (so mean and standard
+deviation) and a histogram with one bin per score point (so quantiles).
+Any coarser view (by age band only, by sex and activity, everyone) sums
+cells, so a dashboard reads a few thousand numbers however long the
+history is.
+
+The submission log (submission_log.py) is the source of truth. The
+aggregates remember how many log rows they have folded in, and update()
+folds only the rows appended since, in one vectorized pass; save() writes
+them, with that row count, atomically to an .npz file, and load() picks
+up from there. Every process catching up from the same log converges on
+the same totals, so any process's file is a valid snapshot.
+
+    aggregates = CohortAggregates.load("wellbeing_cohorts.npz", log)
+    aggregates.update(log)                                   # folds new submissions, saves now and then
+    aggregates.table(("age_band", "sex"))                    # count, mean, sd, median per group
+
+Rebuild offline from the whole log:
+
+    python cohort_stats.py --log wellbeing_submissions.log --out wellbeing_cohorts.npz
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from percentiles import AGE_BANDS
+from records import CHOICES, MISSING_CODE
+from scoring import ACTIVITY_MAP
+
+# Aggregated scores; the names match batch.OUTPUT_COLUMNS.
+SCORES = ("p_score", "m_score", "e_score", "wbs")
+
+# Dimension name -> labels, in cell order. Age bands run youngest first.
+DIMENSIONS = {
+    "age_band": tuple(label for _, label in reversed(AGE_BANDS)),
+    "sex": ("Male", "Female", "Any sex"),
+    "activity": tuple(label.split(" (")[0] for label in ACTIVITY_MAP),
+}
+_AGE_LOWER = [lower for lower, _ in reversed(AGE_BANDS)]
+_SHAPE = tuple(len(labels) for labels in DIMENSIONS.values())
+CELLS = int(np.prod(_SHAPE))
+
+# One histogram bin per score point: [0, 1), [1, 2), ..., [99, 100), and 100 itself.
+HIST_BINS = 101
+
+# Rows folded per pass when catching up a long log.
+_CHUNK = 1_000_000
+
+
+def cell_index(rows):
+    """Cell number of every log row, and a mask of the rows that belong to a cell."""
+    age = rows["age"]
+    band = np.searchsorted(_AGE_LOWER, age, side="right") - 1
+    gender = rows["gender"]
+    sex = np.select([gender == CHOICES["gender"].index(label) for label in DIMENSIONS["sex"][:2]], [0, 1], 2)
+    activity = rows["activity_str"].astype(np.intp)
+    valid = ~np.isnan(age) & (band >= 0) & (activity != MISSING_CODE) & ~np.isnan(rows["wbs"])
+    cells = np.ravel_multi_index((np.maximum(band, 0), sex, np.where(valid, activity, 0)), _SHAPE)
+    return cells, valid
+
+
+class CohortAggregates:
+    """
+    Count, sum, sum of squares and histogram per (cohort cell, score).
+
+    Parameters:
+    - path (str): .npz file update() saves to at most every save_seconds; None to keep them in memory.
+    - save_seconds (float): Least time between saves.
+    """
+
+    def __init__(self, path=None, save_seconds=10):
+        self.path, self.save_seconds = path, save_seconds
+        self.rows_folded = 0
+        self._last_save = time.monotonic()
+        self.count = np.zeros(CELLS, dtype=np.int64)
+        self.total = np.zeros((CELLS, len(SCORES)))
+        self.total_sq = np.zeros((CELLS, len(SCORES)))
+        self.hist = np.zeros((CELLS, len(SCORES), HIST_BINS), dtype=np.int64)
+        self._lock = threading.Lock()          # guards the arrays
+        self._update_lock = threading.Lock()   # one catch-up at a time, so no row is folded twice
+
+    # --- Updating ---
+    def fold(self, rows):
+        """Adds LOG_DTYPE (or records.RECORD_DTYPE) rows to the aggregates; does not move rows_folded."""
+        cells, valid = cell_index(rows)
+        cells = cells[valid]
+        count = np.bincount(cells, minlength=CELLS)
+        totals, squares, hists = [], [], []
+        for name in SCORES:
+            scores = rows[name][valid].astype(float)
+            totals.append(np.bincount(cells, weights=scores, minlength=CELLS))
+            squares.append(np.bincount(cells, weights=scores * scores, minlength=CELLS))
+            bins = np.clip(scores, 0, HIST_BINS - 1).astype(np.intp)
+            hists.append(np.bincount(cells * HIST_BINS + bins, minlength=CELLS * HIST_BINS).reshape(CELLS, HIST_BINS))
+        with self._lock:
+            self.count += count
+            self.total += np.stack(totals, axis=1)
+            self.total_sq += np.stack(squares, axis=1)
+            self.hist += np.stack(hists, axis=1)
+
+    def update(self, log):
+        """
+        Folds every row appended to ``log`` since the last update.
+
+        Returns:
+        - int: Rows folded now.
+        """
+        with self._update_lock:
+            start = self.rows_folded
+            rows = log.rows()
+            for offset in range(start, len(rows), _CHUNK):
+                self.fold(rows[offset:offset + _CHUNK])
+            self.rows_folded = len(rows)
+        if self.path is not None and len(rows) > start and time.monotonic() - self._last_save >= self.save_seconds:
+            self.save()
+        return len(rows) - start
+
+    # --- Persistence ---
+    def save(self, path=None):
+        """Writes the aggregates and rows_folded to ``path`` (default: self.path) atomically."""
+        path = path or self.path
+        with self._lock:
+            self._last_save = time.monotonic()
+            arrays = dict(rows_folded=self.rows_folded, count=self.count.copy(), total=self.total.copy(),
+                          total_sq=self.total_sq.copy(), hist=self.hist.copy())
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, shape=np.array(_SHAPE + (len(SCORES), HIST_BINS)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, log=None, save_seconds=10):
+        """
+        The aggregates saved at ``path`` (and saving back to it), or empty ones if it is
+        missing, stale or of another layout (more rows folded than ``log`` holds, other cells).
+        """
+        aggregates = cls(path, save_seconds)
+        if not os.path.exists(path):
+            return aggregates
+        with np.load(path) as saved:
+            if tuple(saved["shape"]) != _SHAPE + (len(SCORES), HIST_BINS):
+                return aggregates
+            rows_folded = int(saved["rows_folded"])
+            if log is not None and rows_folded > len(log):
+                return aggregates
+            aggregates.rows_folded = rows_folded
+            aggregates.count, aggregates.total, aggregates.total_sq, aggregates.hist = (
+                saved["count"], saved["total"], saved["total_sq"], saved["hist"])
+        return aggregates
+
+    # --- Reading ---
+    def table(self, by=(), **filters):
+        """
+        Summary per group of cohorts.
+
+        Parameters:
+        - by (tuple): Dimension names (keys of DIMENSIONS) to group by; () for everyone.
+        - filters: Dimension name -> labels to keep, e.g. sex=("Female",).
+
+        Returns:
+        - list: One dict per non-empty group: the ``by`` labels, "count", and per
+          score "<score>_mean", "<score>_sd" and "<score>_median".
+        """
+        with self._lock:
+            count = self.count.reshape(_SHAPE).copy()
+            total = self.total.reshape(_SHAPE + (len(SCORES),))
+            total_sq = self.total_sq.reshape(_SHAPE + (len(SCORES),))
+            hist = self.hist.reshape(_SHAPE + (len(SCORES), HIST_BINS))
+            keep = _keep(filters)
+            dropped = tuple(axis for axis, name in enumerate(DIMENSIONS) if name not in by)
+            count = np.where(keep, count, 0).sum(axis=dropped)
+            total = np.where(keep[..., None], total, 0).sum(axis=dropped)
+            total_sq = np.where(keep[..., None], total_sq, 0).sum(axis=dropped)
+            hist = np.where(keep[..., None, None], hist, 0).sum(axis=dropped)
+        names = [name for name in DIMENSIONS if name in by]
+        table = []
+        for index in np.ndindex(count.shape):
+            n = int(count[index])
+            if not n:
+                continue
+            row = {name: DIMENSIONS[name][i] for name, i in zip(names, index)}
+            row["count"] = n
+            for s, score in enumerate(SCORES):
+                mean = total[index][s] / n
+                row[f"{score}_mean"] = round(float(mean), 1)
+                row[f"{score}_sd"] = round(float(np.sqrt(max(total_sq[index][s] / n - mean * mean, 0.0))), 1)
+                row[f"{score}_median"] = round(histogram_quantile(hist[index][s], 0.5), 1)
+            table.append(row)
+        return table
+
+    def histogram(self, score="wbs", **filters):
+        """Counts per score point (HIST_BINS of them) over the cohorts passing ``filters``."""
+        with self._lock:
+            hist = self.hist[:, SCORES.index(score)].reshape(_SHAPE + (HIST_BINS,))
+            return hist[_keep(filters)].sum(axis=0)
+
+
+def _keep(filters):
+    """Mask over the cell grid of the cohorts whose labels pass ``filters``."""
+    keep = np.ones(_SHAPE, dtype=bool)
+    for axis, (name, labels) in enumerate(DIMENSIONS.items()):
+        if name in filters:
+            keep &= np.isin(labels, filters[name]).reshape([-1 if i == axis else 1 for i in range(len(_SHAPE))])
+    return keep
+
+
+def histogram_quantile(hist, q):
+    """Quantile ``q`` of a one-bin-per-point histogram, interpolated within its bin."""
+    n = hist.sum()
+    if not n:
+        return float("nan")
+    cumulative = np.cumsum(hist)
+    target = q * n
+    i = int(np.searchsorted(cumulative, target, side="left"))
+    before = cumulative[i - 1] if i else 0
+    return float(min(i + (target - before) / hist[i], 100.0))
+
+
+def main(argv=None):
+    from submission_log import SubmissionLog
+
+    parser = argparse.ArgumentParser(description="Rebuild the cohort aggregates from the whole submission log.")
+    parser.add_argument("--log", default="wellbeing_submissions.log", help="Submission log to read.")
+    parser.add_argument("--out", default="wellbeing_cohorts.npz", help="Aggregates file to write.")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    log = SubmissionLog(args.log)
+    aggregates = CohortAggregates()
+    rows = aggregates.update(log)
+    aggregates.save(args.out)
+    print(f"Folded {rows:,} submissions into {CELLS} cohorts in {time.perf_counter() - start:.1f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,30 @@
 import streamlit as st
-import math
-from datetime import datetime
-import plotly.graph_objects as go
-import numpy as np
-import pandas as pd # For dummy time-series data
+from datetime import datetime, timedelta
+import logging
+import os
+import re
+import secrets
+import statistics
+
+from scoring import (
+    ACTIVITY_MAP, calculate_bmi, calculate_bmr, calculate_tdee, calculate_wthr_score,
+    calculate_dqs, calculate_hs, calculate_exercise_score, calculate_sqs, calculate_p_score,
+    calculate_m_score, calculate_e_score, calculate_wbs, get_wbs_interpretation, get_age,
+    calculate_protein_needs, get_heart_rate_zones, calculate_circadian_alignment_score,
+    calculate_burnout_risk, get_expert_insight_detailed,
+)
+from charts import (
+    CHART_PHYSICAL_COLOR, CHART_MENTAL_COLOR, CHART_EMOTIONAL_COLOR,
+    create_wellbeing_radar_chart, create_gauge_chart, create_time_series_chart, create_heatmap_chart,
+    create_contribution_waterfall, show_chart,
+)
+from result_cache import ResultCache, profile_key
+from history import HistoryStore
+from percentiles import PercentileService
+from fields import FIELDS, GENDERS
+from resources import get_cohort_aggregates, get_submission_log, run_in_background
+from timing import TIMER
+import stylesheet
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,799 +34,267 @@ st.set_page_config(
     page_icon="✨"
 )
 
-# --- Custom CSS for Dark Theme & Modern UI (with Visibility Fixes) ---
-st.markdown("""
-<style>
-    /* --- Root Variables for Dark Theme --- */
-    :root {
-        --primary-color: #00a9ff; 
-        --primary-hover-color: #007fcc;
-        --primary-active-color: #005f99;
-        --background-color: #1a1a2e; 
-        --sidebar-background-color: #162447; 
-        --card-background-color: #1f2a40; 
-        --text-color: #e0e0e0; 
-        --header-color: #ffffff; 
-        --subheader-color: #b0b0c0; 
-        --input-background-color: #2a3b5f;
-        --input-border-color: #4a5b7f;
-        --input-focus-border-color: var(--primary-color);
-        --slider-track-color: #3a4b6f;
-        --slider-thumb-color: var(--primary-color); /* Used for filled part */
-        --slider-actual-thumb-color: var(--primary-hover-color); /* For the draggable thumb */
-        --success-color: #28a745;
-        --info-color: #17a2b8;
-        --warning-color: #ffc107;
-        --danger-color: #dc3545;
-        --border-radius: 10px;
-        --box-shadow: 0 6px 12px rgba(0,0,0,0.2);
-        --visible-text-color: #f0f0f5; /* For critical data visibility */
-        /* Pillar specific colors (can be defined if needed elsewhere, otherwise Plotly uses its own) */
-        --physical-color: #1f77b4; /* Blue */
-        --mental-color: #ff7f0e;   /* Orange */
-        --emotional-color: #2ca02c; /* Green */
-    }
-
-    /* --- General App Styling --- */
-    body {
-        font-family: 'Roboto', sans-serif;
-        color: var(--text-color);
-        background-color: var(--background-color);
-    }
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 3rem;
-    }
-
-    /* --- Headers --- */
-    h1, h2, h3, h4, h5, h6 {
-        color: var(--header-color);
-        font-weight: 600;
-    }
-    h1 {
-        color: var(--primary-color);
-        text-align: center;
-        margin-bottom: 1.5rem;
-        font-size: 2.8em;
-    }
-    h2 { /* Section headers */
-        font-size: 2em;
-        border-bottom: 2px solid var(--primary-color);
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-        margin-bottom: 1.5rem;
-    }
-    h3 { /* Sub-section headers like in results */
-        font-size: 1.6em;
-        color: var(--primary-color);
-        margin-top: 1.5rem;
-    }
-    h5 { /* For input group titles like "Exercise Habits" */
-        color: var(--subheader-color);
-        font-weight: 500;
-        margin-bottom: 0.8rem;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-
-    /* --- Input Styling --- */
-    .stTextInput>div>div>input, 
-    .stNumberInput>div>div>input, 
-    .stDateInput>div>div>input { /* Corrected selector for stDateInput */
-        font-size: 15px !important;
-        padding: 12px 15px !important;
-        border-radius: var(--border-radius) !important;
-        border: 1px solid var(--input-border-color) !important;
-        background-color: var(--input-background-color) !important;
-        color: var(--visible-text-color) !important; 
-        box-shadow: var(--box-shadow) !important;
-    }
-    /* Base style for selectbox container (padding, border, bg) */
-    .stSelectbox>div>div {
-        font-size: 15px !important;
-        padding: 12px 15px !important;
-        border-radius: var(--border-radius) !important;
-        border: 1px solid var(--input-border-color) !important;
-        background-color: var(--input-background-color) !important;
-        box-shadow: var(--box-shadow) !important;
-        /* Text color for selected item handled by more specific selector below */
-    }
-    /* Style for the actual displayed text of the selected option in Selectbox */
-    .stSelectbox div[data-baseweb="select"] > div:first-child > div { /* Targets the div holding the selected text */
-         color: var(--visible-text-color) !important;
-    }
-     /* Style for the dropdown arrow icon in Selectbox */
-    .stSelectbox svg {
-        fill: var(--visible-text-color) !important;
-    }
-    /* Styling for the dropdown menu items (popover) for Selectbox */
-    div[data-baseweb="popover"] ul[role="listbox"] li {
-        background-color: var(--input-background-color) !important;
-        color: var(--visible-text-color) !important; /* Ensure text in dropdown list is visible */
-    }
-    div[data-baseweb="popover"] ul[role="listbox"] li:hover,
-    div[data-baseweb="popover"] ul[role="listbox"] li[aria-selected="true"] { /* Style for selected/hovered item in list */
-        background-color: var(--primary-hover-color) !important;
-        color: var(--header-color) !important; /* White text on hover/selection in list */
-    }
-
-    .stTextInput>div>div>input:focus, 
-    .stNumberInput>div>div>input:focus, 
-    .stDateInput>div>div>input:focus,
-    .stSelectbox>div>div:focus-within { 
-        border-color: var(--input-focus-border-color) !important;
-        box-shadow: 0 0 0 0.2rem rgba(0,169,255,.35) !important;
-    }
-    ::placeholder { 
-        color: var(--subheader-color) !important;
-        opacity: 0.7 !important; 
-    }
-
-    /* --- Slider Styling (with fixes for value visibility) --- */
-    .stSlider { 
-        color: var(--visible-text-color); 
-    }
-    .stSlider > div[data-baseweb="slider"] { 
-        background-color: var(--slider-track-color) !important;
-        border-radius: var(--border-radius);
-        padding: 6px 0;
-    }
-    .stSlider > div[data-baseweb="slider"] > div:nth-child(3) { 
-        background-color: var(--slider-thumb-color) !important; 
-    }
-    .stSlider > div[data-baseweb="slider"] > div:nth-child(4) { 
-        background-color: var(--slider-actual-thumb-color) !important;
-        border: 3px solid var(--card-background-color) !important;
-        box-shadow: 0 3px 6px rgba(0,0,0,0.25) !important;
-    }
-    .stSlider span[data-testid="stSliderLabel"] {
-        color: var(--visible-text-color) !important; 
-        font-weight: bold;
-        background-color: rgba(0,0,0,0.4) !important; /* Darker, more translucent bg for value */
-        padding: 3px 6px !important; /* Slightly more padding */
-        border-radius: 4px !important; /* More rounded */
-    }
-    .stSlider span[data-testid="stTickBarMin"], 
-    .stSlider span[data-testid="stTickBarMax"] {
-        color: var(--subheader-color) !important; 
-    }
-
+# --- Custom CSS for Dark Theme & Modern UI (css/*.css, merged and minified once per process) ---
+stylesheet.inject()
 
-    /* --- Button Styling --- */
-    .stButton>button {
-        font-size: 17px;
-        font-weight: bold;
-        padding: 14px 30px;
-        border-radius: var(--border-radius);
-        background-color: var(--primary-color);
-        color: white;
-        border: none;
-        transition: background-color 0.2s ease, transform 0.1s ease;
-        box-shadow: var(--box-shadow);
-        width: 100%;
-    }
-    .stButton>button:hover {
-        background-color: var(--primary-hover-color);
-        color: white;
-        transform: translateY(-2px);
-    }
-    .stButton>button:active {
-        background-color: var(--primary-active-color);
-        transform: translateY(0px);
-    }
 
-    /* --- Card Styling --- */
-    .result-card {
-        background-color: var(--card-background-color);
-        padding: 30px;
-        border-radius: var(--border-radius);
-        margin-bottom: 30px;
-        box-shadow: var(--box-shadow);
-        border: 1px solid var(--input-border-color);
-    }
-    
-    /* --- Expander Styling --- */
-    .stExpander {
-        border: 1px solid var(--input-border-color) !important;
-        border-radius: var(--border-radius) !important;
-        box-shadow: none !important;
-        background-color: var(--card-background-color) !important;
-    }
-    .stExpander header {
-        background-color: transparent !important;
-        font-size: 1.2em !important;
-        font-weight: bold !important;
-        color: var(--primary-color) !important;
-        border-radius: var(--border-radius) var(--border-radius) 0 0 !important;
-        padding: 15px 20px !important;
-        border-bottom: 1px solid var(--input-border-color);
-    }
-    .stExpander header:hover {
-        background-color: rgba(0,169,255,0.1) !important;
-    }
-    .stExpander>div>div { 
-        padding: 20px !important;
-    }
+# --- Input Form Fields ---
+def field_range(name):
+    """min_value, max_value and step of the widget for field ``name``, from fields.FIELDS."""
+    field = FIELDS[name]
+    return {"min_value": field.low, "max_value": field.high, "step": field.step}
 
-    /* --- Progress Bar Styling in Expander --- */
-    .stProgress > div > div > div > div {
-        background-image: linear-gradient(to right, var(--primary-color), var(--primary-hover-color));
-        border-radius: var(--border-radius);
-    }
-    .stProgress {
-        border-radius: var(--border-radius);
-        background-color: var(--slider-track-color);
-    }
 
-    /* --- Sidebar Styling --- */
-    [data-testid="stSidebar"] {
-        background-color: var(--sidebar-background-color);
-        padding: 1.5rem 1rem;
-    }
-    .sidebar-title {
-        font-size: 28px;
-        font-weight: 700;
-        color: var(--primary-color);
-        margin-bottom: 10px;
-        text-align: center;
-    }
-    .sidebar-subtitle {
-        font-size: 15px;
-        color: var(--subheader-color);
-        margin-bottom: 25px;
-        line-height: 1.6;
-        text-align: center;
-    }
-    hr.custom-hr {
-        border-top: 1px solid var(--input-border-color);
-        margin: 30px 0;
-    }
-    .sidebar-link {
-        color: var(--primary-color) !important;
-        text-decoration: none !important;
-        font-weight: 500;
-        display: block;
-        padding: 5px 0;
-    }
-    .sidebar-link:hover {
-        text-decoration: underline !important;
-        color: #ffffff !important;
-    }
-    .sidebar-footer-text {
-        font-size: 13px;
-        color: var(--subheader-color);
-        text-align: center;
-    }
-    
-    /* --- Metric Styling --- */
-    [data-testid="stMetric"] {
-        background-color: var(--input-background-color);
-        border: 1px solid var(--input-border-color);
-        padding: 15px;
-        border-radius: var(--border-radius);
-        box-shadow: var(--box-shadow);
-    }
-    [data-testid="stMetricLabel"] {
-        font-size: 0.95em;
-        color: var(--subheader-color) !important; 
-        font-weight: 500;
-    }
-    [data-testid="stMetricValue"] {
-        font-size: 2.2em;
-        font-weight: 700;
-        color: var(--visible-text-color) !important; 
-    }
-    [data-testid="stMetricDelta"] { 
-        font-size: 1.1em !important; 
-        font-weight: bold !important;
-    }
-    
-    /* --- Specific Score Badge (if used directly in markdown) --- */
-    .score-badge { 
-        font-size: 2.5em;
-        font-weight: bold;
-        color: var(--primary-color); 
-    }
-    .interpretation-text {
-        font-size: 1.1em;
-        color: var(--text-color);
-        line-height: 1.6;
-    }
-    :root {
-        --dropdown-bg: #1e1e1e;
-        --dropdown-text: #ffffff;
-        --dropdown-border: #444444;
-        --dropdown-hover: #2e2e2e;
-    }
-    
-    /* Dropdown container */
-    .stSelectbox > div[data-baseweb="select"] {
-        background-color: var(--dropdown-bg) !important;
-        border-color: var(--dropdown-border) !important;
-    }
-    
-    /* Selected value */
-    .stSelectbox > div[data-baseweb="select"] > div > div {
-        background-color: var(--dropdown-bg) !important;
-        color: var(--dropdown-text) !important;
-    }
-    
-    /* Dropdown options */
-    .stSelectbox [role="listbox"] > div {
-        background-color: var(--dropdown-bg) !important;
-        color: var(--dropdown-text) !important;
-    }
-    
-    /* Hover state for dropdown options */
-    .stSelectbox [role="listbox"] > div:hover {
-        background-color: var(--dropdown-hover) !important;
-    }
-    
-    /* Text color for dropdown options */
-    .stSelectbox [role="listbox"] > div > div {
-        color: var(--dropdown-text) !important;
-    }
-    
-    /* Arrow icon color */
-    .stSelectbox svg {
-        fill: var(--dropdown-text) !important;
-    }
-    /* --- Alert Styling --- */
-    .stAlert {
-        border-radius: var(--border-radius);
-        padding: 1rem;
-        font-size: 1.05em;
-    }
-    /* Enhance the overall result card to clearly show the main WBS */
-    .overall-wbs-card {
-        background-color: var(--card-background-color);
-        padding: 40px; /* More padding for importance */
-        border-radius: var(--border-radius);
-        margin-bottom: 30px;
-        box-shadow: var(--box-shadow);
-        border: 2px solid var(--primary-color); /* Stronger border */
-        position: relative;
-        overflow: hidden; /* For potential background effects */
-    }
-    .overall-wbs-card::before {
-        content: '';
-        position: absolute;
-        top: -20px;
-        left: -20px;
-        right: -20px;
-        bottom: -20px;
-        background: radial-gradient(circle at center, rgba(0,169,255,0.08) 0%, rgba(0,0,0,0) 70%);
-        opacity: 0.7;
-        z-index: 0;
-        pointer-events: none;
-    }
-    .overall-wbs-card h2, .overall-wbs-card h3, .overall-wbs-card .score-badge, .overall-wbs-card .interpretation-text {
-        position: relative; /* Bring text above pseudo-element */
-        z-index: 1;
-    }
-    
-    /* --- Additions/Modifications to your existing CSS within the <style> block --- */
-
-/* Ensure radio button labels are properly aligned and spaced */
-.stRadio > div[role="radiogroup"] > label {
-    display: flex; /* Use flexbox for alignment */
-    align-items: center; /* Vertically center the radio circle and text */
-    margin-bottom: 0.8em; /* Add some space between radio options */
-    padding: 0.2em 0; /* Minimal padding */
-}
-
-/* Adjust the text part of the radio button label */
-.stRadio > div[role="radiogroup"] > label > div > div:last-child {
-    margin-left: 8px; /* Space between the radio circle and the text */
-    /* Remove any conflicting padding/margin if previously set generically */
-    padding: 0 !important; /* Force no padding on the text content */
-    margin: 0 !important; /* Force no margin on the text content */
-    line-height: 1.5; /* Ensure proper line height */
-}
+# --- Analysis (cached across sessions) ---
+@st.cache_resource
+def get_result_cache():
+    """One ResultCache per server process, shared by every session."""
+    return ResultCache(
+        max_entries=int(os.environ.get("WELLBEING_CACHE_MAX_ENTRIES", 1024)),
+        ttl_seconds=float(os.environ.get("WELLBEING_CACHE_TTL_SECONDS", 3600)),
+    )
 
-/* General button/interactive element text sizing, if it's affecting label text */
-/* This is a more general rule, use carefully */
-/*
-.stButton > button, .stDownloadButton > button, .stLinkButton > a,
-.stRadio > div[role="radiogroup"] > label > div > div:last-child {
-    font-size: 1em; // Ensure consistent font size for interactive labels if needed
+# --- Score History ---
+# Trend window choices in the form -> days of history shown (None = all).
+TREND_WINDOWS = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+# Downsampling choices for long trends -> downsample.METHODS name.
+TREND_DOWNSAMPLING = {"Keep line shape (LTTB)": "lttb", "Keep peaks & dips (min/max)": "minmax"}
+# A history key is secrets.token_urlsafe(HISTORY_KEY_BYTES); shorter or hand-picked ?history= values are replaced.
+HISTORY_KEY_BYTES = 16
+HISTORY_KEY_PATTERN = re.compile(r"[A-Za-z0-9_-]{22,}")
+
+@st.cache_resource
+def get_history_store():
+    """One HistoryStore per server process, shared by every session."""
+    return HistoryStore(os.environ.get("WELLBEING_HISTORY_DB", "wellbeing_history.db"))
+
+# --- Population Percentiles ---
+# Below this many submissions in a group, its percentile is not shown.
+MIN_PERCENTILE_GROUP = 20
+
+@st.cache_resource
+def get_percentile_service():
+    """One PercentileService per server process; processes share counts through WELLBEING_SKETCH_DIR."""
+    return PercentileService(os.environ.get("WELLBEING_SKETCH_DIR", "wellbeing_sketches"))
+
+def standing_text(entry, cohort):
+    """ "Higher than 63% of everyone · 58% of Female 30-39" from a PercentileService.standing() entry; None for small groups."""
+    parts = []
+    for (pct, n), group in ((entry["all"], "everyone"), (entry["cohort"], cohort)):
+        if pct is not None and n >= MIN_PERCENTILE_GROUP:
+            parts.append(f"{pct:.0f}% of {group}")
+    return f"Higher than {' · '.join(parts)}" if parts else None
+
+# --- People Like You ---
+NEIGHBORS = 20
+# Below this many similar people who came back later, their progress is not summarized.
+MIN_RETURNING_NEIGHBORS = 3
+
+@st.cache_resource
+def get_neighbor_index():
+    """One NeighborIndex per server process, kept in step with the history database and saved to WELLBEING_NEIGHBOR_INDEX."""
+    from neighbors import NeighborIndex  # NumPy-backed; loaded on first submit
+    return NeighborIndex.load(os.environ.get("WELLBEING_NEIGHBOR_INDEX", "wellbeing_neighbors.npz"))
+
+# --- Personas ---
+@st.cache_resource(max_entries=2)
+def get_persona_model(path, modified):
+    """The PersonaModel the clustering job (personas.py) last saved at ``path``; a new ``modified`` time reloads it."""
+    from personas import PersonaModel  # NumPy-backed; loaded on first submit
+    return PersonaModel.load(path)
+
+# --- What-if Levers ---
+TOP_LEVERS = 3
+PILLAR_NAMES = {"p_score": "Physical", "m_score": "Mental", "e_score": "Emotional"}
+
+# --- Pillar Waterfalls ---
+# Step label of every batch.PILLAR_TERMS term.
+CONTRIBUTION_LABELS = {
+    "exercise": "Exercise", "sleep": "Sleep", "waist": "Waist-to-height", "diet": "Diet", "hydration": "Hydration",
+    "stress": "Stress", "focus": "Focus", "mindfulness": "Mindfulness", "growth": "Growth & purpose", "screen": "Screen time",
+    "social": "Social", "mood": "Mood", "resilience": "Resilience", "gratitude": "Gratitude", "nature": "Nature",
 }
-*/
-</style>
-""", unsafe_allow_html=True)
-
-
-# --- Input Form Modifications ---
-
-# In the "Physical Health" section (col_p2, under Sleep & Hydration), add:
-# st.markdown("##### **Sleep & Hydration**")
-# sleep_h = st.slider("Avg. Sleep Hours/Night", 0.0, 12.0, 7.5, 0.5, key="sleep_h")
-# sleep_q = st.slider("Self-Reported Sleep Quality (1=Very Poor, 10=Excellent)", 1, 10, 7, key="sleep_q")
-# Add this new input:
-# bedtime_consistency_score = st.slider("Bedtime Consistency (1=Very Irregular, 10=Very Regular)", 1, 10, 7, key="bedtime_consistency_score", help="How consistent are your bed and wake times daily?")
-# water_liters = st.number_input("Avg. Water Intake (Liters/Day)", 0.0, 10.0, 2.5, 0.1, key="water_liters")
-
-
-# In the "Mental Acuity" section (no new inputs here, but `l_stress` will be used for burnout)
-# The existing inputs are sufficient for the new burnout calculation.
-# screen_hrs = st.slider("Avg. Recreational Screen Time/Day (hrs)", 0.0, 12.0, 3.0, 0.5, key="screen_hrs", help="Time on social media, TV, games etc. (excluding work/study). Select 12 if 12+ hours.")
-
-# In the "Emotional Vitality" section (no new inputs needed for current plan)
-
-# Add these new imports at the top
-# import numpy as np # For potential future numerical operations or statistical smoothing
-
-# --- New Calculation Functions ---
-
-
-# Function to convert hex color to rgba with alpha for Plotly
-def hex_to_rgba(hex_color, alpha):
-    hex_color = hex_color.lstrip('#')
-    if len(hex_color) == 6:
-        r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        return f'rgba({r},{g},{b},{alpha})'
-    return f'rgba(255,255,255,{alpha})' # Fallback to white with alpha if hex is invalid
-
-CHART_TEXT_COLOR = "#e0e0e0" 
-CHART_SUBTEXT_COLOR = "#b0b0c0" 
-CHART_GRID_COLOR = "rgba(255,255,255,0.1)" # Slightly more visible grid
-CHART_LINE_COLOR = "rgba(255,255,255,0.2)" 
-CHART_PRIMARY_COLOR = "#00a9ff" 
-CHART_PHYSICAL_COLOR = "#1f77b4" 
-CHART_MENTAL_COLOR = "#ff7f0e"   
-CHART_EMOTIONAL_COLOR = "#2ca02c" 
+# (pillar, figure suffix, chart color) per pillar expander.
+PILLAR_WATERFALLS = (
+    ("p_score", "physical", CHART_PHYSICAL_COLOR), ("m_score", "mental", CHART_MENTAL_COLOR),
+    ("e_score", "emotional", CHART_EMOTIONAL_COLOR),
+)
 
-def create_wellbeing_radar_chart(p_score, m_score, e_score):
-    categories = ['Physical Health', 'Mental Health', 'Emotional Health']
-    scores = [p_score, m_score, e_score]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatterpolar(
-        r=scores + [scores[0]], 
-        theta=categories + [categories[0]],
-        fill='toself',
-        name='Well-being Scores',
-        line=dict(color=CHART_PRIMARY_COLOR, width=3),
-        fillcolor=hex_to_rgba(CHART_PRIMARY_COLOR, 0.3) # Slightly more opaque fill
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            bgcolor='rgba(0,0,0,0)', 
-            radialaxis=dict(
-                visible=True, range=[0, 100], angle=90,
-                tickfont=dict(size=12, color=CHART_SUBTEXT_COLOR), # Increased tick font size
-                gridcolor=CHART_GRID_COLOR, 
-                linecolor=CHART_LINE_COLOR,
-                showline=True, showticklabels=True
-            ),
-            angularaxis=dict(
-                tickfont=dict(size=14, color=CHART_TEXT_COLOR, family="Roboto, sans-serif", weight="bold"), # Increased tick font size
-                direction="clockwise",
-                gridcolor=CHART_GRID_COLOR, 
-                linecolor=CHART_LINE_COLOR
-            )
-        ),
-        showlegend=False, height=400,
-        margin=dict(l=70, r=70, t=70, b=70), # Increased margins for labels
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    return fig
-
-def create_gauge_chart(score, title, pillar_color_hex):
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=score,
-        title={'text': title, 'font': {'size': 20, 'family': "Roboto, sans-serif", 'color': CHART_TEXT_COLOR}},
-        number={'font': {'size': 44, 'family': "Roboto, sans-serif", 'color': pillar_color_hex}, 'suffix': "%"},
-        gauge={
-            'axis': {'range': [0, 100], 'tickwidth': 2, 'tickcolor': CHART_SUBTEXT_COLOR, 'tickfont': {'size':12, 'color':CHART_SUBTEXT_COLOR}}, # Added tickfont
-            'bar': {'color': pillar_color_hex, 'thickness': 0.4},
-            'bgcolor': "rgba(255,255,255,0.05)",
-            'borderwidth': 0,
-            'steps': [ 
-                {'range': [0, 55], 'color': hex_to_rgba("#dc3545",0.7)}, 
-                {'range': [55, 70], 'color': hex_to_rgba("#ffc107",0.7)},
-                {'range': [70, 85], 'color': hex_to_rgba("#17a2b8",0.7)},
-                {'range': [85, 100], 'color': hex_to_rgba("#28a745",0.7)} 
-            ],
-        }
-    ))
-    fig.update_layout(height=250, margin=dict(l=30, r=30, t=60, b=30), paper_bgcolor='rgba(0,0,0,0)')
-    return fig
-
-def create_time_series_chart(dummy_data=True):
-    if dummy_data:
-        dates = pd.to_datetime([datetime(2024, 5, i) for i in range(1, 28, 3)])
-        base_score = 65
-        trend = [base_score + i*0.5 + math.sin(i/2)*3 for i in range(len(dates))]
-        scores = [max(40, min(90, s + (hash(d.day) % 10 - 5))) for i, (d,s) in enumerate(zip(dates,trend))]
-        df = pd.DataFrame({'Date': dates, 'WBS': scores})
-    else:
-        df = pd.DataFrame({'Date': [datetime.now()], 'WBS': [0]})
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df['Date'], y=df['WBS'], mode='lines+markers', name='WBS Over Time',
-        line=dict(color=CHART_PRIMARY_COLOR, width=2.5),
-        marker=dict(color=hex_to_rgba(CHART_PRIMARY_COLOR,0.9), size=8, line=dict(width=1.5, color=st.get_option("theme.backgroundColor"))) 
-    ))
-    fig.update_layout(
-        title=dict(text="Well-Being Score Trend (Sample)", font=dict(size=18, color=CHART_TEXT_COLOR)),
-        xaxis_title=None, yaxis_title="WBS",
-        xaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12)), # Increased tick font size
-        yaxis=dict(gridcolor=CHART_GRID_COLOR, tickfont=dict(color=CHART_SUBTEXT_COLOR, size=12), range=[min(30, df['WBS'].min()-5 if not df.empty else 30), max(100, df['WBS'].max()+5 if not df.empty else 100)]), # Increased tick font size
-        height=350, margin=dict(l=50, r=30, t=70, b=50), # Adjusted margins
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
-    )
-    return fig
-
-
-# --- Calculation Functions ---
-def calculate_bmi(weight_kg, height_cm):
-    if not weight_kg or not height_cm or height_cm == 0: return None
-    height_m = height_cm / 100.0
-    try:
-        bmi = weight_kg / (height_m ** 2)
-        return round(bmi, 1) 
-    except ZeroDivisionError:
-        return None
-
-def calculate_bmr(weight_kg, height_cm, age, gender):
-    if not all([weight_kg, height_cm, age is not None, gender]): return None
-    try:
-        weight_kg, height_cm, age = float(weight_kg), float(height_cm), int(age)
-        if gender.lower() == 'male':
-            bmr = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
-        elif gender.lower() == 'female':
-            bmr = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
-        else: 
-             bmr_m = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
-             bmr_f = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
-             bmr = (bmr_m + bmr_f) / 2
-        return round(bmr)
-    except (TypeError, ValueError):
-        return None
-
-def calculate_tdee(bmr, activity_multiplier):
-    if bmr is None or activity_multiplier is None: return None
-    return round(bmr * activity_multiplier)
-
-def calculate_wthr_score(waist_cm, height_cm):
-    if not waist_cm or not height_cm or height_cm == 0: return 0.0
-    wthr_value = waist_cm / height_cm
-    if wthr_value <= 0.4: return 1.0
-    if wthr_value >= 0.6: return 0.0
-    return round((0.6 - wthr_value) / 0.2, 3)
-
-def calculate_dqs(fruit_veg, whole_grains, processed_foods):
-    term1_fruit_veg = min(1.0, fruit_veg / 8.0)
-    term2_whole_grains = whole_grains / 5.0
-    term3_processed = processed_foods / 5.0 
-    return round(min(1.0, (term1_fruit_veg + term2_whole_grains + term3_processed) / 3.0), 3)
-
-def calculate_hs(water_liters, weight_kg):
-    if not water_liters or not weight_kg or weight_kg == 0: return 0.0
-    target_water = weight_kg * 0.033
-    if target_water == 0: return 0.0
-    return round(min(1.0, water_liters / target_water), 3)
-
-def calculate_sqs(sleep_h, sleep_q):
-    term1_sleep_duration = min(1.0, sleep_h / 8.0)
-    term2_sleep_quality = sleep_q / 10.0
-# The new calculate_sqs with bedtime_consistency_score is defined above, so you can remove or comment out this old version if not used elsewhere.
-# def calculate_sqs(sleep_h, sleep_q):
-#     term1_sleep_duration = min(1.0, sleep_h / 8.0)
-#     term2_sleep_quality = sleep_q / 10.0
-#     return round((term1_sleep_duration + term2_sleep_quality) / 2.0, 3)
-
-def calculate_p_score(exercise_score, sqs, wthr_score, dqs, hs):
-    raw_p = (0.30 * exercise_score) + (0.25 * sqs) + (0.20 * wthr_score) + (0.20 * dqs) + (0.05 * hs)
-    return min(100.0, round(raw_p * 100, 1))
-
-def calculate_m_score(l_stress, a_focus, md_mindful, learn_hrs, purpose_score, screen_hrs):
-    stress_s = (10.0 - l_stress + 1.0) / 10.0
-    focus_s = min(1.0, a_focus / 6.0)
-    mindful_s = md_mindful / 7.0
-    pgs = (min(1.0, learn_hrs / 5.0) + (purpose_score / 10.0)) / 2.0
-    dws = max(0.0, (5.0 - screen_hrs) / 5.0)
-    raw_m = (0.25 * stress_s) + (0.20 * focus_s) + (0.20 * mindful_s) + (0.20 * pgs) + (0.15 * dws)
-    return min(100.0, round(raw_m * 100, 1))
-
-def calculate_e_score(c_social, i_interactions, sm_mood, resilience, gratitude, nature_hrs):
-    i_interactions_capped = min(float(i_interactions), 14.0) 
-    scs = ((c_social / 10.0) + (i_interactions_capped / 14.0)) / 2.0
-    mood_s = sm_mood / 10.0
-    rcs = resilience / 10.0
-    grat_s = gratitude / 7.0
-    nature_s = min(1.0, nature_hrs / 3.0)
-    raw_e = (0.25 * scs) + (0.20 * mood_s) + (0.25 * rcs) + (0.15 * grat_s) + (0.15 * nature_s)
-    return min(100.0, round(raw_e * 100, 1))
-
-def calculate_wbs(p, m, e):
-    return round((0.4 * p) + (0.3 * m) + (0.3 * e), 1)
-
-def get_wbs_interpretation(wbs_score):
-    if wbs_score is None: return "N/A", "Please complete all inputs to calculate your score.", "--subheader-color" 
-    if wbs_score >= 85:
-        return "Optimal", "Exceptional! Your well-being is thriving. Continue nurturing these positive habits.", "--success-color"
-    elif wbs_score >= 70:
-        return "Good", "You're doing well! Consider small tweaks in lower-scoring areas for even greater vitality.", "--info-color"
-    elif wbs_score >= 55:
-        return "Needs Improvement", "Your well-being shows potential for growth. Let's identify areas to focus on for a healthier you.", "--warning-color"
-    else:
-        return "At Risk", "Key areas of your well-being need attention. Small, consistent steps can lead to significant improvements.", "--danger-color"
-
-def get_age(dob_date_obj): 
-    if not dob_date_obj: return None
-    today = datetime.now().date()
-    return today.year - dob_date_obj.year - ((today.month, today.day) < (dob_date_obj.month, dob_date_obj.day))
-
-def get_expert_insight(sub_score_percentage, category_name, low_threshold=50, mid_threshold=75):
-    if sub_score_percentage < low_threshold:
-        return f"**🎯 Focus Area: {category_name}** - This significantly impacts your well-being. Try setting one small, achievable goal, like adding a 10-minute walk if it's exercise, or trying a 5-minute meditation for stress."
-    elif sub_score_percentage < mid_threshold:
-        return f"**🌱 Growth Opportunity: {category_name}** - You're on the right track! Consider how you might enhance this. For sleep, could you establish a more consistent bedtime? For diet, perhaps add one more serving of vegetables daily."
-    else:
-        return f"**👍 Strength Area: {category_name}** - Excellent work here! Reflect on what's working well and continue these positive habits. Can you inspire others with your approach to {category_name.lower()}?"
-
-# Function for Activity-Adjusted Protein Needs (simplified for prototype)
-def calculate_protein_needs(weight_kg, activity_level):
-    """
-    Calculates estimated daily protein needs in grams based on weight and activity.
-    Ranges are general guidelines based on common fitness recommendations.
-    """
-    if not weight_kg:
-        return None
-
-    # Grams of protein per kg body weight
-    if activity_level == "Sedentary (Office job, little/no formal exercise)":
-        protein_per_kg = 0.8
-    elif activity_level == "Lightly Active (Light exercise/sports 1-3 days/wk or active job)":
-        protein_per_kg = 1.0
-    elif activity_level == "Moderately Active (Moderate exercise/sports 3-5 days/wk)":
-        protein_per_kg = 1.2
-    elif activity_level == "Very Active (Intense exercise/sports 6-7 days/wk)":
-        protein_per_kg = 1.5
-    else: # "Extra Active (Very intense exercise daily or highly physical job)"
-        protein_per_kg = 1.8
-
-    return round(weight_kg * protein_per_kg)
-
-# Function for Heart Rate Zones (simplified based on max heart rate formula)
-def get_heart_rate_zones(age):
+# --- Goal Planner ---
+GOAL_SCORES = {"Well-Being Score (WBS)": "wbs", "Physical (P)": "p_score", "Mental (M)": "m_score", "Emotional (E)": "e_score"}
+# Habit inputs by label, for the goal planner's pickers.
+HABIT_LABELS = {field.label: name for name, field in FIELDS.items() if field.habit}
+HARD_EFFORT_WEIGHT = 3.0
+
+@st.cache_resource
+def get_goal_cache():
+    """Goal plans by profile and goal (target, score, harder and locked habits), shared by every session."""
+    return ResultCache(max_entries=256, ttl_seconds=3600)
+
+# --- What-if Explorer ---
+# Every score input by label, for the explorer's axis pickers.
+INPUT_LABELS = {field.label: name for name, field in FIELDS.items()}
+EXPLORE_DEFAULT_AXES = ("sleep_h", "screen_hrs")
+
+@st.cache_resource
+def get_surface_cache():
+    """WBS surfaces by input pair and the other inputs' hash, shared by every session."""
+    return ResultCache(max_entries=256, ttl_seconds=3600)
+
+@st.fragment
+def explore_panel(score_inputs, current_wbs):
     """
-    Calculates estimated max heart rate and target zones for exercise.
-    Based on 220 - age for MHR.
+    Heatmap of the WBS over two inputs the user picks; reruns on its own when a picker changes.
+    Nothing is built until the user opens it, so a submit does not pay for a chart few look at.
     """
-    if not age or age <= 0:
-        return None, None, None
-
-    mhr = 220 - age
-    # Common zones:
-    # Zone 2 (Moderate): 60-70% of MHR (Fat burning, aerobic base)
-    # Zone 3 (Aerobic): 70-80% of MHR (Improved cardiovascular fitness)
-    # Zone 4 (Threshold): 80-90% of MHR (High intensity, anaerobic threshold)
-    zone2_low = round(mhr * 0.60)
-    zone2_high = round(mhr * 0.70)
-    zone3_low = round(mhr * 0.70)
-    zone3_high = round(mhr * 0.80)
-    zone4_low = round(mhr * 0.80)
-    zone4_high = round(mhr * 0.90)
-
-    return f"{zone2_low}-{zone2_high}", f"{zone3_low}-{zone3_high}", f"{zone4_low}-{zone4_high}"
-
-# Function for Circadian Rhythm Alignment (qualitative for now)
-def calculate_circadian_alignment_score(wake_time, sleep_consistency_score):
-    """
-    Scores based on consistency and alignment with natural light cycles.
-    Higher score for consistent early wake-up and good sleep consistency.
+    if not st.toggle("Show the explorer", key="explore_open"):
+        return
+    labels = list(INPUT_LABELS)
+    col_x, col_y = st.columns(2)
+    x_label = col_x.selectbox("Across", labels, index=labels.index(FIELDS[EXPLORE_DEFAULT_AXES[0]].label), key="explore_x")
+    y_label = col_y.selectbox("Up", labels, index=labels.index(FIELDS[EXPLORE_DEFAULT_AXES[1]].label), key="explore_y")
+    x, y = INPUT_LABELS[x_label], INPUT_LABELS[y_label]
+    if x == y:
+        st.info("Pick two different inputs to see how they play together.")
+        return
+    with TIMER.stage("surface"):
+        from surface import surface_key, wbs_surface  # NumPy-backed; loaded on first use
+        x_values, y_values, z = get_surface_cache().get_or_compute(
+            surface_key(score_inputs, x, y), lambda: wbs_surface(score_inputs, x, y)
+        )
+    with TIMER.stage("chart.heatmap"):
+        figure = create_heatmap_chart(x_values, y_values, z, x_label, y_label, score_inputs[x], score_inputs[y], current_wbs)
+    show_chart(figure, use_container_width=True)
+
+def history_user_id():
     """
-    score = 0
-    if wake_time:
-        wake_hour = wake_time.hour
-        # Ideal wake time is generally considered before 8 AM
-        if wake_hour >= 5 and wake_hour <= 7:
-            score += 0.5
-        elif wake_hour >= 8 and wake_hour <= 9:
-            score += 0.2
-            
-    score += (sleep_consistency_score / 10) * 0.5 # Scale 1-10 to 0-0.5
-    return round(score * 100, 1) # Return as percentage
+    The key the user's history is stored under: a random token kept in the page's
+    address (?history=), so the bookmarked link is what brings the history back.
 
-# Function to assess burnout risk (conceptual, based on stress, sleep, work focus)
-def calculate_burnout_risk(l_stress, sleep_h, a_focus_hours):
+    A missing or guessable ?history= gets a fresh token (remembered for the session
+    in case the address is not sent back). The name in the form is only a label.
     """
-    Estimates burnout risk based on stress, sleep duration, and focused work.
-    Higher stress, less sleep, and excessive focused work increase risk.
-    Scores 0-100, where higher is more risk.
+    key = st.query_params.get("history", "")
+    if not HISTORY_KEY_PATTERN.fullmatch(key):
+        key = st.session_state.get("history_key") or secrets.token_urlsafe(HISTORY_KEY_BYTES)
+        st.query_params["history"] = key
+    st.session_state["history_key"] = key
+    return key
+
+def build_analysis(weight_kg, height_cm, waist_cm, gender, f_exercise_freq, intensity, activity_str,
+                   sleep_h, sleep_q, bedtime_consistency_score, water_liters,
+                   fruit_veg_servings, whole_grains_freq, processed_freq,
+                   l_stress, md_mindful_days, a_focus_hours, learn_hrs, purpose_score, screen_hrs,
+                   c_social_connection, i_meaningful_interactions, sm_mood_stability,
+                   resilience_score, gratitude_days, nature_hrs, age):
     """
-    stress_factor = (l_stress / 10.0) * 0.4 # More stress, higher factor
-    sleep_factor = (1.0 - (min(sleep_h, 8.0) / 8.0)) * 0.3 # Less sleep, higher factor (ideal 7-8 hrs)
-    work_factor = (max(0.0, a_focus_hours - 8.0) / 4.0) * 0.3 # Over 8 hrs focused work, increases factor
-
-    raw_risk = (stress_factor + sleep_factor + work_factor)
-    return min(100.0, round(raw_risk * 100, 1))
-
-# --- Enhance existing score functions for nuance ---
-def calculate_sqs(sleep_h, sleep_q, bedtime_consistency_score): # Added bedtime_consistency_score
-    term1_sleep_duration = min(1.0, sleep_h / 8.0) # Ideal 8 hours
-    term2_sleep_quality = sleep_q / 10.0
-    term3_consistency = bedtime_consistency_score / 10.0 # New factor
-    return round((term1_sleep_duration + term2_sleep_quality + term3_consistency) / 3.0, 3) # Average 3 terms
-
-def calculate_exercise_score(frequency_per_week, intensity_level):
+    Computes every score, insight text and figure the results page shows.
+    The chart functions return plain figure dicts, so one result can be
+    shared read-only by all sessions through the result cache.
     """
-    Calculates an exercise score based on frequency and intensity.
-    Scores are normalized between 0 and 1.
+    # The score inputs as one dict, before any other local exists.
+    score_inputs = {name: value for name, value in locals().items() if name in FIELDS}
+
+    # --- Core Calculations ---
+    with TIMER.stage("core_calculations"):
+        bmi_calc = calculate_bmi(weight_kg, height_cm)
+        bmr_calc = calculate_bmr(weight_kg, height_cm, age, gender)
+        tdee_calc = calculate_tdee(bmr_calc, ACTIVITY_MAP[activity_str])
+        wthr_calc_value = (waist_cm / height_cm) if height_cm > 0 else 0
+
+        # --- Normalized Score Components (0-1 range) ---
+        wthr_score_norm = calculate_wthr_score(waist_cm, height_cm)
+        dqs_norm = calculate_dqs(fruit_veg_servings, whole_grains_freq, processed_freq)
+        hs_norm = calculate_hs(water_liters, weight_kg)
+        exercise_score_norm = calculate_exercise_score(f_exercise_freq, intensity)
+        sqs_norm = calculate_sqs(sleep_h, sleep_q, bedtime_consistency_score)
+
+    # --- New Advanced Metric Calculations ---
+    with TIMER.stage("advanced_metrics"):
+        protein_needs_grams = calculate_protein_needs(weight_kg, activity_str)
+        zone2, zone3, zone4 = get_heart_rate_zones(age)
+
+        # For circadian alignment, ideally you'd have a user input for wake time.
+        # For this prototype, we'll use a placeholder (e.g., 7 AM).
+        daily_wake_time_for_calc = datetime.now().replace(hour=7, minute=0).time()
+        circadian_alignment_score = calculate_circadian_alignment_score(
+            daily_wake_time_for_calc,
+            bedtime_consistency_score
+        )
+        burnout_risk_score = calculate_burnout_risk(l_stress, sleep_h, a_focus_hours)
+
+    # --- Main Pillar Scores (0-100%) ---
+    with TIMER.stage("pillar_scores"):
+        p_score = calculate_p_score(exercise_score_norm, sqs_norm, wthr_score_norm, dqs_norm, hs_norm)
+        m_score = calculate_m_score(l_stress, a_focus_hours, md_mindful_days, learn_hrs, purpose_score, screen_hrs)
+        e_score = calculate_e_score(c_social_connection, i_meaningful_interactions, sm_mood_stability, resilience_score, gratitude_days, nature_hrs)
+
+        # --- Overall Well-Being Score ---
+        wbs_score = calculate_wbs(p_score, m_score, e_score)
+        level, interpretation, level_color_css_var = get_wbs_interpretation(wbs_score)
+
+    with TIMER.stage("insights"):
+        insights = {
+            "physical": get_expert_insight_detailed(p_score, "Physical Health"),
+            "mental": get_expert_insight_detailed(m_score, "Mental Health"),
+            "emotional": get_expert_insight_detailed(e_score, "Emotional Health"),
+        }
+
+    # --- One-step what-ifs for every input, scored as one batch ---
+    with TIMER.stage("sensitivity"):
+        from whatif import sensitivity  # NumPy-backed; imported on the first submit, not the first page view
+        levers = sensitivity(score_inputs)
+
+    # --- Likely ranges: self-reported inputs are noisy, so sample them ---
+    with TIMER.stage("uncertainty"):
+        from uncertainty import score_intervals
+        intervals = {name: (low, high) for name, (low, _, high) in score_intervals(score_inputs).items()}
+
+    # --- Figures ---
+    figures = {}
+    with TIMER.stage("chart.radar"):
+        figures["radar"] = create_wellbeing_radar_chart(
+            p_score, m_score, e_score, [intervals["p_score"], intervals["m_score"], intervals["e_score"]]
+        )
+    with TIMER.stage("chart.gauge_physical"):
+        figures["gauge_physical"] = create_gauge_chart(p_score, "Physical Health", CHART_PHYSICAL_COLOR, intervals["p_score"])
+    with TIMER.stage("chart.gauge_mental"):
+        figures["gauge_mental"] = create_gauge_chart(m_score, "Mental Health", CHART_MENTAL_COLOR, intervals["m_score"])
+    with TIMER.stage("chart.gauge_emotional"):
+        figures["gauge_emotional"] = create_gauge_chart(e_score, "Emotional Health", CHART_EMOTIONAL_COLOR, intervals["e_score"])
+
+    # --- What each term adds to its pillar, as waterfalls ---
+    with TIMER.stage("contributions"):
+        from batch import PILLAR_TERMS, pillar_contributions
+        contributions = pillar_contributions(score_inputs, {
+            "exercise_score": exercise_score_norm, "sqs": sqs_norm, "wthr_score": wthr_score_norm, "dqs": dqs_norm, "hs": hs_norm,
+        })
+    pillar_scores = {"p_score": p_score, "m_score": m_score, "e_score": e_score}
+    for pillar, suffix, color in PILLAR_WATERFALLS:
+        with TIMER.stage(f"chart.waterfall_{suffix}"):
+            terms = PILLAR_TERMS[pillar]
+            figures[f"waterfall_{suffix}"] = create_contribution_waterfall(
+                [CONTRIBUTION_LABELS[term] for term, _ in terms],
+                [float(contributions[f"{pillar[0]}_{term}"]) for term, _ in terms],
+                [weight for _, weight in terms], pillar_scores[pillar], color,
+            )
 
-    Parameters:
-    - frequency_per_week (int): Number of days per week exercised (0-7).
-    - intensity_level (str): Intensity of exercise ("Light", "Moderate", "Vigorous").
+    return {
+        "bmi_calc": bmi_calc, "tdee_calc": tdee_calc, "wthr_calc_value": wthr_calc_value,
+        "protein_needs_grams": protein_needs_grams, "zones": (zone2, zone3, zone4),
+        "circadian_alignment_score": circadian_alignment_score, "burnout_risk_score": burnout_risk_score,
+        "p_score": p_score, "m_score": m_score, "e_score": e_score, "wbs_score": wbs_score,
+        "interpretation": (level, interpretation, level_color_css_var),
+        "levers": levers,
+        "intervals": intervals,
+        "sub_scores": {
+            "exercise_score": exercise_score_norm, "sqs": sqs_norm, "wthr_score": wthr_score_norm,
+            "dqs": dqs_norm, "hs": hs_norm,
+        },
+        "insights": insights,
+        "figures": figures,
+    }
 
-    Returns:
-    - float: Normalized exercise score (0.0 to 1.0).
-    """
-    score = 0.0
-
-    # Base score on frequency
-    if frequency_per_week == 0:
-        score = 0.0
-    elif frequency_per_week <= 2:
-        score = 0.3
-    elif frequency_per_week <= 4:
-        score = 0.6
-    elif frequency_per_week <= 6:
-        score = 0.85
-    else: # 7 days
-        score = 1.0
-
-    # Adjust score based on intensity
-    if intensity_level == "Light":
-        score *= 0.8
-    elif intensity_level == "Moderate":
-        score *= 1.0
-    elif intensity_level == "Vigorous":
-        score *= 1.2 # Can exceed 1.0 initially, will be capped by min(1.0, score)
-
-    # Cap the score at 1.0 to ensure normalization
-    return min(1.0, score)
-
-# --- Expert Insight Refinement (more specific, multi-point advice) ---
-def get_expert_insight_detailed(sub_score_percentage, category_name, low_threshold=50, mid_threshold=75):
-    if sub_score_percentage < low_threshold:
-        return f"""
-        **🎯 Focus Area: {category_name}**
-        Your score suggests this area needs significant attention. Prioritize **one small, consistent change**:
-        * **Physical:** Start with a 15-minute walk daily, or swap one sugary drink for water.
-        * **Mental:** Try 5 minutes of mindful breathing, or limit social media before bed.
-        * **Emotional:** Reach out to one friend, or list 3 things you're grateful for each morning.
-        """
-    elif sub_score_percentage < mid_threshold:
-        return f"""
-        **🌱 Growth Opportunity: {category_name}**
-        You're building positive momentum! Let's elevate this area with a **next-level goal**:
-        * **Physical:** Aim for 30 minutes of moderate exercise 3-4 times/week, or add a daily serving of whole grains.
-        * **Mental:** Explore guided meditation apps, or dedicate specific "deep work" blocks for focus.
-        * **Emotional:** Plan regular social meet-ups, or journal about your emotions once a week.
-        """
-    else:
-        return f"""
-        **🌟 Strength Area: {category_name}**
-        Outstanding! You've cultivated strong habits here. To maintain and deepen this strength:
-        * **Physical:** Consider trying a new challenging workout, or explore advanced nutrition topics.
-        * **Mental:** Share your mindfulness practices with others, or delve into advanced learning.
-        * **Emotional:** Volunteer or mentor to further deepen your connections and sense of purpose.
-        """
-
-# --- Chart Color Refinements (Already good, just noting) ---
-# Your existing CHART_TEXT_COLOR, CHART_SUBTEXT_COLOR, etc., are already excellent for the dark theme.
-# We might add more specific colors for different burnout risk levels in the future.
-# --- Charting Functions (Enhanced Styling for Visibility) ---
-
-# Assuming all your imports and function definitions are at the top,
-# including the new `calculate_exercise_score` and the `datetime` import.
 
 # --- Streamlit UI ---
 st.title("🔬 Holistic Well-Being Analyzer ✨") # Moved the sparkle emoji for better alignment
@@ -817,11 +306,11 @@ with st.form("advanced_well_being_form"):
     st.header("👤 Your Foundation: Basic Information")
     col_b1, col_b2, col_b3 = st.columns(3)
     with col_b1:
-        weight_kg = st.number_input("Weight (kg)", 20.0, 300.0, 70.0, 0.1, "%.1f", key="weight")
+        weight_kg = st.number_input("Weight (kg)", value=70.0, format="%.1f", key="weight", **field_range("weight_kg"))
     with col_b2:
-        height_cm = st.number_input("Height (cm)", 50.0, 250.0, 170.0, 0.5, "%.1f", key="height")
+        height_cm = st.number_input("Height (cm)", value=170.0, format="%.1f", key="height", **field_range("height_cm"))
     with col_b3:
-        waist_cm = st.number_input("Waist Circumference (cm)", 30.0, 200.0, 80.0, 0.5, "%.1f", key="waist", help="Measure horizontally around your abdomen at the level of your navel, without pulling the tape too tight.")
+        waist_cm = st.number_input("Waist Circumference (cm)", value=80.0, format="%.1f", key="waist", **field_range("waist_cm"), help="Measure horizontally around your abdomen at the level of your navel, without pulling the tape too tight.")
 
     col_b4, col_b5 = st.columns([3,2])
     with col_b4:
@@ -830,7 +319,7 @@ with st.form("advanced_well_being_form"):
         # Use a more inclusive option for gender, or clarify biological sex usage.
         gender = st.radio(
             "Biological Sex for Calculations",
-            ["Male", "Female", "Prefer not to say"],
+            list(GENDERS),
             index=0, # Default to Male, or pick one that makes sense
             key="gender_radio", # Changed key since it's a different widget type
             help="Used for BMR calculation. Choose the option that best aligns with your biological sex for metabolic estimation."
@@ -842,286 +331,98 @@ with st.form("advanced_well_being_form"):
 
     with col_p_left:
         st.markdown("##### **Exercise Habits & Activity**")
-        f_exercise_freq = st.slider("Exercise Days/Week", 0, 7, 4, key="f_exercise_freq", help="How many days per week do you engage in structured exercise?")
+        f_exercise_freq = st.slider("Exercise Days/Week", value=4, key="f_exercise_freq", **field_range("f_exercise_freq"), help="How many days per week do you engage in structured exercise?")
         # Streamlined intensity input - removed the redundant 'intensity_map' and one 'st.radio'
-        intensity = st.radio("Typical Exercise Intensity", ["Light", "Moderate", "Vigorous"], index=1, key="intensity", help="Light (e.g., gentle walk, stretching), Moderate (e.g., brisk walk, cycling), Vigorous (e.g., running, HIIT).")
+        intensity = st.radio("Typical Exercise Intensity", FIELDS["intensity"].options, index=1, key="intensity", help="Light (e.g., gentle walk, stretching), Moderate (e.g., brisk walk, cycling), Vigorous (e.g., running, HIIT).")
         
         # This activity_str is used for protein calculation and activity_multiplier for TDEE. Keep it here.
-        activity_map = {
-            "Sedentary (Office job, little/no formal exercise)": 1.2,
-            "Lightly Active (Light exercise/sports 1-3 days/wk or active job)": 1.375,
-            "Moderately Active (Moderate exercise/sports 3-5 days/wk)": 1.55,
-            "Very Active (Intense exercise/sports 6-7 days/wk)": 1.725,
-            "Extra Active (Very intense exercise daily or highly physical job)": 1.9,
-        }
+        activity_map = ACTIVITY_MAP
         activity_str = st.selectbox("Overall Daily Activity Level", list(activity_map.keys()), index=2, key="activity_str", help="Describes your general activity beyond structured exercise.")
         activity_multiplier = activity_map[activity_str]
 
     with col_p_middle: # Consolidated sleep, hydration, and diet here
         st.markdown("##### **Sleep & Hydration**")
-        sleep_h = st.slider("Avg. Sleep Hours/Night", 0.0, 12.0, 7.5, 0.5, key="sleep_h")
-        sleep_q = st.slider("Self-Reported Sleep Quality (1=Very Poor, 10=Excellent)", 1, 10, 7, key="sleep_q")
-        bedtime_consistency_score = st.slider("Bedtime Consistency (1=Very Irregular, 10=Very Regular)", 1, 10, 7, key="bedtime_consistency_score", help="How consistent are your bed and wake times daily? Consistency is key for circadian rhythm.")
-        water_liters = st.number_input("Avg. Water Intake (Liters/Day)", 0.0, 10.0, 2.5, 0.1, key="water_liters")
+        sleep_h = st.slider("Avg. Sleep Hours/Night", value=7.5, key="sleep_h", **field_range("sleep_h"))
+        sleep_q = st.slider("Self-Reported Sleep Quality (1=Very Poor, 10=Excellent)", value=7, key="sleep_q", **field_range("sleep_q"))
+        bedtime_consistency_score = st.slider("Bedtime Consistency (1=Very Irregular, 10=Very Regular)", value=7, key="bedtime_consistency_score", **field_range("bedtime_consistency_score"), help="How consistent are your bed and wake times daily? Consistency is key for circadian rhythm.")
+        water_liters = st.number_input("Avg. Water Intake (Liters/Day)", value=2.5, key="water_liters", **field_range("water_liters"))
 
     with col_p_right: # Moved diet components here for better grouping
         st.markdown("##### **Diet Quality**")
-        fruit_veg_servings = st.slider("Fruit/Vegetable Servings/Day (1 serving ≈ 80g)", 0, 10, 5, key="fruit_veg_servings", help="Aim for at least 5 servings for optimal nutrition.")
-        whole_grains_freq = st.slider("Whole Grain Intake (1=Rarely, 5=Most Meals)", 1, 5, 3, key="whole_grains_freq", help="How often do you choose whole grains over refined grains?")
-        processed_freq = st.slider("Processed/Sugary Food Intake (1=Daily, 5=Rarely/Never)", 1, 5, 3, key="processed_freq", help="Higher score means less frequent intake of ultra-processed foods and sugary drinks.")
+        fruit_veg_servings = st.slider("Fruit/Vegetable Servings/Day (1 serving ≈ 80g)", value=5, key="fruit_veg_servings", **field_range("fruit_veg_servings"), help="Aim for at least 5 servings for optimal nutrition.")
+        whole_grains_freq = st.slider("Whole Grain Intake (1=Rarely, 5=Most Meals)", value=3, key="whole_grains_freq", **field_range("whole_grains_freq"), help="How often do you choose whole grains over refined grains?")
+        processed_freq = st.slider("Processed/Sugary Food Intake (1=Daily, 5=Rarely/Never)", value=3, key="processed_freq", **field_range("processed_freq"), help="Higher score means less frequent intake of ultra-processed foods and sugary drinks.")
 
     st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
     st.header("🧘 Your Mind & Focus: Mental Acuity")
     col_m1, col_m2, col_m3 = st.columns(3)
     with col_m1:
         st.markdown("##### **Stress & Mindfulness**")
-        l_stress = st.slider("Avg. Stress Level (1=Very Low, 10=Very High)", 1, 10, 5, key="l_stress")
-        md_mindful_days = st.slider("Mindfulness/Meditation Days/Week", 0, 7, 2, key="md_mindful_days")
+        l_stress = st.slider("Avg. Stress Level (1=Very Low, 10=Very High)", value=5, key="l_stress", **field_range("l_stress"))
+        md_mindful_days = st.slider("Mindfulness/Meditation Days/Week", value=2, key="md_mindful_days", **field_range("md_mindful_days"))
     with col_m2:
         st.markdown("##### **Focus & Growth**")
-        a_focus_hours = st.slider("Avg. Focused Work/Learning Hours/Day", 0.0, 12.0, 5.0, 0.5, key="a_focus_hours")
-        learn_hrs = st.slider("New Learning/Skill Development Hours/Week", 0, 20, 3, key="learn_hrs")
+        a_focus_hours = st.slider("Avg. Focused Work/Learning Hours/Day", value=5.0, key="a_focus_hours", **field_range("a_focus_hours"))
+        learn_hrs = st.slider("New Learning/Skill Development Hours/Week", value=3, key="learn_hrs", **field_range("learn_hrs"))
     with col_m3:
         st.markdown("##### **Purpose & Digital Use**")
-        purpose_score = st.slider("Sense of Purpose/Meaning in Life (1=Low, 10=High)", 1, 10, 7, key="purpose_score")
-        screen_hrs = st.slider("Avg. Recreational Screen Time/Day (hrs)", 0.0, 12.0, 3.0, 0.5, key="screen_hrs", help="Time spent on social media, TV, games, etc. (excluding work/study).")
+        purpose_score = st.slider("Sense of Purpose/Meaning in Life (1=Low, 10=High)", value=7, key="purpose_score", **field_range("purpose_score"))
+        screen_hrs = st.slider("Avg. Recreational Screen Time/Day (hrs)", value=3.0, key="screen_hrs", **field_range("screen_hrs"), help="Time spent on social media, TV, games, etc. (excluding work/study).")
 
     st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
     st.header("❤️ Your Connections & Spirit: Emotional Vitality")
     col_e1, col_e2, col_e3 = st.columns(3)
     with col_e1:
         st.markdown("##### **Social Bonds**")
-        c_social_connection = st.slider("Quality of Social Connections (1=Isolated, 10=Strongly Connected)", 1, 10, 7, key="c_social_connection")
-        i_meaningful_interactions = st.slider("Meaningful Social Interactions/Week (count)", 0, 21, 7, key="i_meaningful_interactions", help="How many times per week do you have genuinely meaningful interactions with others?")
+        c_social_connection = st.slider("Quality of Social Connections (1=Isolated, 10=Strongly Connected)", value=7, key="c_social_connection", **field_range("c_social_connection"))
+        i_meaningful_interactions = st.slider("Meaningful Social Interactions/Week (count)", value=7, key="i_meaningful_interactions", **field_range("i_meaningful_interactions"), help="How many times per week do you have genuinely meaningful interactions with others?")
     with col_e2:
         st.markdown("##### **Emotional State**")
-        sm_mood_stability = st.slider("General Mood Stability (1=Highly Variable, 10=Very Stable)", 1, 10, 7, key="sm_mood_stability")
-        resilience_score = st.slider("Resilience (Ability to bounce back from adversity) (1=Low, 10=High)", 1, 10, 7, key="resilience_score")
+        sm_mood_stability = st.slider("General Mood Stability (1=Highly Variable, 10=Very Stable)", value=7, key="sm_mood_stability", **field_range("sm_mood_stability"))
+        resilience_score = st.slider("Resilience (Ability to bounce back from adversity) (1=Low, 10=High)", value=7, key="resilience_score", **field_range("resilience_score"))
     with col_e3:
         st.markdown("##### **Joy & Environment**")
-        gratitude_days = st.slider("Gratitude Practice Days/Week", 0, 7, 3, key="gratitude_days", help="How many days per week do you actively practice gratitude (e.g., journaling, reflecting)?")
-        nature_hrs = st.slider("Hours in Nature/Week", 0.0, 10.0, 2.0, 0.5, key="nature_hrs", help="Time spent outdoors in natural environments.")
+        gratitude_days = st.slider("Gratitude Practice Days/Week", value=3, key="gratitude_days", **field_range("gratitude_days"), help="How many days per week do you actively practice gratitude (e.g., journaling, reflecting)?")
+        nature_hrs = st.slider("Hours in Nature/Week", value=2.0, key="nature_hrs", **field_range("nature_hrs"), help="Time spent outdoors in natural environments.")
+
+    st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+    with st.expander("🧭 Set a Goal (optional)"):
+        st.markdown("Pick a score to reach and we'll find the easiest set of changes that gets you there.")
+        col_g1, col_g2 = st.columns(2)
+        with col_g1:
+            goal_score = st.selectbox("Score to improve", list(GOAL_SCORES), key="goal_score")
+            goal_target = st.slider("Target score", 0, 100, 70, key="goal_target", help="70+ is Good, 85+ is Optimal.")
+        with col_g2:
+            goal_hard = st.multiselect("Harder for me to change", list(HABIT_LABELS), key="goal_hard", help="Counted as three times the effort.")
+            goal_locked = st.multiselect("Keep as they are", list(HABIT_LABELS), key="goal_locked")
+
+    with st.expander("📈 Your History"):
+        st.markdown("Every analysis is saved to a private history kept in this page's address. Bookmark the page to come back to your trend.")
+        col_h1, col_h2, col_h3 = st.columns(3)
+        history_name = col_h1.text_input("Your name (optional)", key="history_name", help="Only used to greet you; your history is found by the private link, not by name.")
+        trend_window = col_h2.selectbox("Trend window", list(TREND_WINDOWS), index=len(TREND_WINDOWS) - 1, key="trend_window")
+        trend_downsampling = col_h3.selectbox("Long trends", list(TREND_DOWNSAMPLING), key="trend_downsampling", help="Long histories are reduced to a few hundred points before plotting, either following the overall line or keeping every high and low.")
 
     st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
     submitted = st.form_submit_button("🌟 Calculate My Holistic Well-Being Score 🌟")
 
 # Your `if submitted:` block follows here, using these input variables.
+form_inputs = dict(
+    weight_kg=weight_kg, height_cm=height_cm, waist_cm=waist_cm, gender=gender,
+    f_exercise_freq=f_exercise_freq, intensity=intensity, activity_str=activity_str,
+    sleep_h=sleep_h, sleep_q=sleep_q, bedtime_consistency_score=bedtime_consistency_score, water_liters=water_liters,
+    fruit_veg_servings=fruit_veg_servings, whole_grains_freq=whole_grains_freq, processed_freq=processed_freq,
+    l_stress=l_stress, md_mindful_days=md_mindful_days, a_focus_hours=a_focus_hours, learn_hrs=learn_hrs,
+    purpose_score=purpose_score, screen_hrs=screen_hrs,
+    c_social_connection=c_social_connection, i_meaningful_interactions=i_meaningful_interactions,
+    sm_mood_stability=sm_mood_stability, resilience_score=resilience_score, gratitude_days=gratitude_days, nature_hrs=nature_hrs,
+)
 import streamlit as st
 from datetime import datetime # Make sure datetime is imported at the top of your script
 
-# --- Custom CSS for Enhanced UI ---
-st.markdown("""
-<style>
-    /* Main container styling for a clean, slightly rounded look */
-    .stApp {
-        background-color: var(--background-color);
-        color: var(--text-color);
-        font-family: 'Inter', sans-serif; /* Modern font */
-        padding-top: 20px; /* Some padding from the top */
-    }
-
-    /* Overall page title styling */
-    .stTitle {
-        font-size: 3.2em; /* Larger title */
-        font-weight: 700;
-        color: var(--primary-color); /* Highlight color */
-        text-align: center;
-        margin-bottom: 0.5em;
-        text-shadow: 2px 2px 5px rgba(0,0,0,0.3); /* Subtle shadow */
-    }
-
-    /* Subheader/description styling */
-    p[data-testid="stMarkdownContainer"] {
-        text-align: center;
-        font-size: 1.15em;
-        color: var(--subheader-color);
-        margin-bottom: 2em;
-    }
-
-    /* Form header styling */
-    h1, h2, h3, h4, h5, h6 {
-        color: var(--primary-color); /* Use primary color for headers */
-        font-weight: 600;
-        margin-top: 1.5em;
-        margin-bottom: 0.8em;
-    }
-    h2 {
-        border-bottom: 2px solid rgba(0, 169, 255, 0.2); /* Subtle line under main form headers */
-        padding-bottom: 10px;
-        margin-bottom: 1.5em;
-        color: var(--text-color); /* Main headers should be text-color */
-    }
-    h5 {
-        color: var(--subheader-color); /* Sub-sections within pillars */
-        font-size: 1.1em;
-        margin-top: 1em;
-        margin-bottom: 0.5em;
-    }
 
-    /* Horizontal rule styling */
-    hr.custom-hr {
-        border: none;
-        border-top: 3px dashed rgba(0, 169, 255, 0.3); /* Dashed, primary colored line */
-        margin: 2em 0;
-    }
-
-    /* Container for forms/sections */
-    div.stForm {
-        background-color: var(--card-background-color);
-        padding: 30px 40px; /* More generous padding */
-        border-radius: var(--border-radius);
-        box-shadow: var(--box-shadow);
-        margin-bottom: 30px;
-    }
-
-    /* Number input styling (subtle focus effect) */
-    .stNumberInput > div > label {
-        color: var(--subheader-color);
-    }
-    .stNumberInput input:focus {
-        border-color: var(--primary-color) !important;
-        box-shadow: 0 0 0 0.1rem rgba(0,169,255,0.25) !important;
-    }
-
-    /* Slider styling (primary color track, subtle handle) */
-    .stSlider > div > div > div[data-testid="stSliderHandle"] {
-        background-color: var(--primary-color);
-        border: 2px solid var(--primary-color);
-    }
-    .stSlider > div > div > div[data-testid="stTickBar"] {
-        background-color: var(--primary-color) !important; /* Slider track */
-    }
-    .stSlider > label {
-        color: var(--subheader-color);
-    }
-
-    /* Radio button styling (primary color on selection) */
-    .stRadio > label {
-        color: var(--subheader-color);
-    }
-    .stRadio div[role="radiogroup"] > label > div > span:first-child {
-        border-color: var(--input-border-color);
-    }
-    .stRadio div[role="radiogroup"] > label > div > span:first-child:hover {
-        border-color: var(--primary-color);
-    }
-    .stRadio div[role="radiogroup"] > label[data-baseweb="radio"] > div > div:first-child {
-        background-color: var(--input-background-color);
-        border: 1px solid var(--input-border-color);
-    }
-    .stRadio div[role="radiogroup"] > label[data-baseweb="radio"] > div > div:first-child[data-checked="true"] {
-        background-color: var(--primary-color);
-        border-color: var(--primary-color);
-    }
-
-    /* Selectbox Styling Fix (Most important for the black box issue) */
-    /* This targets the internal elements of the selectbox to ensure text is visible */
-    .stSelectbox > label {
-        color: var(--subheader-color); /* Label color */
-    }
-    .stSelectbox div[data-baseweb="select"] > div:first-child {
-        background-color: var(--input-background-color); /* Background of the dropdown */
-        border: 1px solid var(--input-border-color); /* Border color */
-        color: var(--text-color); /* Ensure text is visible in the dropdown */
-    }
-    .stSelectbox div[data-baseweb="select"] > div:first-child:hover {
-        border-color: var(--primary-color); /* Hover effect */
-    }
-    .stSelectbox div[data-baseweb="select"] > div[role="button"] > div:first-child {
-        color: var(--text-color); /* Selected item text color */
-    }
-    .stSelectbox div[data-baseweb="select"] > div[role="button"]:focus {
-        border-color: var(--primary-color); /* Focus ring */
-        box-shadow: 0 0 0 0.1rem rgba(0,169,255,0.25);
-    }
-    /* Options list in dropdown */
-    .stSelectbox ul {
-        background-color: var(--card-background-color); /* Background of the options list */
-        border: 1px solid var(--input-border-color);
-    }
-    .stSelectbox li {
-        color: var(--text-color); /* Text color of options */
-    }
-    .stSelectbox li:hover {
-        background-color: rgba(0, 169, 255, 0.1); /* Hover background for options */
-        color: var(--primary-color); /* Hover text color */
-    }
-    .stSelectbox li[aria-selected="true"] {
-        background-color: rgba(0, 169, 255, 0.2); /* Selected option background */
-        color: var(--primary-color); /* Selected option text color */
-    }
-
-    /* Date Input Styling */
-    .stDateInput > label {
-        color: var(--subheader-color);
-    }
-    .stDateInput input {
-        background-color: var(--input-background-color);
-        border: 1px solid var(--input-border-color);
-        color: var(--text-color);
-    }
-    .stDateInput input:focus {
-        border-color: var(--primary-color);
-        box-shadow: 0 0 0 0.1rem rgba(0,169,255,0.25);
-    }
-
-    /* Submit button styling */
-    div.stButton > button {
-        background-color: var(--primary-color);
-        color: white;
-        border-radius: var(--border-radius);
-        padding: 0.6em 1.5em;
-        font-size: 1.2em;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 10px rgba(0, 169, 255, 0.3);
-        border: none;
-        width: 100%; /* Make button span full width */
-        margin-top: 2em;
-    }
-    div.stButton > button:hover {
-        background-color: var(--primary-hover-color);
-        box-shadow: 0 6px 15px rgba(0, 169, 255, 0.4);
-        transform: translateY(-2px);
-    }
-    div.stButton > button:active {
-        transform: translateY(0);
-        box-shadow: 0 2px 5px rgba(0, 169, 255, 0.2);
-    }
-
-    /* Custom variable definitions for dark theme */
-    :root {
-        --primary-color: #00A9FF; /* A vibrant blue */
-        --primary-hover-color: #008AC9;
-        --background-color: #1A1A2E; /* Dark blue-purple */
-        --card-background-color: #16213E; /* Slightly lighter dark blue-purple for cards */
-        --text-color: #E0E0E0; /* Light gray for main text */
-        --subheader-color: #B0B0B0; /* Slightly darker gray for subheaders/labels */
-        --input-background-color: #2E3352; /* Darker input fields */
-        --input-border-color: #4A506C; /* Subtle input border */
-        --border-radius: 12px; /* Rounded corners */
-        --box-shadow: 0 8px 25px rgba(0,0,0,0.4); /* Deeper shadow for cards */
-
-        /* Specific colors for pillar scores for consistency */
-        --physical-color: #4CAF50; /* Green */
-        --mental-color: #FFC107; /* Amber */
-        --emotional-color: #FF5722; /* Deep Orange */
-        --overall-good-color: #4CAF50;
-        --overall-average-color: #FFC107;
-        --overall-improve-color: #F44336;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Assuming all your calculation functions (calculate_bmi, calculate_bmr, calculate_tdee,
-# calculate_wthr_score, calculate_dqs, calculate_hs, calculate_exercise_score,
-# calculate_sqs, calculate_p_score, calculate_m_score, calculate_e_score,
-# calculate_wbs, get_wbs_interpretation, get_expert_insight, get_age,
-# calculate_protein_needs, get_heart_rate_zones, calculate_circadian_alignment_score,
-# calculate_burnout_risk, get_expert_insight_detailed)
-# and chart functions (create_wellbeing_radar_chart, create_gauge_chart, create_time_series_chart)
-# along with constants (CHART_PHYSICAL_COLOR, CHART_MENTAL_COLOR, CHART_EMOTIONAL_COLOR)
-# are defined elsewhere in your script.
+# Calculation functions live in scoring.py and chart functions in charts.py;
+# build_analysis() is defined above in this script.
 
 if submitted:
     with st.spinner('Analyzing your inputs and crunching the numbers... ✨'):
@@ -1133,118 +434,227 @@ if submitted:
             st.markdown("---")
             st.header("📈 Your Personalized Well-Being Analysis")
 
-            # --- Core Calculations ---
-            bmi_calc = calculate_bmi(weight_kg, height_cm) # Ensure weight_kg, height_cm are defined
-            bmr_calc = calculate_bmr(weight_kg, height_cm, age, gender) # Ensure gender is defined
-            tdee_calc = calculate_tdee(bmr_calc, activity_multiplier) # Ensure activity_multiplier is defined
-            wthr_calc_value = (waist_cm / height_cm) if height_cm > 0 else 0 # Ensure waist_cm is defined
-
-            # --- Normalized Score Components (0-1 range) ---
-            wthr_score_norm = calculate_wthr_score(waist_cm, height_cm)
-            dqs_norm = calculate_dqs(fruit_veg_servings, whole_grains_freq, processed_freq) # Ensure these are defined
-            hs_norm = calculate_hs(water_liters, weight_kg) # Ensure water_liters is defined
-            exercise_score_norm = calculate_exercise_score(f_exercise_freq, intensity) # Ensure f_exercise_freq, intensity are defined
-            
-            # Ensure sleep_h, sleep_q, bedtime_consistency_score are defined from your form inputs
-            sqs_norm = calculate_sqs(sleep_h, sleep_q, bedtime_consistency_score)
-
-            # --- New Advanced Metric Calculations ---
-            protein_needs_grams = calculate_protein_needs(weight_kg, activity_str) # Ensure activity_str is defined
-            zone2, zone3, zone4 = get_heart_rate_zones(age)
-            
-            # For circadian alignment, ideally you'd have a user input for wake time.
-            # For this prototype, we'll use a placeholder (e.g., 7 AM).
-            daily_wake_time_for_calc = datetime.now().replace(hour=7, minute=0).time()
-            circadian_alignment_score = calculate_circadian_alignment_score(
-                daily_wake_time_for_calc,
-                bedtime_consistency_score
-            )
-            # Ensure l_stress, a_focus_hours are defined from your form inputs
-            burnout_risk_score = calculate_burnout_risk(l_stress, sleep_h, a_focus_hours)
-
-            # --- Main Pillar Scores (0-100%) ---
-            p_score = calculate_p_score(exercise_score_norm, sqs_norm, wthr_score_norm, dqs_norm, hs_norm)
-            m_score = calculate_m_score(l_stress, a_focus_hours, md_mindful_days, learn_hrs, purpose_score, screen_hrs) # Ensure all these are defined
-            e_score = calculate_e_score(c_social_connection, i_meaningful_interactions, sm_mood_stability, resilience_score, gratitude_days, nature_hrs) # Ensure all these are defined
-            
-            # --- Overall Well-Being Score ---
-            wbs_score = calculate_wbs(p_score, m_score, e_score)
-            level, interpretation, level_color_css_var = get_wbs_interpretation(wbs_score)
+            # --- Scores, insights and figures (shared across sessions by the result cache) ---
+            with TIMER.stage("analysis"):
+                analysis = get_result_cache().get_or_compute(
+                    profile_key(form_inputs, age), lambda: build_analysis(**form_inputs, age=age)
+                )
+            bmi_calc, tdee_calc, wthr_calc_value = analysis["bmi_calc"], analysis["tdee_calc"], analysis["wthr_calc_value"]
+            protein_needs_grams, (zone2, zone3, zone4) = analysis["protein_needs_grams"], analysis["zones"]
+            circadian_alignment_score, burnout_risk_score = analysis["circadian_alignment_score"], analysis["burnout_risk_score"]
+            p_score, m_score, e_score, wbs_score = analysis["p_score"], analysis["m_score"], analysis["e_score"], analysis["wbs_score"]
+            level, interpretation, level_color_css_var = analysis["interpretation"]
+            insights, figures = analysis["insights"], analysis["figures"]
+
+            # --- Record this submission and read back the user's trend ---
+            history_store = get_history_store()
+            user_id = history_user_id()
+            with TIMER.stage("history.record"):
+                history_store.record(
+                    user_id, form_inputs,
+                    dict(analysis["sub_scores"], p_score=p_score, m_score=m_score, e_score=e_score, wbs=wbs_score),
+                    age=age,
+                )
+            # Appended and folded into the cohort aggregates in the background; the jobs run in order, so the fold sees the row.
+            run_in_background("log.append", get_submission_log().record, dict(form_inputs, dob=dob_date_input, age=age))
+            run_in_background("cohorts.update", get_cohort_aggregates().update, get_submission_log())
+            with TIMER.stage("percentiles"):
+                percentile_service = get_percentile_service()
+                pillar_scores = {"wbs": wbs_score, "p_score": p_score, "m_score": m_score, "e_score": e_score}
+                percentile_service.record(pillar_scores, age, gender)
+                standing = percentile_service.standing(pillar_scores, age, gender)
+                wbs_standing = standing_text(standing["wbs"], standing["cohort"])
+            with TIMER.stage("neighbors"):
+                from neighbors import feature_vector
+                neighbor_index = get_neighbor_index()
+                # Ask for extra neighbours: the user's own submissions are dropped, and other users count once.
+                neighbor_ids, _ = neighbor_index.query(feature_vector(form_inputs, analysis["sub_scores"]), k=NEIGHBORS * 3)
+                nearest_per_user = {}
+                for row in history_store.progress_after(neighbor_ids):  # nearest first, so each user keeps their nearest submission
+                    if row[0] != user_id:
+                        nearest_per_user.setdefault(row[0], row)
+                neighbors_progress = list(nearest_per_user.values())[:NEIGHBORS]
+            # Indexing the submissions recorded since the last sync (this one included) serves later queries, not this one.
+            run_in_background("neighbors.sync", neighbor_index.sync, history_store)
+            with TIMER.stage("persona"):
+                from personas import persona_vector
+                persona_path = os.environ.get("WELLBEING_PERSONAS", "wellbeing_personas.npz")
+                persona_model = get_persona_model(persona_path, os.path.getmtime(persona_path) if os.path.exists(persona_path) else None)
+                persona = persona_model.assign(persona_vector(form_inputs)) if persona_model.ready else None
+            with TIMER.stage("history.trend"):
+                trend_days = TREND_WINDOWS[trend_window]
+                trend_dates, trend_scores = history_store.trend(
+                    user_id, since=datetime.now() - timedelta(days=trend_days) if trend_days else None
+                )
 
             # --- Display Overall Well-Being Score (Enhanced Card) ---
-            st.markdown(f"""
-            <div class='overall-wbs-card' style='border-left: 7px solid var({level_color_css_var});'>
-                <h2 style='text-align: center; color: var({level_color_css_var}); margin-bottom: 0.5rem;'>Your Holistic Well-Being Score: <span class='score-badge' style='color: var({level_color_css_var});'>{wbs_score:.1f}/100</span></h2>
-                <h3 style='text-align: center; color: var({level_color_css_var}); margin-top:0; margin-bottom: 1rem;'>Overall Well-Being Level: {level}</h3>
-                <p class='interpretation-text' style='text-align: center;'><i>{interpretation}</i></p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown("<div class='result-card'>", unsafe_allow_html=True)
-            st.subheader("📊 Your Well-Being Snapshot")
+            with TIMER.stage("render.overall_card"):
+                wbs_low, wbs_high = analysis["intervals"]["wbs"]
+                st.markdown(f"""
+                <div class='overall-wbs-card' style='border-left: 7px solid var({level_color_css_var});'>
+                    <h2 style='text-align: center; color: var({level_color_css_var}); margin-bottom: 0.5rem;'>Your Holistic Well-Being Score: <span class='score-badge' style='color: var({level_color_css_var});'>{wbs_score:.1f}/100</span></h2>
+                    <h3 style='text-align: center; color: var({level_color_css_var}); margin-top:0; margin-bottom: 1rem;'>Overall Well-Being Level: {level}</h3>
+                    <p class='interpretation-text' style='text-align: center;'><i>{interpretation}</i></p>
+                    <p style='text-align: center; color: var(--subheader-color);' title='Your answers are estimates. 90% of plausible answers around yours score within this range.'>Likely range: {wbs_low:.1f} – {wbs_high:.1f}</p>
+                    {f"<p style='text-align: center;'>📊 {wbs_standing}.</p>" if wbs_standing else ""}
+                </div>
+                """, unsafe_allow_html=True)
+
+            with TIMER.stage("render.snapshot"):
+                st.markdown("<div class='result-card'>", unsafe_allow_html=True)
+                st.subheader("📊 Your Well-Being Snapshot")
             
-            radar_col, key_metrics_col = st.columns([3,2])
-            with radar_col:
-                st.plotly_chart(create_wellbeing_radar_chart(p_score, m_score, e_score), use_container_width=True)
-            with key_metrics_col:
-                # Updated Key Metrics with new calculations
-                st.markdown(f"**Age:** {age} years")
-                st.markdown(f"**BMI:** {bmi_calc:.1f}" if bmi_calc else "N/A")
-                st.markdown(f"**Waist-to-Height Ratio:** {wthr_calc_value:.2f}" if wthr_calc_value else "N/A", help="Aims for < 0.5 for optimal health. Lower is generally better.")
-                st.markdown(f"**Est. Daily Calories (TDEE):** {tdee_calc} kcal" if tdee_calc else "N/A")
-                st.markdown(f"**Est. Daily Protein Needs:** {protein_needs_grams}g" if protein_needs_grams else "N/A", help="Based on your weight and activity level, this is a general guideline for protein intake for muscle maintenance/growth.")
+                radar_col, key_metrics_col = st.columns([3,2])
+                with radar_col:
+                    with TIMER.stage("plotly_chart.radar"):
+                        show_chart(figures["radar"], use_container_width=True)
+                with key_metrics_col:
+                    # Updated Key Metrics with new calculations
+                    st.markdown(f"**Age:** {age} years")
+                    st.markdown(f"**BMI:** {bmi_calc:.1f}" if bmi_calc else "N/A")
+                    st.markdown(f"**Waist-to-Height Ratio:** {wthr_calc_value:.2f}" if wthr_calc_value else "N/A", help="Aims for < 0.5 for optimal health. Lower is generally better.")
+                    st.markdown(f"**Est. Daily Calories (TDEE):** {tdee_calc} kcal" if tdee_calc else "N/A")
+                    st.markdown(f"**Est. Daily Protein Needs:** {protein_needs_grams}g" if protein_needs_grams else "N/A", help="Based on your weight and activity level, this is a general guideline for protein intake for muscle maintenance/growth.")
                 
-                st.markdown("---")
-                st.markdown(f"**Heart Rate Zones (BPM):**")
-                st.markdown(f"&nbsp;&nbsp;Moderate (Zone 2): **{zone2}**", help="60-70% of Max HR. Good for endurance, fat burning, and building aerobic base.")
-                st.markdown(f"&nbsp;&nbsp;Aerobic (Zone 3): **{zone3}**", help="70-80% of Max HR. Improves cardiovascular fitness and stamina.")
-                st.markdown(f"&nbsp;&nbsp;Threshold (Zone 4): **{zone4}**", help="80-90% of Max HR. High intensity, improves anaerobic threshold and performance.")
+                    st.markdown("---")
+                    st.markdown(f"**Heart Rate Zones (BPM):**")
+                    st.markdown(f"&nbsp;&nbsp;Moderate (Zone 2): **{zone2}**", help="60-70% of Max HR. Good for endurance, fat burning, and building aerobic base.")
+                    st.markdown(f"&nbsp;&nbsp;Aerobic (Zone 3): **{zone3}**", help="70-80% of Max HR. Improves cardiovascular fitness and stamina.")
+                    st.markdown(f"&nbsp;&nbsp;Threshold (Zone 4): **{zone4}**", help="80-90% of Max HR. High intensity, improves anaerobic threshold and performance.")
                 
-                st.markdown("---")
-                # Display Pillar Scores as badges
-                st.markdown(f"**Physical Score (P):** <span class='score-badge' style='font-size:1.5em; color:var(--physical-color);'>{p_score:.1f}%</span>", unsafe_allow_html=True)
-                st.markdown(f"**Mental Score (M):** <span class='score-badge' style='font-size:1.5em; color:var(--mental-color);'>{m_score:.1f}%</span>", unsafe_allow_html=True)
-                st.markdown(f"**Emotional Score (E):** <span class='score-badge' style='font-size:1.5em; color:var(--emotional-color);'>{e_score:.1f}%</span>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-
-            st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
-            st.subheader("🎯 Pillar Deep Dive & Expert Guidance")
+                    st.markdown("---")
+                    # Display Pillar Scores as badges
+                    st.markdown(f"**Physical Score (P):** <span class='score-badge' style='font-size:1.5em; color:var(--physical-color);'>{p_score:.1f}%</span>", unsafe_allow_html=True, help=standing_text(standing["p_score"], standing["cohort"]))
+                    st.markdown(f"**Mental Score (M):** <span class='score-badge' style='font-size:1.5em; color:var(--mental-color);'>{m_score:.1f}%</span>", unsafe_allow_html=True, help=standing_text(standing["m_score"], standing["cohort"]))
+                    st.markdown(f"**Emotional Score (E):** <span class='score-badge' style='font-size:1.5em; color:var(--emotional-color);'>{e_score:.1f}%</span>", unsafe_allow_html=True, help=standing_text(standing["e_score"], standing["cohort"]))
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            # --- Biggest levers: the one-step changes that raise the WBS most ---
+            with TIMER.stage("render.levers"):
+                st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                st.subheader("🚀 Your Biggest Levers")
+                top_levers = [lever for lever in analysis["levers"] if lever.habit and lever.wbs_gain > 0][:TOP_LEVERS]
+                if top_levers:
+                    st.markdown("The single habit changes that would lift your score the most, one slider step at a time:")
+                    for lever in top_levers:
+                        pillar_text = ", ".join(f"{PILLAR_NAMES[p]} +{gain:.1f}" for p, gain in lever.pillar_gains.items() if gain > 0)
+                        st.markdown(f"- **{lever.label}:** {lever.current} → {lever.suggested} &nbsp;·&nbsp; **+{lever.wbs_gain:.1f} WBS** ({pillar_text})")
+                else:
+                    st.info("No single one-step habit change raises your score right now. Great balance! Bigger changes may still help; see the pillar guidance below.")
+
+            # --- Goal plan: least-effort changes to reach the target from the form ---
+            with TIMER.stage("goal_plan"):
+                from goals import plan_changes, plan_key  # NumPy-backed, like the levers
+                goal_key = GOAL_SCORES[goal_score]
+                goal_args = (
+                    {name: form_inputs[name] for name in FIELDS}, goal_target, goal_key,
+                    {HABIT_LABELS[label]: HARD_EFFORT_WEIGHT for label in goal_hard},
+                    {HABIT_LABELS[label] for label in goal_locked},
+                )
+                goal_plan = get_goal_cache().get_or_compute(plan_key(*goal_args), lambda: plan_changes(*goal_args))
+            with TIMER.stage("render.goal"):
+                st.subheader(f"🧭 Your Path to {goal_score} {goal_target}")
+                if goal_plan is None:
+                    st.warning("That target is out of reach with the habits you're willing to change. Try a lower target or unlock a habit or two.")
+                elif not goal_plan.changes:
+                    st.success(f"You're already there! Your {goal_score} is {goal_plan.scores[goal_key]:.1f}.")
+                else:
+                    st.markdown("The easiest combination of changes that gets you there:")
+                    for name, old, new in goal_plan.changes:
+                        st.markdown(f"- **{FIELDS[name].label}:** {old} → {new}")
+                    st.markdown(f"With these changes: **WBS {goal_plan.scores['wbs']:.1f}** (Physical {goal_plan.scores['p_score']:.1f}, Mental {goal_plan.scores['m_score']:.1f}, Emotional {goal_plan.scores['e_score']:.1f}).")
+
+            with TIMER.stage("render.pillars"):
+                st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                st.subheader("🎯 Pillar Deep Dive & Expert Guidance")
+                st.caption("Each waterfall starts from the best possible 100; every step down is what one part of the pillar falls short of its full share, so the biggest drops are the places to look first.")
             
-            # Use expanders for detailed insights and charts per pillar
-            with st.expander("Physical Health Insights 🏋️‍♂️", expanded=True):
-                col_gauge_p, col_text_p = st.columns([1, 2])
-                with col_gauge_p:
-                    st.plotly_chart(create_gauge_chart(p_score, "Physical Health", CHART_PHYSICAL_COLOR), use_container_width=True)
-                with col_text_p:
-                    # Using the more detailed expert insight function
-                    st.markdown(get_expert_insight_detailed(p_score, "Physical Health"))
-                    st.markdown(f"**Your Circadian Alignment Score:** <span class='score-badge' style='color:var(--physical-color);'>{circadian_alignment_score:.1f}%</span>", unsafe_allow_html=True, help="Higher score indicates better alignment with natural sleep-wake cycles, crucial for hormonal balance and overall health. Aim for consistent sleep and wake times.")
-
-            with st.expander("Mental Health Insights 🧠", expanded=True):
-                col_gauge_m, col_text_m = st.columns([1, 2])
-                with col_gauge_m:
-                    st.plotly_chart(create_gauge_chart(m_score, "Mental Health", CHART_MENTAL_COLOR), use_container_width=True)
-                with col_text_m:
-                    st.markdown(get_expert_insight_detailed(m_score, "Mental Health"))
-                    st.markdown(f"**Burnout Risk Assessment:** <span class='score-badge' style='color:var(--mental-color);'>{burnout_risk_score:.1f}%</span>", unsafe_allow_html=True, help="An indicator of potential burnout based on stress levels, sleep duration, and focused work hours. Higher percentage means higher risk. Consider taking breaks and managing workload.")
-                    # Visual representation of burnout risk - using a simple progress bar for now
-                    st.progress(int(burnout_risk_score))
-
-            with st.expander("Emotional Health Insights ❤️", expanded=True):
-                col_gauge_e, col_text_e = st.columns([1, 2])
-                with col_gauge_e:
-                    st.plotly_chart(create_gauge_chart(e_score, "Emotional Health", CHART_EMOTIONAL_COLOR), use_container_width=True)
-                with col_text_e:
-                    st.markdown(get_expert_insight_detailed(e_score, "Emotional Health"))
-            
-            st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
-            st.subheader("📈 Your Well-Being Trend (Sample & Future Vision)")
-            st.info("This chart currently displays a **simulated trend** to showcase potential. In a full version, this would track your actual scores over time, allowing you to visualize progress and patterns. Imagine setting goals and seeing your line move!")
-            st.plotly_chart(create_time_series_chart(dummy_data=True), use_container_width=True)
+                # Use expanders for detailed insights and charts per pillar
+                with st.expander("Physical Health Insights 🏋️‍♂️", expanded=True):
+                    col_gauge_p, col_text_p = st.columns([1, 2])
+                    with col_gauge_p:
+                        with TIMER.stage("plotly_chart.gauge_physical"):
+                            show_chart(figures["gauge_physical"], use_container_width=True)
+                    with col_text_p:
+                        # Using the more detailed expert insight function
+                        st.markdown(insights["physical"])
+                        st.markdown(f"**Your Circadian Alignment Score:** <span class='score-badge' style='color:var(--physical-color);'>{circadian_alignment_score:.1f}%</span>", unsafe_allow_html=True, help="Higher score indicates better alignment with natural sleep-wake cycles, crucial for hormonal balance and overall health. Aim for consistent sleep and wake times.")
+
+                    with TIMER.stage("plotly_chart.waterfall_physical"):
+                        show_chart(figures["waterfall_physical"], use_container_width=True)
+
+                with st.expander("Mental Health Insights 🧠", expanded=True):
+                    col_gauge_m, col_text_m = st.columns([1, 2])
+                    with col_gauge_m:
+                        with TIMER.stage("plotly_chart.gauge_mental"):
+                            show_chart(figures["gauge_mental"], use_container_width=True)
+                    with col_text_m:
+                        st.markdown(insights["mental"])
+                        st.markdown(f"**Burnout Risk Assessment:** <span class='score-badge' style='color:var(--mental-color);'>{burnout_risk_score:.1f}%</span>", unsafe_allow_html=True, help="An indicator of potential burnout based on stress levels, sleep duration, and focused work hours. Higher percentage means higher risk. Consider taking breaks and managing workload.")
+                        # Visual representation of burnout risk - using a simple progress bar for now
+                        st.progress(int(burnout_risk_score))
+
+                    with TIMER.stage("plotly_chart.waterfall_mental"):
+                        show_chart(figures["waterfall_mental"], use_container_width=True)
+
+                with st.expander("Emotional Health Insights ❤️", expanded=True):
+                    col_gauge_e, col_text_e = st.columns([1, 2])
+                    with col_gauge_e:
+                        with TIMER.stage("plotly_chart.gauge_emotional"):
+                            show_chart(figures["gauge_emotional"], use_container_width=True)
+                    with col_text_e:
+                        st.markdown(insights["emotional"])
+
+                    with TIMER.stage("plotly_chart.waterfall_emotional"):
+                        show_chart(figures["waterfall_emotional"], use_container_width=True)
+
+            with TIMER.stage("render.explore"):
+                st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                st.subheader("🔬 Explore Two Inputs Together")
+                st.markdown("See your score for every combination of two inputs, with everything else as you answered. Your spot is marked with an ✕.")
+                explore_panel({name: form_inputs[name] for name in FIELDS}, wbs_score)
+
+            with TIMER.stage("render.trend"):
+                st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                st.subheader("📈 Your Well-Being Trend")
+                if len(trend_scores) < 2:
+                    greeting = f", **{history_name.strip()}**" if history_name.strip() else ""
+                    st.info(f"This is your first recorded analysis{greeting}. Bookmark this page and come back to submit again over the coming days and weeks to watch your score move!")
+                trend_method = TREND_DOWNSAMPLING[trend_downsampling]
+                with TIMER.stage("chart.trend"):
+                    trend_figure = create_time_series_chart(trend_dates, trend_scores, method=trend_method)
+                with TIMER.stage("plotly_chart.trend"):
+                    show_chart(trend_figure, use_container_width=True)
+
+            if persona is not None:
+                with TIMER.stage("render.persona"):
+                    st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                    st.subheader("🧩 Your Well-Being Persona")
+                    st.markdown(f"Your mental and emotional answers look most like: **{persona_model.names[persona]}**")
+                    st.caption(f"One of {persona_model.personas} personas found in everyone's answers; about {persona_model.share(persona):.0%} of submissions fall in it.")
+
+            with TIMER.stage("render.neighbors"):
+                st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+                st.subheader("👥 People Like You")
+                returning = [(wbs_then, days, wbs_later) for _, wbs_then, days, wbs_later in neighbors_progress if days is not None]
+                if len(returning) < MIN_RETURNING_NEIGHBORS:
+                    st.info("Not enough people with answers like yours have come back yet to show how they got on. Check again later!")
+                else:
+                    changes = [wbs_later - wbs_then for wbs_then, _, wbs_later in returning]
+                    st.markdown(f"Of the {len(neighbors_progress)} people whose answers were most like yours, **{len(returning)}** came back later, typically after {statistics.median(days for _, days, _ in returning):.0f} days.")
+                    col_change, col_improved = st.columns(2)
+                    col_change.metric("Their typical WBS change", f"{statistics.median(changes):+.1f}")
+                    col_improved.metric("Improved since", f"{sum(change > 0 for change in changes)} of {len(returning)}")
 
             st.markdown("---")
             st.success("Analysis Complete! Continue to explore your personalized insights above. Remember, consistency is key to long-term well-being and growth!")
 
+            # --- Stage timings (WELLBEING_TIMING=1) ---
+            if TIMER.enabled:
+                logging.getLogger("wellbeing.timing").info(TIMER.to_json())
+                if os.environ.get("WELLBEING_TIMING_PROM_FILE"):
+                    TIMER.write_prometheus(os.environ["WELLBEING_TIMING_PROM_FILE"])
+
 # Moved the disclaimer outside the if submitted block so it's always visible
 st.markdown("---")
 st.caption("Disclaimer: This tool provides an estimation for informational purposes only and is not a substitute for professional medical or psychological advice. Consult with qualified professionals for specific health concerns.")
@@ -1263,6 +673,12 @@ with st.sidebar:
     - **Insights:** Get tailored suggestions to focus your efforts.
     """, unsafe_allow_html=True)
 
+    st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
+
+    st.markdown("##### Your History:")
+    history_user_id()  # puts the key in the address on the first view, so it can be bookmarked before submitting
+    st.markdown("Your analyses are saved under a private key in this page's address. **Bookmark the page** to come back to your trend; anyone with the link can see it, so keep it to yourself.")
+
     st.markdown("<hr class='custom-hr'>", unsafe_allow_html=True)
     
     st.markdown(f"""
@@ -1284,3 +700,13 @@ with st.sidebar:
         Last Updated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
     </div>
     """, unsafe_allow_html=True)
+
+    # Operator view of the shared result cache (set WELLBEING_SHOW_CACHE_STATS=1)
+    if os.environ.get("WELLBEING_SHOW_CACHE_STATS"):
+        cache_stats = get_result_cache().stats()
+        st.caption(f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%}), {cache_stats['size']}/{cache_stats['max_entries']} entries, {cache_stats['evictions']} evicted")
+
+    # Operator view of the per-stage timings (set WELLBEING_TIMING=1)
+    if TIMER.enabled:
+        with st.expander("Stage timings"):
+            st.code(TIMER.to_prometheus(), language="text")
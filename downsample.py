@@ -0,0 +1,97 @@
+"""Point-count reduction for long time series before they go to the browser.
+
+Both methods return the indices of the points to keep (always including the
+first and last), so they apply equally to lists of datetimes, NumPy arrays
+or DataFrame columns:
+
+- lttb: Largest-Triangle-Three-Buckets; keeps the shape of the line, one
+  point per bucket chosen to maximize the triangle area with its neighbours.
+- minmax: the lowest and highest point of every bucket, so no peak or dip
+  is ever dropped.
+
+    dates, scores = downsample(dates, scores, 500, method="lttb")
+"""
+import numpy as np
+
+
+def _as_numeric(x):
+    """Float x positions; datetimes become microseconds since the epoch."""
+    values = np.asarray(x)
+    if values.dtype == object or np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[us]").astype(np.int64)
+    return values.astype(np.float64)
+
+
+def lttb(x, y, n_out):
+    """Indices of ``n_out`` points picked by Largest-Triangle-Three-Buckets."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("lttb needs n_out >= 3")
+    x, y = _as_numeric(x), np.asarray(y, dtype=np.float64)
+    # n_out - 2 equal buckets between the fixed first and last points.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        # Third triangle vertex: mean of the next bucket (or the last point).
+        if b + 2 < len(edges):
+            next_x, next_y = x[stop:edges[b + 2]].mean(), y[stop:edges[b + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        keep[b + 1] = previous
+    return keep
+
+
+def min_max(x, y, n_out):
+    """Indices of the first and last points plus the minimum and maximum of each equal bucket, in time order."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        raise ValueError("min_max needs n_out >= 4")
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = (n_out - 2) // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    lows = np.minimum.reduceat(y, edges[:-1])
+    highs = np.maximum.reduceat(y, edges[:-1])
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # First index in each bucket that hits the bucket's min / max.
+    low_idx = np.flatnonzero(y == lows[bucket])
+    high_idx = np.flatnonzero(y == highs[bucket])
+    low_idx = low_idx[np.unique(bucket[low_idx], return_index=True)[1]]
+    high_idx = high_idx[np.unique(bucket[high_idx], return_index=True)[1]]
+    return np.unique(np.concatenate([[0, n - 1], low_idx, high_idx]))
+
+
+METHODS = {"lttb": lttb, "minmax": min_max}
+
+
+def downsample(x, y, n_out, method="lttb"):
+    """
+    Reduces a series to at most ``n_out`` points.
+
+    Parameters:
+    - x (sequence): Positions (numbers or datetimes), in increasing order.
+    - y (sequence): Values, same length as x.
+    - n_out (int): Maximum points returned.
+    - method (str): "lttb", "minmax", or None to keep every point.
+
+    Returns:
+    - tuple: (x, y) lists of the kept points.
+    """
+    if method is None or len(y) <= n_out:
+        return list(x), list(y)
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}; expected one of {', '.join(METHODS)}")
+    keep = METHODS[method](x, y, n_out)
+    x, y = np.asarray(x, dtype=object), np.asarray(y, dtype=object)
+    return x[keep].tolist(), y[keep].tolist()
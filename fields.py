@@ -0,0 +1,86 @@
+"""Domains of the form inputs that feed the scores: the one source of the widgets' ranges in doc.py.
+
+Each entry backs one widget: numeric inputs hold the widget's min, max and
+step (doc.py's field_range()), choice inputs the option list in on-screen
+order. Change a range here and the form, the API's validation and the
+planners follow.
+
+``noise`` is how far off a self-reported answer plausibly is: a standard
+deviation in the input's units, or for choices the chance that the true
+answer is a neighbouring option.
+"""
+from collections import namedtuple
+
+from scoring import INTENSITY_MULTIPLIERS
+
+# Options of the "Biological Sex for Calculations" radio.
+GENDERS = ("Male", "Female", "Prefer not to say")
+
+# Form widget keys that differ from the variable names batch.score_submissions() expects.
+WIDGET_KEY_ALIASES = {
+    "weight": "weight_kg",
+    "height": "height_cm",
+    "waist": "waist_cm",
+    "gender_radio": "gender",
+}
+
+Field = namedtuple("Field", "label low high step options noise habit", defaults=(None, None, None, None, None, True))
+
+
+def _number(label, low, high, step=1, noise=None, habit=True):
+    return Field(label, low, high, step, None, noise, habit)
+
+
+# Same order as batch.INPUT_COLUMNS.
+FIELDS = {
+    "weight_kg": _number("Weight (kg)", 20.0, 300.0, 0.1, noise=1.0, habit=False),
+    "height_cm": _number("Height (cm)", 50.0, 250.0, 0.5, noise=1.0, habit=False),
+    "waist_cm": _number("Waist circumference (cm)", 30.0, 200.0, 0.5, noise=2.0, habit=False),
+    "f_exercise_freq": _number("Exercise days/week", 0, 7, noise=0.7),
+    "intensity": Field("Exercise intensity", options=tuple(INTENSITY_MULTIPLIERS), noise=0.25),
+    "sleep_h": _number("Sleep hours/night", 0.0, 12.0, 0.5, noise=0.5),
+    "sleep_q": _number("Sleep quality", 1, 10, noise=1.0),
+    "bedtime_consistency_score": _number("Bedtime consistency", 1, 10, noise=1.0),
+    "water_liters": _number("Water intake (L/day)", 0.0, 10.0, 0.1, noise=0.4),
+    "fruit_veg_servings": _number("Fruit/vegetable servings/day", 0, 10, noise=1.0),
+    "whole_grains_freq": _number("Whole grain intake", 1, 5, noise=0.6),
+    "processed_freq": _number("Processed food avoidance", 1, 5, noise=0.6),
+    "l_stress": _number("Stress level", 1, 10, noise=1.0),
+    "md_mindful_days": _number("Mindfulness days/week", 0, 7, noise=0.7),
+    "a_focus_hours": _number("Focused work hours/day", 0.0, 12.0, 0.5, noise=1.0),
+    "learn_hrs": _number("Learning hours/week", 0, 20, noise=1.5),
+    "purpose_score": _number("Sense of purpose", 1, 10, noise=1.0),
+    "screen_hrs": _number("Recreational screen time (h/day)", 0.0, 12.0, 0.5, noise=0.75),
+    "c_social_connection": _number("Social connection quality", 1, 10, noise=1.0),
+    "i_meaningful_interactions": _number("Meaningful interactions/week", 0, 21, noise=2.0),
+    "sm_mood_stability": _number("Mood stability", 1, 10, noise=1.0),
+    "resilience_score": _number("Resilience", 1, 10, noise=1.0),
+    "gratitude_days": _number("Gratitude days/week", 0, 7, noise=0.7),
+    "nature_hrs": _number("Hours in nature/week", 0.0, 10.0, 0.5, noise=0.75),
+}
+
+
+def step_value(name, value, steps):
+    """``value`` moved ``steps`` widget steps (or options) along field ``name``'s domain, clamped to it."""
+    field = FIELDS[name]
+    if field.options is not None:
+        index = field.options.index(value) if value in field.options else 0
+        return field.options[min(max(index + steps, 0), len(field.options) - 1)]
+    moved = min(max(value + steps * field.step, field.low), field.high)
+    return round(moved, 6) if isinstance(field.step, float) else int(round(moved))
+
+
+def on_step(name, value):
+    """Whether ``value`` is one the widget of numeric field ``name`` can produce: ``low`` plus a whole number of steps."""
+    field = FIELDS[name]
+    steps = (value - field.low) / field.step
+    return abs(steps - round(steps)) < 1e-6
+
+
+def domain(name):
+    """Every value field ``name`` can take, in order."""
+    field = FIELDS[name]
+    if field.options is not None:
+        return list(field.options)
+    count = int(round((field.high - field.low) / field.step))
+    return [step_value(name, field.low, i) for i in range(count + 1)]
@@ -0,0 +1,204 @@
+"""Goal planning: the least-effort set of input changes that reaches a target score.
+
+The inputs split into groups that feed one sub-score each (GROUPS), and a
+group only ever adds to its own pillar, so the search never enumerates the
+whole input space:
+
+1. Every value combination of every group, with the other inputs held at
+   the user's current answers, is scored in one batch.score_batch() call
+   (about 3,500 rows).
+2. Each group keeps only its Pareto frontier of (effort, score gain).
+3. Frontiers are merged pairwise, pruning back to the frontier after each
+   merge, first into pillar frontiers and then, weighted like
+   calculate_wbs(), into a WBS frontier.
+4. Gains from step 1 are differences of rounded pillar scores, so the
+   frontier is approximate: the cheapest few hundred candidates that are
+   close to the target are rescored exactly in one more batch and the
+   cheapest one that really reaches it wins.
+
+Effort is the share of a slider's range moved, times that input's weight,
+plus ``change_cost`` for every input changed at all.
+
+    plan = plan_changes(form_inputs, target=70, score="wbs", weights={"sleep_h": 3})
+    plan.changes   # [("f_exercise_freq", 4, 5), ("sleep_h", 6.5, 7.5), ...]
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from batch import INPUT_COLUMNS, score_batch
+from fields import FIELDS, domain
+from result_cache import profile_key
+
+Plan = namedtuple("Plan", "changes effort scores")
+
+# Inputs that share a sub-score, per pillar; inputs in different groups add independently.
+GROUPS = {
+    "p_score": (
+        ("f_exercise_freq", "intensity"),
+        ("sleep_h", "sleep_q", "bedtime_consistency_score"),
+        ("fruit_veg_servings", "whole_grains_freq", "processed_freq"),
+        ("water_liters",),
+    ),
+    "m_score": (
+        ("l_stress",), ("a_focus_hours",), ("md_mindful_days",), ("learn_hrs", "purpose_score"), ("screen_hrs",),
+    ),
+    "e_score": (
+        ("c_social_connection", "i_meaningful_interactions"), ("sm_mood_stability",), ("resilience_score",),
+        ("gratitude_days",), ("nature_hrs",),
+    ),
+}
+
+# calculate_wbs() weights.
+PILLAR_WEIGHTS = {"p_score": 0.4, "m_score": 0.3, "e_score": 0.3}
+
+SCORES = ("wbs",) + tuple(PILLAR_WEIGHTS)
+
+# Exact rescoring: how many frontier candidates, and how far below the target they may be estimated.
+_CANDIDATES = 256
+_SLACK = 0.5
+
+
+def effort(name, old, new, weight=1.0, change_cost=0.1):
+    """Effort of moving input ``name`` from ``old`` to ``new``."""
+    if old == new:
+        return 0.0
+    field = FIELDS[name]
+    if field.options is not None:
+        share = abs(field.options.index(new) - field.options.index(old)) / (len(field.options) - 1)
+    else:
+        share = abs(new - old) / (field.high - field.low)
+    return weight * share + change_cost
+
+
+def _frontier(costs, gains):
+    """Indices of the Pareto points, cheapest first: each gains strictly more than every cheaper one."""
+    order = np.lexsort((-gains, costs))
+    ordered = gains[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], ordered[:-1])))
+    return order[ordered > best_before]
+
+
+class _Node:
+    """A frontier: costs and gains per point, and how to recover each point's input values."""
+
+    def __init__(self, costs, gains, leaf=None, children=None):
+        self.costs, self.gains = costs, gains
+        self.leaf = leaf            # {name: array of values} per point
+        self.children = children   # (left node, right node, left index, right index)
+
+    def values(self, index):
+        """{name: array of values} for the points at ``index`` (an index array)."""
+        if self.leaf is not None:
+            return {name: values[index] for name, values in self.leaf.items()}
+        left, right, left_index, right_index = self.children
+        return {**left.values(left_index[index]), **right.values(right_index[index])}
+
+
+def _merge(a, b, scale_a=1.0, scale_b=1.0):
+    costs = (a.costs[:, None] + b.costs[None, :]).ravel()
+    gains = (scale_a * a.gains[:, None] + scale_b * b.gains[None, :]).ravel()
+    keep = _frontier(costs, gains)
+    left_index, right_index = np.divmod(keep, len(b.costs))
+    return _Node(costs[keep], gains[keep], children=(a, b, left_index, right_index))
+
+
+def _grid(inputs, group, locked):
+    """Every value combination of the group's inputs (locked ones keep their value), as {name: array}."""
+    axes = []
+    for name in group:
+        axis = [inputs[name]] if name in locked or not FIELDS[name].habit else domain(name)
+        axes.append(axis if inputs[name] in axis else axis + [inputs[name]])
+    mesh = np.meshgrid(*[np.arange(len(axis)) for axis in axes], indexing="ij")
+    return {name: np.asarray(axis, dtype=object)[index.ravel()] for name, axis, index in zip(group, axes, mesh)}
+
+
+def _rows(inputs, overrides):
+    """score_batch() columns: ``inputs`` repeated, with ``overrides`` ({name: array}) replacing some columns."""
+    n = len(next(iter(overrides.values())))
+    return {name: overrides[name] if name in overrides else np.full(n, inputs[name], dtype=object) for name in INPUT_COLUMNS}
+
+
+def plan_changes(inputs, target, score="wbs", weights=None, locked=(), change_cost=0.1):
+    """
+    Finds the least-effort input changes that bring ``score`` to at least ``target``.
+
+    Parameters:
+    - inputs (dict): A form submission with every name in batch.INPUT_COLUMNS.
+    - target (float): Score to reach.
+    - score (str): "wbs", "p_score", "m_score" or "e_score".
+    - weights (dict): Effort weight per input name (default 1.0).
+    - locked (iterable): Input names that must keep their current value.
+    - change_cost (float): Extra effort for every changed input.
+
+    Returns:
+    - Plan or None: (changes as (name, old, new) tuples, total effort, exact
+      scores after the changes), or None if the target cannot be reached.
+    """
+    if score not in SCORES:
+        raise ValueError(f"Unknown score {score!r}; expected one of {', '.join(SCORES)}")
+    weights, locked = weights or {}, set(locked)
+    pillars = list(PILLAR_WEIGHTS) if score == "wbs" else [score]
+    groups = [(pillar, group) for pillar in pillars for group in GROUPS[pillar]]
+
+    # 1. Score every group's value grid in one batch (row 0 is the submission as it is).
+    grids = [_grid(inputs, group, locked) for _, group in groups]
+    sizes = [len(next(iter(grid.values()))) for grid in grids]
+    columns = {name: np.full(1 + sum(sizes), inputs[name], dtype=object) for name in INPUT_COLUMNS}
+    offset = 1
+    for grid, n in zip(grids, sizes):
+        for name, values in grid.items():
+            columns[name][offset:offset + n] = values
+        offset += n
+    scores = score_batch(columns)
+    base = {name: float(values[0]) for name, values in scores.items()}
+    if base[score] >= target:
+        return Plan([], 0.0, {name: base[name] for name in SCORES})
+
+    # 2. Per-group frontiers, then 3. pillar and WBS frontiers.
+    pillar_nodes, offset = {}, 1
+    for (pillar, group), grid, n in zip(groups, grids, sizes):
+        gains = scores[pillar][offset:offset + n] - base[pillar]
+        costs = np.zeros(n)
+        for name in group:
+            # A grid repeats each of an input's few values many times; work out each value's effort once.
+            old, column = inputs[name], grid[name].tolist()
+            moves = {new: effort(name, old, new, weights.get(name, 1.0), change_cost) for new in dict.fromkeys(column)}
+            costs += np.array([moves[new] for new in column])
+        offset += n
+        keep = _frontier(costs, gains)
+        node = _Node(costs[keep], gains[keep], leaf={name: values[keep] for name, values in grid.items()})
+        pillar_nodes[pillar] = node if pillar not in pillar_nodes else _merge(pillar_nodes[pillar], node)
+    if score == "wbs":
+        p_node, m_node, e_node = (pillar_nodes[pillar] for pillar in PILLAR_WEIGHTS)
+        node = _merge(_merge(p_node, m_node, PILLAR_WEIGHTS["p_score"], PILLAR_WEIGHTS["m_score"]),
+                      e_node, 1.0, PILLAR_WEIGHTS["e_score"])
+    else:
+        node = pillar_nodes[score]
+
+    # 4. Rescore the cheapest candidates near the target exactly and take the cheapest that makes it.
+    close = np.flatnonzero(base[score] + node.gains >= target - _SLACK)[:_CANDIDATES]
+    if not len(close):
+        return None
+    values = node.values(close)
+    exact = score_batch(_rows(inputs, values))
+    reached = np.flatnonzero(exact[score] >= target)
+    if not len(reached):
+        return None
+    best = reached[np.argmin(node.costs[close][reached])]
+    changes = [(name, inputs[name], _plain(values[name][best])) for name in INPUT_COLUMNS
+               if name in values and values[name][best] != inputs[name]]
+    return Plan(changes, round(float(node.costs[close][best]), 3), {name: float(exact[name][best]) for name in SCORES})
+
+
+def plan_key(inputs, target, score="wbs", weights=None, locked=(), change_cost=0.1):
+    """Cache key of a plan_changes() call: a hash of the inputs plus the goal, weights and locked inputs."""
+    goal = {name: value for name, value in inputs.items() if name in INPUT_COLUMNS}
+    goal.update({f"weight:{name}": weight for name, weight in (weights or {}).items()})
+    goal.update({f"locked:{name}": True for name in locked})
+    goal.update(target=target, score=score, change_cost=change_cost)
+    return profile_key(goal, None)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
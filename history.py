@@ -0,0 +1,173 @@
+"""SQLite-backed history of analyzed submissions, for the trend chart.
+
+One row per submission: who, when, the raw form inputs (as JSON) and every
+sub-score and pillar score. Rows are read back with range queries on
+(user_id, recorded_at), which the composite index answers without touching
+other users' rows, so a trend query stays fast however many rows the
+deployment has accumulated.
+
+    store = HistoryStore("wellbeing_history.db")
+    store.record("alice", form_inputs, scores, age=34)
+    dates, wbs = store.trend("alice", since=datetime.now() - timedelta(days=90))
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Stored score columns; the names match batch.OUTPUT_COLUMNS.
+SCORE_COLUMNS = (
+    "exercise_score", "sqs", "wthr_score", "dqs", "hs",
+    "p_score", "m_score", "e_score", "wbs",
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    age INTEGER,
+    inputs TEXT NOT NULL,
+    {", ".join(f"{name} REAL" for name in SCORE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_user_time ON submissions (user_id, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_time ON submissions (recorded_at);
+"""
+
+_INSERT = (
+    f"INSERT INTO submissions (user_id, recorded_at, age, inputs, {', '.join(SCORE_COLUMNS)}) "
+    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(SCORE_COLUMNS))})"
+)
+
+
+def _timestamp(value):
+    """Unix seconds for a datetime, a number or None (now)."""
+    if value is None:
+        return time.time()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _inputs_json(inputs):
+    return json.dumps(inputs, sort_keys=True, default=lambda value: value.isoformat() if hasattr(value, "isoformat") else str(value))
+
+
+class HistoryStore:
+    """
+    Submission history in one SQLite file, safe to share between sessions.
+
+    Parameters:
+    - path (str): Database file; ":memory:" keeps it in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Streamlit runs each session on its own thread; one connection behind a lock serves them all.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, user_id, inputs, scores, age=None, recorded_at=None):
+        """
+        Stores one submission.
+
+        Parameters:
+        - user_id (str): Whose history the row belongs to.
+        - inputs (dict): The form inputs, stored as JSON.
+        - scores (dict): Values for the names in SCORE_COLUMNS (missing names are stored as NULL).
+        - age (int): Age at submission time.
+        - recorded_at (datetime or float): Submission time (default: now).
+        """
+        self.record_many([(user_id, inputs, scores, age, recorded_at)])
+
+    def record_many(self, rows):
+        """Stores (user_id, inputs, scores, age, recorded_at) tuples in one transaction."""
+        params = [
+            (user_id, _timestamp(recorded_at), age, _inputs_json(inputs), *(scores.get(name) for name in SCORE_COLUMNS))
+            for user_id, inputs, scores, age, recorded_at in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT, params)
+
+    def history(self, user_id, since=None, until=None, columns=SCORE_COLUMNS):
+        """
+        One user's submissions in time order, optionally limited to [since, until].
+
+        Returns:
+        - list: (recorded_at datetime, *columns) tuples.
+        """
+        unknown = [name for name in columns if name not in SCORE_COLUMNS + ("age", "inputs")]
+        if unknown:
+            raise ValueError(f"Unknown history columns: {unknown}")
+        query = f"SELECT recorded_at, {', '.join(columns)} FROM submissions WHERE user_id = ?"
+        params = [user_id]
+        if since is not None:
+            query += " AND recorded_at >= ?"
+            params.append(_timestamp(since))
+        if until is not None:
+            query += " AND recorded_at <= ?"
+            params.append(_timestamp(until))
+        query += " ORDER BY recorded_at"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(datetime.fromtimestamp(row[0]), *row[1:]) for row in rows]
+
+    def trend(self, user_id, since=None, until=None, column="wbs"):
+        """(dates, values) lists of one score for the trend chart."""
+        rows = self.history(user_id, since, until, columns=(column,))
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def submissions_after(self, after_id=0, columns=SCORE_COLUMNS, limit=10_000):
+        """
+        Every user's submissions with an id above ``after_id``, oldest id first, at most ``limit`` of them.
+
+        Returns:
+        - list: (id, inputs dict, *columns) tuples.
+        """
+        unknown = [name for name in columns if name not in SCORE_COLUMNS + ("age",)]
+        if unknown:
+            raise ValueError(f"Unknown history columns: {unknown}")
+        query = f"SELECT id, inputs{''.join(', ' + name for name in columns)} FROM submissions WHERE id > ? ORDER BY id LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (after_id, limit)).fetchall()
+        return [(row[0], json.loads(row[1]), *row[2:]) for row in rows]
+
+    def progress_after(self, submission_ids, column="wbs"):
+        """
+        How each submission's user scored the last time they came back after it.
+
+        Returns:
+        - list: (user_id, score then, days until their latest later submission, score there) tuples,
+          in the order of ``submission_ids``; the last two are None if the user never came back.
+        """
+        if column not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown history column: {column}")
+        submission_ids = [int(i) for i in submission_ids]
+        if not submission_ids:
+            return []
+        # The (user_id, recorded_at) index answers each "latest later submission" lookup directly.
+        query = f"""
+            SELECT s.id, s.user_id, s.{column}, (l.recorded_at - s.recorded_at) / 86400.0, l.{column}
+            FROM submissions s LEFT JOIN submissions l ON l.id = (
+                SELECT id FROM submissions WHERE user_id = s.user_id AND recorded_at > s.recorded_at
+                ORDER BY recorded_at DESC LIMIT 1)
+            WHERE s.id IN ({', '.join('?' * len(submission_ids))})
+        """
+        with self._lock:
+            found = {row[0]: row[1:] for row in self._conn.execute(query, submission_ids)}
+        return [found[i] for i in submission_ids if i in found]
+
+    def count(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM submissions WHERE user_id = ?", (user_id,)).fetchone()[0]
@@ -0,0 +1,300 @@
+"""Nearest-neighbour index of submissions, for "people like you".
+
+Every submission becomes a vector of FEATURES, all on 0-1: the physical
+sub-scores the pipeline already normalizes (WtHR, diet, hydration and
+sleep scores) and the raw mental and emotional inputs scaled by their
+slider ranges. NeighborIndex keeps them in a KD-tree built with NumPy:
+points are reordered so every node owns a contiguous slice with its
+bounding box, nodes split the widest dimension at the median, and leaves
+hold at most LEAF_SIZE points. A k-NN query first scores a small subtree
+around the point, then sweeps the tree a level at a time: every node whose box
+is farther than the current k-th best is dropped in one vectorized step,
+and the surviving leaves are scored together.
+
+New submissions go to a pending buffer that queries scan directly; once
+it outgrows REBUILD_FRACTION of the tree the tree is rebuilt with them.
+sync() inserts every history.HistoryStore row it has not seen (by id), so
+processes sharing one database stay in step, and save()/load() keep the
+whole index in an .npz file for a warm start without a rebuild.
+
+    index = NeighborIndex.load("wellbeing_neighbors.npz")
+    index.sync(history_store)
+    ids, distances = index.query(feature_vector(inputs, sub_scores), k=20)
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from fields import FIELDS
+
+# Sub-scores already on 0-1 (history.SCORE_COLUMNS names).
+COMPONENT_FEATURES = ("wthr_score", "dqs", "hs", "sqs")
+# Raw inputs, scaled to 0-1 by their slider ranges.
+RAW_FEATURES = (
+    "l_stress", "a_focus_hours", "md_mindful_days", "learn_hrs", "purpose_score", "screen_hrs",
+    "c_social_connection", "i_meaningful_interactions", "sm_mood_stability", "resilience_score",
+    "gratitude_days", "nature_hrs",
+)
+FEATURES = COMPONENT_FEATURES + RAW_FEATURES
+
+LEAF_SIZE = 32
+REBUILD_FRACTION = 0.1
+REBUILD_MIN = 1024
+
+# A query first scans the smallest node around the point with at most this many points per neighbour asked for.
+_SEED_POINTS_PER_NEIGHBOR = 16
+
+_LOW = np.array([FIELDS[name].low for name in RAW_FEATURES], dtype=float)
+_RANGE = np.array([FIELDS[name].high - FIELDS[name].low for name in RAW_FEATURES], dtype=float)
+
+
+def scaled_inputs(columns):
+    """(n, len(RAW_FEATURES)) matrix of the raw inputs, each scaled to 0-1 by its slider range."""
+    raw = np.column_stack([np.asarray(columns[name], dtype=float) for name in RAW_FEATURES])
+    return np.clip((raw - _LOW) / _RANGE, 0.0, 1.0)
+
+
+def feature_matrix(columns):
+    """(n, len(FEATURES)) float32 matrix from columns holding every name in FEATURES."""
+    components = np.column_stack([np.asarray(columns[name], dtype=float) for name in COMPONENT_FEATURES])
+    return np.hstack([components, scaled_inputs(columns)]).astype(np.float32)
+
+
+def feature_vector(inputs, sub_scores):
+    """FEATURES vector of one submission: its form inputs and its sub-scores (wthr_score, dqs, hs, sqs)."""
+    return feature_matrix({name: [sub_scores[name] if name in COMPONENT_FEATURES else inputs[name]] for name in FEATURES})[0]
+
+
+class _Tree:
+    """Array-backed KD-tree; node i owns points[start[i]:end[i]] and is a leaf when left[i] < 0."""
+
+    def __init__(self, points, ids, leaf_size=LEAF_SIZE):
+        order = np.arange(len(points))
+        start, end, left, right, lo, hi = [], [], [], [], [], []
+
+        def build(first, last):
+            node = len(start)
+            segment = order[first:last]
+            box = points[segment]
+            start.append(first), end.append(last), left.append(-1), right.append(-1)
+            lo.append(box.min(axis=0)), hi.append(box.max(axis=0))
+            if last - first > leaf_size:
+                dim = int(np.argmax(hi[node] - lo[node]))
+                middle = (first + last) // 2
+                order[first:last] = segment[np.argpartition(box[:, dim], middle - first)]
+                left[node] = build(first, middle)
+                right[node] = build(middle, last)
+            return node
+
+        if len(points):
+            build(0, len(points))
+        self.points, self.ids = points[order], ids[order]
+        self.start, self.end = np.array(start, dtype=np.int64), np.array(end, dtype=np.int64)
+        self.left, self.right = np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+        width = points.shape[1]
+        self.lo = np.array(lo, dtype=np.float32).reshape(-1, width)
+        self.hi = np.array(hi, dtype=np.float32).reshape(-1, width)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        tree = cls.__new__(cls)
+        for name in ("points", "ids", "start", "end", "left", "right", "lo", "hi"):
+            setattr(tree, name, arrays[name])
+        return tree
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in ("points", "ids", "start", "end", "left", "right", "lo", "hi")}
+
+    def _box_distances(self, nodes, point):
+        gap = np.maximum(self.lo[nodes] - point, 0) + np.maximum(point - self.hi[nodes], 0)
+        return np.einsum("ij,ij->i", gap, gap)
+
+    def _scan(self, leaves, point, k, best_distances, best_ids):
+        """Merges every point of ``leaves`` into the best k."""
+        lengths = self.end[leaves] - self.start[leaves]
+        rows = np.repeat(self.start[leaves] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        diff = self.points[rows] - point
+        return _merge(best_distances, best_ids, np.einsum("ij,ij->i", diff, diff), self.ids[rows], k)
+
+    def query(self, point, k, best_distances, best_ids):
+        """Merges this tree's k nearest into (best_distances, best_ids), both sorted arrays; returns them."""
+        if not len(self.start):
+            return best_distances, best_ids
+        # Seed the k-th best distance from the leaf around the point, then sweep level by level,
+        # dropping every node whose box is farther than the current k-th best.
+        seed = 0
+        while self.left[seed] >= 0 and self.end[seed] - self.start[seed] > _SEED_POINTS_PER_NEIGHBOR * k:
+            children = np.array([self.left[seed], self.right[seed]])
+            seed = int(children[np.argmin(self._box_distances(children, point))])
+        best_distances, best_ids = self._scan(np.array([seed]), point, k, best_distances, best_ids)
+        seeded = slice(self.start[seed], self.end[seed])
+        frontier = np.array([0])
+        while len(frontier):
+            if len(best_distances) == k:
+                frontier = frontier[self._box_distances(frontier, point) <= best_distances[-1]]
+            # Nodes inside the seed node were scanned with it.
+            frontier = frontier[(self.start[frontier] < seeded.start) | (self.end[frontier] > seeded.stop)]
+            inner = self.left[frontier] >= 0
+            leaves = frontier[~inner]
+            if len(leaves):
+                best_distances, best_ids = self._scan(leaves, point, k, best_distances, best_ids)
+            frontier = np.concatenate([self.left[frontier[inner]], self.right[frontier[inner]]])
+        return best_distances, best_ids
+
+
+def _merge(best_distances, best_ids, distances, ids, k):
+    distances = np.concatenate([best_distances, distances])
+    ids = np.concatenate([best_ids, ids])
+    if len(distances) > k:
+        keep = np.argpartition(distances, k - 1)[:k]
+        distances, ids = distances[keep], ids[keep]
+    order = np.argsort(distances, kind="stable")
+    return distances[order], ids[order]
+
+
+class NeighborIndex:
+    """
+    KD-tree plus a pending buffer of FEATURES vectors, keyed by history submission id.
+
+    Parameters:
+    - path (str): .npz file sync() saves to at most every save_seconds; None to keep it in memory.
+    - save_seconds (float): Least time between saves.
+    """
+
+    def __init__(self, path=None, save_seconds=60):
+        self.path, self.save_seconds = path, save_seconds
+        self._lock = threading.RLock()
+        self.build(np.empty((0, len(FEATURES))), np.empty(0))
+        self.last_id = 0
+        self._last_save = time.monotonic()
+
+    def __len__(self):
+        return len(self._tree.ids) + self._pending_count
+
+    # --- Updating ---
+    def build(self, points, ids):
+        """Replaces the whole index with ``points`` (n x len(FEATURES)) keyed by ``ids``."""
+        tree = _Tree(np.asarray(points, dtype=np.float32).reshape(-1, len(FEATURES)), np.asarray(ids, dtype=np.int64))
+        with self._lock:
+            self._tree = tree
+            self._pending_points = [np.empty((0, len(FEATURES)), dtype=np.float32)]
+            self._pending_ids = [np.empty(0, dtype=np.int64)]
+            self._pending_count = 0
+
+    def insert(self, points, ids):
+        """Adds points to the pending buffer, rebuilding the tree once the buffer has outgrown it."""
+        with self._lock:
+            self._add_pending(points, ids)
+            self._maybe_rebuild()
+
+    def _add_pending(self, points, ids):
+        self._pending_points.append(np.asarray(points, dtype=np.float32).reshape(-1, len(FEATURES)))
+        self._pending_ids.append(np.asarray(ids, dtype=np.int64).reshape(-1))
+        self._pending_count += len(self._pending_ids[-1])
+
+    def _maybe_rebuild(self):
+        if self._pending_count > max(REBUILD_MIN, REBUILD_FRACTION * len(self._tree.ids)):
+            self.rebuild()
+
+    def rebuild(self):
+        """Rebuilds the tree over every point, pending ones included."""
+        with self._lock:
+            points = np.concatenate([self._tree.points] + self._pending_points)
+            ids = np.concatenate([self._tree.ids] + self._pending_ids)
+            self.build(points, ids)
+
+    def sync(self, store, chunk=10_000):
+        """
+        Inserts every submission in ``store`` (a history.HistoryStore) with an id above last_id.
+
+        Returns:
+        - int: Submissions inserted.
+        """
+        inserted = 0
+        with self._lock:
+            if self.last_id and not store.submissions_after(self.last_id - 1, columns=(), limit=1):
+                self.build(np.empty((0, len(FEATURES))), np.empty(0))  # the database was replaced: start over
+                self.last_id = 0
+            while True:
+                rows = store.submissions_after(self.last_id, columns=COMPONENT_FEATURES, limit=chunk)
+                if not rows:
+                    break
+                columns = {name: [row[2 + i] for row in rows] for i, name in enumerate(COMPONENT_FEATURES)}
+                columns.update({name: [row[1].get(name) for row in rows] for name in RAW_FEATURES})
+                points = feature_matrix(columns)
+                usable = ~np.isnan(points).any(axis=1)
+                self._add_pending(points[usable], np.array([row[0] for row in rows])[usable])
+                self.last_id = rows[-1][0]
+                inserted += len(rows)
+            self._maybe_rebuild()
+        if self.path is not None and inserted and time.monotonic() - self._last_save >= self.save_seconds:
+            self.save()
+        return inserted
+
+    # --- Querying ---
+    def query(self, point, k=10):
+        """
+        The ``k`` nearest indexed submissions to ``point`` (a FEATURES vector).
+
+        Returns:
+        - tuple: (ids, Euclidean distances), nearest first.
+        """
+        point = np.asarray(point, dtype=np.float32)
+        with self._lock:
+            tree = self._tree
+            pending_points = np.concatenate(self._pending_points)
+            pending_ids = np.concatenate(self._pending_ids)
+        diff = pending_points - point
+        best_distances, best_ids = _merge(np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64),
+                                          np.einsum("ij,ij->i", diff, diff), pending_ids, k)
+        best_distances, best_ids = tree.query(point, k, best_distances, best_ids)
+        return best_ids, np.sqrt(best_distances)
+
+    # --- Persistence ---
+    def save(self, path=None):
+        """Writes the whole index to ``path`` (default: self.path) atomically."""
+        path = path or self.path
+        with self._lock:
+            self._last_save = time.monotonic()
+            arrays = dict(self._tree.arrays(), pending_points=np.concatenate(self._pending_points),
+                          pending_ids=np.concatenate(self._pending_ids), last_id=self.last_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, features=np.array(FEATURES), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, save_seconds=60):
+        """The index saved at ``path`` (and saving back to it); empty if missing or built over other FEATURES."""
+        index = cls(path, save_seconds)
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as saved:
+            if tuple(saved["features"]) != FEATURES:
+                return index
+            index._tree = _Tree.from_arrays({name: saved[name] for name in index._tree.arrays()})
+            index._pending_points, index._pending_ids = [saved["pending_points"]], [saved["pending_ids"]]
+            index._pending_count = len(saved["pending_ids"])
+            index.last_id = int(saved["last_id"])
+        return index
+
+
+def main(argv=None):
+    from history import HistoryStore
+
+    parser = argparse.ArgumentParser(description="Build the neighbour index from the whole history database.")
+    parser.add_argument("--db", default="wellbeing_history.db", help="History database to read.")
+    parser.add_argument("--out", default="wellbeing_neighbors.npz", help="Index file to write.")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    index = NeighborIndex()
+    inserted = index.sync(HistoryStore(args.db))
+    index.rebuild()
+    index.save(args.out)
+    print(f"Indexed {inserted:,} submissions in {time.perf_counter() - start:.1f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Cohort dashboard: mean P/M/E/WBS by age band, sex and activity level.
+
+Reads only the materialized aggregates (cohort_stats.py), so a view costs
+the same however much history there is. The results page folds each
+submission in as it is logged; the update() here only catches up rows
+logged by other processes or not yet folded.
+"""
+import time
+
+import streamlit as st
+
+from charts import create_cohort_bar_chart, show_chart
+from cohort_stats import DIMENSIONS, SCORES
+from resources import get_cohort_aggregates, get_submission_log
+import stylesheet
+
+# Groups with fewer submissions than this are left out of the table and chart.
+MIN_GROUP = 20
+
+DIMENSION_LABELS = {"Age band": "age_band", "Sex": "sex", "Activity level": "activity"}
+SCORE_LABELS = {"p_score": "Physical", "m_score": "Mental", "e_score": "Emotional", "wbs": "WBS"}
+
+st.set_page_config(page_title="Cohort Dashboard", layout="wide", page_icon="📊")
+stylesheet.inject()
+
+st.title("📊 Cohort Dashboard")
+
+start = time.perf_counter()
+aggregates = get_cohort_aggregates()
+aggregates.update(get_submission_log())
+
+col_by, col_sex, col_activity = st.columns(3)
+by_labels = col_by.multiselect("Group by", list(DIMENSION_LABELS), default=["Age band"], key="cohort_by")
+sexes = col_sex.multiselect("Sex", DIMENSIONS["sex"], key="cohort_sex", placeholder="Everyone")
+activities = col_activity.multiselect("Activity level", DIMENSIONS["activity"], key="cohort_activity", placeholder="Everyone")
+
+by = tuple(DIMENSION_LABELS[label] for label in by_labels)
+filters = {name: labels for name, labels in (("sex", sexes), ("activity", activities)) if labels}
+everyone = aggregates.table(**filters)
+table = [row for row in aggregates.table(by, **filters) if row["count"] >= MIN_GROUP]
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+total = everyone[0]["count"] if everyone else 0
+st.caption(f"{total:,} submissions · read from the cohort aggregates in {elapsed_ms:.0f} ms")
+
+if not table:
+    st.info(f"No group has {MIN_GROUP} or more submissions yet.")
+else:
+    names = [name for name in DIMENSIONS if name in by]
+    groups = [" · ".join(row[name] for name in names) or "Everyone" for row in table]
+    show_chart(create_cohort_bar_chart(groups, table), use_container_width=True)
+    st.dataframe(
+        [
+            {"Group": group, "Submissions": row["count"],
+             **{f"{SCORE_LABELS[score]} mean": row[f"{score}_mean"] for score in SCORES},
+             **{f"{SCORE_LABELS[score]} sd": row[f"{score}_sd"] for score in SCORES},
+             **{f"{SCORE_LABELS[score]} median": row[f"{score}_median"] for score in SCORES}}
+            for group, row in zip(groups, table)
+        ],
+        use_container_width=True, hide_index=True,
+    )
+    st.caption(f"Groups with fewer than {MIN_GROUP} submissions are not shown.")
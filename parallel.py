@@ -0,0 +1,154 @@
+"""Multi-core batch scoring over shared-memory column buffers.
+
+The input columns are packed into one ``multiprocessing.shared_memory``
+block (text columns as category codes) and each worker scores a row range
+of it in place, writing into a second shared block for the numeric results.
+Nothing but the block names and row ranges is pickled, and every worker
+writes its own rows, so results come back in the original row order.
+
+    with ParallelScorer(workers=8) as scorer:
+        results = scorer.score(frame)   # same columns as batch.score_submissions()
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch import ANALYSIS_COLUMNS, INPUT_COLUMNS, get_age, get_heart_rate_zones, get_wbs_level, score_submissions
+
+# Text inputs, shipped to workers as integer codes into a per-call category list.
+TEXT_COLUMNS = ("intensity", "gender", "activity_str")
+
+# Numeric inputs, packed row-major (one row per column) into the input block.
+NUMERIC_COLUMNS = tuple(name for name in INPUT_COLUMNS if name not in TEXT_COLUMNS) + ("age",)
+
+# Outputs that are derived from other outputs in the parent instead of shipped back.
+_PARENT_COLUMNS = ("zone2", "zone3", "zone4", "level")
+NUMERIC_OUTPUTS = tuple(name for name in ANALYSIS_COLUMNS if name not in _PARENT_COLUMNS)
+
+# Below this many rows per task the pool overhead outweighs the parallel speedup.
+MIN_ROWS_PER_TASK = 20_000
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no ``track``; the creator still unlinks it
+        return shared_memory.SharedMemory(name=name)
+
+
+def _encode_text(values):
+    """Category codes for a text column; missing entries (None/NaN/"") get -1."""
+    index = {}
+    codes = np.array(
+        [index.setdefault(value, len(index)) if isinstance(value, str) and value else -1
+         for value in np.asarray(values, dtype=object).tolist()],
+        dtype=np.float64,
+    )
+    return codes, np.array(list(index), dtype=object)
+
+
+def _decode_text(codes, categories):
+    lookup = np.append(categories, None)  # code -1 indexes the trailing None
+    return lookup[codes.astype(np.int64)]
+
+
+def _score_rows(layout, start, stop):
+    """Worker entry point: scores rows [start, stop) of the shared input block."""
+    n_rows = layout["n_rows"]
+    input_block = _attach(layout["input"])
+    output_block = _attach(layout["output"])
+    inputs = outputs = data = results = None
+    try:
+        inputs = np.ndarray((len(layout["columns"]), n_rows), dtype=np.float64, buffer=input_block.buf)
+        outputs = np.ndarray((len(NUMERIC_OUTPUTS), n_rows), dtype=np.float64, buffer=output_block.buf)
+        data = {name: inputs[i, start:stop] for i, name in enumerate(layout["columns"])}
+        for name, categories in layout["categories"].items():
+            data[name] = _decode_text(data[name], categories)
+        results = score_submissions(data, wake_hour=layout["wake_hour"])
+        for i, name in enumerate(NUMERIC_OUTPUTS):
+            outputs[i, start:stop] = results[name]
+    finally:
+        # Views into a block must be gone before it can be closed.
+        inputs = outputs = data = results = None
+        input_block.close()
+        output_block.close()
+    return stop - start
+
+
+def _row_ranges(n_rows, n_tasks):
+    bounds = np.linspace(0, n_rows, n_tasks + 1).astype(np.int64)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+class ParallelScorer:
+    """
+    Process pool that scores batches of form submissions on all cores.
+
+    Parameters:
+    - workers (int): Worker processes (default: os.cpu_count()).
+    - tasks_per_worker (int): Row ranges queued per worker, for load balancing.
+    """
+
+    def __init__(self, workers=None, tasks_per_worker=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.tasks_per_worker = tasks_per_worker
+        self._pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def score(self, data, today=None, wake_hour=7):
+        """Same inputs and outputs as batch.score_submissions(), computed across the pool."""
+        n_rows = len(data["weight_kg"])
+        n_tasks = min(self.workers * self.tasks_per_worker, n_rows // MIN_ROWS_PER_TASK)
+        if self._pool is None or n_tasks < 2:
+            return score_submissions(data, today=today, wake_hour=wake_hour)
+
+        age = np.asarray(data["age"], dtype=float) if "age" in data else get_age(data["dob"], today)
+        columns = NUMERIC_COLUMNS + TEXT_COLUMNS
+        input_block = shared_memory.SharedMemory(create=True, size=len(columns) * n_rows * 8)
+        output_block = shared_memory.SharedMemory(create=True, size=len(NUMERIC_OUTPUTS) * n_rows * 8)
+        inputs = outputs = None
+        try:
+            inputs = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=input_block.buf)
+            categories = {}
+            for i, name in enumerate(columns):
+                if name in TEXT_COLUMNS:
+                    inputs[i], categories[name] = _encode_text(data[name])
+                else:
+                    inputs[i] = age if name == "age" else data[name]
+            layout = {
+                "input": input_block.name, "output": output_block.name, "n_rows": n_rows,
+                "columns": columns, "categories": categories, "wake_hour": wake_hour,
+            }
+            futures = [self._pool.submit(_score_rows, layout, start, stop) for start, stop in _row_ranges(n_rows, n_tasks)]
+            for future in futures:
+                future.result()
+
+            outputs = np.ndarray((len(NUMERIC_OUTPUTS), n_rows), dtype=np.float64, buffer=output_block.buf)
+            results = {name: outputs[i].copy() for i, name in enumerate(NUMERIC_OUTPUTS)}
+        finally:
+            inputs = outputs = None
+            for block in (input_block, output_block):
+                block.close()
+                block.unlink()
+
+        results["zone2"], results["zone3"], results["zone4"] = get_heart_rate_zones(results["age"])
+        results["level"] = get_wbs_level(results["wbs"])
+        return {name: results[name] for name in ANALYSIS_COLUMNS}
+
+
+def score_parallel(data, workers=None, today=None, wake_hour=7):
+    """One-off convenience wrapper around ParallelScorer.score()."""
+    with ParallelScorer(workers) as scorer:
+        return scorer.score(data, today=today, wake_hour=wake_hour)
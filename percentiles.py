@@ -0,0 +1,272 @@
+"""Population percentiles of the pillar scores and WBS, per age/sex cohort.
+
+Every score the page produces is rounded to one decimal in [0, 100], so a
+histogram with one bin per 0.1 (1001 bins) is an exact quantile sketch:
+nothing is approximated, two sketches merge by adding their counts, and a
+sketch serializes to at most 1001 numbers. Counts live in a Fenwick tree,
+so recording a score and answering a percentile both take ~10 steps
+regardless of how many submissions have been seen.
+
+PercentileService keeps one sketch per (score, cohort) plus one per score
+for everyone. Each server process persists only the submissions it recorded
+itself, to its own file in a shared directory, and merges every other
+process's file when it loads or refreshes, so counts are never duplicated.
+A process that finds its own file already there (a restart that got the
+same host name and PID) carries on from the counts in it.
+
+    service = PercentileService.open("wellbeing_sketches")
+    service.record({"wbs": 72.4, "p_score": 80.1, ...}, age=34, gender="Female")
+    service.percentile("wbs", 72.4, cohort_key(34, "Female"))   # 0-100
+"""
+import glob
+import json
+import math
+import os
+import socket
+import threading
+import time
+
+# Scores with a population sketch; the names match batch.OUTPUT_COLUMNS.
+SCORE_NAMES = ("wbs", "p_score", "m_score", "e_score")
+
+# Sketch resolution: scores are rounded to one decimal on [0, 100].
+_SCALE = 10
+_BINS = 100 * _SCALE + 1
+
+ALL_USERS = "all"
+
+# Lower bounds of the cohort age bands, and their labels.
+AGE_BANDS = ((70, "70+"), (60, "60-69"), (50, "50-59"), (40, "40-49"), (30, "30-39"), (18, "18-29"), (0, "under 18"))
+
+
+def cohort_key(age, gender):
+    """Cohort label such as "Female 30-39"; "Prefer not to say" and unknowns fall under "Any sex"."""
+    band = next(label for lower, label in AGE_BANDS if (age or 0) >= lower)
+    sex = gender if gender in ("Male", "Female") else "Any sex"
+    return f"{sex} {band}"
+
+
+def _bin(score):
+    return min(max(int(round(float(score) * _SCALE)), 0), _BINS - 1)
+
+
+class ScoreSketch:
+    """Exact 0.1-resolution histogram of scores on [0, 100]: per-bin counts plus a Fenwick tree over them."""
+
+    __slots__ = ("_bins", "_tree", "count")
+
+    def __init__(self):
+        self._bins = [0] * _BINS
+        self._tree = [0] * (_BINS + 1)  # 1-based Fenwick tree over _bins
+        self.count = 0
+
+    def add(self, score, count=1):
+        b = _bin(score)
+        self._bins[b] += count
+        self.count += count
+        i = b + 1
+        while i <= _BINS:
+            self._tree[i] += count
+            i += i & -i
+
+    def rank(self, score):
+        """Number of recorded scores <= ``score``."""
+        i = _bin(score) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def percentile(self, score):
+        """Mid-rank percentile of ``score``: the share below it plus half the ties, 0-100 (None if empty)."""
+        if not self.count:
+            return None
+        at_or_below = self.rank(score)
+        return 100.0 * (at_or_below - self._bins[_bin(score)] / 2) / self.count
+
+    def quantile(self, q):
+        """Smallest recorded score with at least a ``q`` share of scores at or below it (None if empty)."""
+        if not self.count:
+            return None
+        remaining = max(1, math.ceil(q * self.count))
+        position = 0
+        step = 1 << (_BINS.bit_length() - 1)
+        while step:
+            nxt = position + step
+            if nxt <= _BINS and self._tree[nxt] < remaining:
+                position = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return position / _SCALE
+
+    def counts(self):
+        """Per-bin counts as {bin: count}, only for non-empty bins."""
+        return {b: count for b, count in enumerate(self._bins) if count}
+
+    def merge(self, other):
+        """Adds ``other``'s counts to this sketch (rebuilding the tree in one pass)."""
+        self._bins = [a + b for a, b in zip(self._bins, other._bins)]
+        self.count += other.count
+        self._rebuild()
+        return self
+
+    def _rebuild(self):
+        tree = [0] + self._bins
+        for i in range(1, _BINS + 1):
+            parent = i + (i & -i)
+            if parent <= _BINS:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    @classmethod
+    def from_counts(cls, counts):
+        sketch = cls()
+        for b, count in counts.items():
+            sketch._bins[int(b)] += count
+            sketch.count += count
+        sketch._rebuild()
+        return sketch
+
+
+_EMPTY = ScoreSketch()
+
+
+class PercentileService:
+    """
+    Score sketches for every (score, cohort), persisted per process in ``directory``.
+
+    Parameters:
+    - directory (str or None): Shared sketch directory; None keeps everything in memory.
+    - flush_seconds (float): Minimum time between writes of this process's file.
+    - refresh_seconds (float): Minimum time between re-reading the other processes' files.
+    """
+
+    def __init__(self, directory=None, flush_seconds=10.0, refresh_seconds=60.0):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.refresh_seconds = refresh_seconds
+        self._own = {}     # (score, cohort) -> ScoreSketch recorded by this process
+        self._others = {}  # (score, cohort) -> ScoreSketch merged from other processes' files
+        self._lock = threading.Lock()
+        self._own_path = None
+        self._last_flush = self._last_refresh = 0.0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._own_path = os.path.join(directory, f"sketch-{socket.gethostname()}-{os.getpid()}.json")
+            self._own = self._load(self._own_path) or {}
+            self.refresh(force=True)
+
+    @classmethod
+    def open(cls, directory, **kwargs):
+        return cls(directory, **kwargs)
+
+    # --- Updates ---
+    def record(self, scores, age, gender):
+        """Adds one submission's scores (a dict with SCORE_NAMES keys) to the overall and cohort sketches."""
+        cohort = cohort_key(age, gender)
+        with self._lock:
+            for name in SCORE_NAMES:
+                if scores.get(name) is None:
+                    continue
+                for key in ((name, ALL_USERS), (name, cohort)):
+                    sketch = self._own.get(key)
+                    if sketch is None:
+                        sketch = self._own[key] = ScoreSketch()
+                    sketch.add(scores[name])
+        self._maybe_flush()
+        self.refresh()
+
+    def merge(self, other):
+        """Adds every sketch of another PercentileService (or of a loaded file) to this process's own counts."""
+        with self._lock:
+            for key, sketch in other.items():
+                self._own.setdefault(key, ScoreSketch()).merge(sketch)
+
+    def items(self):
+        """(key, combined sketch) pairs over this process's and the other processes' counts."""
+        with self._lock:
+            keys = set(self._own) | set(self._others)
+            return [(key, ScoreSketch().merge(self._own.get(key, _EMPTY)).merge(self._others.get(key, _EMPTY)))
+                    for key in keys]
+
+    # --- Queries ---
+    def percentile(self, name, score, cohort=ALL_USERS):
+        """
+        Share of recorded scores below ``score`` (ties count half), as 0-100.
+
+        Returns:
+        - tuple: (percentile or None when nobody is recorded yet, number of scores in the group).
+        """
+        with self._lock:
+            sketches = [s for s in (self._own.get((name, cohort)), self._others.get((name, cohort))) if s is not None]
+            count = sum(s.count for s in sketches)
+            if not count:
+                return None, 0
+            at_or_below = sum(s.rank(score) for s in sketches)
+            ties = sum(s._bins[_bin(score)] for s in sketches)
+        return 100.0 * (at_or_below - ties / 2) / count, count
+
+    def standing(self, scores, age, gender):
+        """{score: {"all": (pct, n), "cohort": (pct, n)}} for one submission, plus its "cohort" label."""
+        cohort = cohort_key(age, gender)
+        result = {"cohort": cohort}
+        for name in SCORE_NAMES:
+            if scores.get(name) is not None:
+                result[name] = {"all": self.percentile(name, scores[name]), "cohort": self.percentile(name, scores[name], cohort)}
+        return result
+
+    # --- Persistence ---
+    @staticmethod
+    def _dump(sketches):
+        return {f"{name}|{cohort}": sketch.counts() for (name, cohort), sketch in sketches.items()}
+
+    @staticmethod
+    def _parse(payload):
+        sketches = {}
+        for key, counts in payload.items():
+            name, _, cohort = key.partition("|")
+            sketches[(name, cohort)] = ScoreSketch.from_counts(counts)
+        return sketches
+
+    @classmethod
+    def _load(cls, path):
+        """Sketches in the file at ``path``, or None if it is missing or unreadable."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls._parse(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def flush(self):
+        """Writes this process's own sketches to its file (atomically)."""
+        if self._own_path is None:
+            return
+        with self._lock:
+            payload = self._dump(self._own)
+            self._last_flush = time.monotonic()
+        tmp_path = f"{self._own_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self._own_path)
+
+    def _maybe_flush(self):
+        if self._own_path is not None and time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def refresh(self, force=False):
+        """Re-reads every other process's sketch file in the directory."""
+        if self.directory is None or (not force and time.monotonic() - self._last_refresh < self.refresh_seconds):
+            return
+        others = {}
+        for path in glob.glob(os.path.join(self.directory, "sketch-*.json")):
+            if path == self._own_path:
+                continue
+            loaded = self._load(path)
+            if loaded is None:
+                continue  # half-written or removed meanwhile; picked up on the next refresh
+            for key, sketch in loaded.items():
+                others.setdefault(key, ScoreSketch()).merge(sketch)
+        with self._lock:
+            self._others = others
+            self._last_refresh = time.monotonic()
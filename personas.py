@@ -0,0 +1,259 @@
+"""Well-being personas: mini-batch k-means over the mental and emotional inputs.
+
+Every submission becomes the vector of FEATURES, the inputs behind
+calculate_m_score() and calculate_e_score(), each scaled to 0-1 by its
+slider range (neighbors.scaled_inputs()). PersonaModel clusters them with
+mini-batch k-means: centres start from k-means++ on a sample of rows, then
+every mini-batch of BATCH rows moves each centre to the running mean of all
+the points ever assigned to it (a per-centre learning rate of 1/count).
+
+Training streams over the submission log (submission_log.py) in CHUNK-row
+slices of its memory map, so no more than one slice is ever in memory
+however long the history is. Like the cohort aggregates, the model
+remembers how many log rows it has seen: update() trains on the rows
+appended since, so a periodic job keeps it current. Assigning a new
+submission is one distance per persona, the same cost whatever the
+history holds.
+
+Personas are named after their most distinctive traits: the features whose
+centre lies furthest (in standard deviations) from the average of every row
+trained on, e.g. "High stress, weak social ties, heavy screen time".
+
+    model = PersonaModel.load("wellbeing_personas.npz")
+    persona = model.assign(persona_vector(inputs))
+    model.names[persona], model.share(persona)
+
+Train (or catch up) offline from the submission log:
+
+    python personas.py --log wellbeing_submissions.log --out wellbeing_personas.npz
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from neighbors import RAW_FEATURES, scaled_inputs
+from records import MISSING_CODE
+
+FEATURES = RAW_FEATURES
+
+# (trait below average, trait above average) per feature, for persona names.
+TRAITS = {
+    "l_stress": ("low stress", "high stress"),
+    "a_focus_hours": ("little focused work", "long focused work"),
+    "md_mindful_days": ("rarely mindful", "regular mindfulness"),
+    "learn_hrs": ("little learning", "keen learner"),
+    "purpose_score": ("unsure of purpose", "strong sense of purpose"),
+    "screen_hrs": ("light screen time", "heavy screen time"),
+    "c_social_connection": ("weak social ties", "strong social ties"),
+    "i_meaningful_interactions": ("few meaningful interactions", "many meaningful interactions"),
+    "sm_mood_stability": ("changeable mood", "steady mood"),
+    "resilience_score": ("low resilience", "high resilience"),
+    "gratitude_days": ("little gratitude practice", "regular gratitude practice"),
+    "nature_hrs": ("little time in nature", "lots of time in nature"),
+}
+BALANCED_NAME = "Balanced all-rounder"
+
+PERSONAS = 6
+BATCH = 1024
+# Rows read from the log's memory map at a time; batches are shuffled within a chunk.
+CHUNK = 65536
+# Rows sampled across the log for the k-means++ start; training waits for MIN_ROWS logged rows.
+INIT_SAMPLE = 10_000
+MIN_ROWS = 1000
+# A feature names a persona when its centre is at least this many standard deviations from average.
+TRAIT_MIN_SD = 0.5
+MAX_TRAITS = 3
+
+
+def persona_vector(inputs):
+    """FEATURES vector of one submission (a dict holding every name in FEATURES)."""
+    return scaled_inputs({name: [inputs[name]] for name in FEATURES})[0]
+
+
+def log_points(rows):
+    """FEATURES matrix of submission log rows, leaving out rows with a missing input."""
+    columns = {
+        name: np.where(rows[name] == MISSING_CODE, np.nan, rows[name]) if rows.dtype[name] == np.uint8 else rows[name]
+        for name in FEATURES
+    }
+    points = scaled_inputs(columns)
+    return points[~np.isnan(points).any(axis=1)]
+
+
+class PersonaModel:
+    """
+    Persona centres, trained with mini-batch k-means.
+
+    Parameters:
+    - personas (int): Number of personas (k).
+    - seed (int): Seed for the k-means++ start and the batch order.
+    """
+
+    def __init__(self, personas=PERSONAS, seed=0):
+        self.personas = personas
+        self.centers = None
+        self.counts = np.zeros(personas, dtype=np.int64)
+        self.rows_seen = 0
+        # Count, sum and sum of squares per feature over every row trained on, for the persona names.
+        self.seen = 0
+        self.total = np.zeros(len(FEATURES))
+        self.total_sq = np.zeros(len(FEATURES))
+        self.names = []
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def ready(self):
+        return self.centers is not None
+
+    # --- Training ---
+    def update(self, log, epochs=1):
+        """
+        Trains on every row appended to ``log`` since the last update.
+
+        Parameters:
+        - log (SubmissionLog): Log to stream from.
+        - epochs (int): Passes over the new rows; more than one refines a first training.
+          Every row is counted once, on the first pass.
+
+        Returns:
+        - int: Log rows trained on now (0 while the log holds fewer than MIN_ROWS rows).
+        """
+        rows = log.rows()[self.rows_seen:]
+        if not self.ready:
+            if len(rows) < MIN_ROWS:
+                return 0
+            sample = log_points(rows[np.sort(self._rng.choice(len(rows), min(len(rows), INIT_SAMPLE), replace=False))])
+            if len(sample) < self.personas:
+                return 0
+            self.centers = _kmeans_plus_plus(sample, self.personas, self._rng)
+        for epoch in range(epochs):
+            for start in self._rng.permutation(np.arange(0, len(rows), CHUNK)):
+                points = log_points(rows[start:start + CHUNK])
+                if epoch == 0:
+                    self.seen += len(points)
+                    self.total += points.sum(axis=0)
+                    self.total_sq += (points * points).sum(axis=0)
+                points = points[self._rng.permutation(len(points))]
+                for offset in range(0, len(points), BATCH):
+                    self.partial_fit(points[offset:offset + BATCH], count=epoch == 0)
+        self.rows_seen += len(rows)
+        self.names = self._name_personas()
+        return len(rows)
+
+    def partial_fit(self, points, count=True):
+        """
+        One mini-batch step: moves every centre to the mean of all the points ever assigned to it.
+
+        Parameters:
+        - points (ndarray): Mini-batch of FEATURES vectors.
+        - count (bool): Add the batch to ``counts``; False for a repeat pass over rows already
+          counted, so every row weighs once in the learning rate and in share().
+        """
+        labels = _nearest(points, self.centers)
+        members = labels == np.arange(self.personas)[:, None]
+        counts = members.sum(axis=1)
+        sums = members @ points
+        moved = counts > 0
+        if count:
+            self.counts += counts
+        # A repeat pass can assign a centre more points than it has counted; it then moves to their mean.
+        weights = np.maximum(self.counts[moved], counts[moved])[:, None]
+        self.centers[moved] += (sums[moved] - counts[moved, None] * self.centers[moved]) / weights
+
+    def _name_personas(self):
+        mean = self.total / max(self.seen, 1)
+        sd = np.sqrt(np.maximum(self.total_sq / max(self.seen, 1) - mean * mean, 1e-12))
+        names = []
+        for center in self.centers:
+            distance = (center - mean) / sd
+            order = [j for j in np.argsort(-np.abs(distance))[:MAX_TRAITS] if abs(distance[j]) >= TRAIT_MIN_SD]
+            traits = [TRAITS[FEATURES[j]][int(distance[j] > 0)] for j in order]
+            names.append(", ".join(traits).capitalize() if traits else BALANCED_NAME)
+        return names
+
+    # --- Assigning ---
+    def assign(self, point):
+        """Persona number of one persona_vector()."""
+        diff = self.centers - point
+        return int(np.argmin(np.einsum("ij,ij->i", diff, diff)))
+
+    def share(self, persona):
+        """Fraction of the training rows assigned to ``persona``."""
+        return float(self.counts[persona] / max(self.counts.sum(), 1))
+
+    # --- Persistence ---
+    def save(self, path):
+        """Writes the model to ``path`` atomically."""
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, features=np.array(FEATURES), centers=self.centers, counts=self.counts,
+                 rows_seen=self.rows_seen, seen=self.seen, total=self.total, total_sq=self.total_sq)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, log=None, seed=0):
+        """
+        The model saved at ``path``, or an untrained one if it is missing, stale
+        (more rows seen than ``log`` holds) or built over other FEATURES.
+        """
+        if not os.path.exists(path):
+            return cls(seed=seed)
+        with np.load(path) as saved:
+            model = cls(len(saved["centers"]), seed)
+            if tuple(saved["features"]) != FEATURES or (log is not None and int(saved["rows_seen"]) > len(log)):
+                return model
+            model.centers, model.counts = saved["centers"], saved["counts"]
+            model.rows_seen, model.seen = int(saved["rows_seen"]), int(saved["seen"])
+            model.total, model.total_sq = saved["total"], saved["total_sq"]
+        model.names = model._name_personas()
+        return model
+
+
+def _nearest(points, centers):
+    """Index of the nearest centre to every point."""
+    distances = (points * points).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers * centers).sum(axis=1)
+    return np.argmin(distances, axis=1)
+
+
+def _kmeans_plus_plus(points, k, rng):
+    """k starting centres: each next one drawn with probability proportional to its squared distance to the nearest so far."""
+    centers = [points[rng.integers(len(points))]]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        choice = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centers.append(points[choice])
+        closest = np.minimum(closest, ((points - points[choice]) ** 2).sum(axis=1))
+    return np.array(centers, dtype=float)
+
+
+def main(argv=None):
+    from submission_log import SubmissionLog
+
+    parser = argparse.ArgumentParser(description="Train the personas on the submission log, or catch them up with its new rows.")
+    parser.add_argument("--log", default="wellbeing_submissions.log", help="Submission log to read.")
+    parser.add_argument("--out", default="wellbeing_personas.npz", help="Model file to update and write.")
+    parser.add_argument("--personas", type=int, default=PERSONAS, help=f"Number of personas for a new model (default: {PERSONAS}).")
+    parser.add_argument("--epochs", type=int, default=3, help="Passes over the new rows (default: 3).")
+    parser.add_argument("--retrain", action="store_true", help="Start from scratch instead of from the saved model.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the start and the batch order.")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    log = SubmissionLog(args.log)
+    model = None if args.retrain else PersonaModel.load(args.out, log, args.seed)
+    if model is None or not model.ready:
+        model = PersonaModel(args.personas, args.seed)
+    rows = model.update(log, epochs=args.epochs)
+    if not model.ready:
+        print(f"Only {len(log):,} submissions logged; personas need {MIN_ROWS:,}")
+        return 1
+    model.save(args.out)
+    print(f"Trained on {rows:,} new submissions in {time.perf_counter() - start:.1f} s -> {args.out}")
+    for persona, name in enumerate(model.names):
+        print(f"{model.share(persona):6.1%}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+"""Compact records of a scored submission: one slotted dataclass, or many in a structured array.
+
+A submission is the form inputs (batch.SUBMISSION_COLUMNS) plus the
+analysis score_submissions() derives from them (batch.ANALYSIS_COLUMNS).
+ProfileRecord holds one of them in a ``__slots__`` dataclass;
+RECORD_DTYPE packs the same fields into a fixed-width NumPy row for
+collections, and the two convert both ways without loss:
+
+- slider inputs and rounded results are float32, read back rounded to
+  their decimals (every value a widget or score can take survives);
+- whole-number sliders are uint8; choices (intensity, gender, activity)
+  are uint8 codes into their option lists; both hold MISSING_CODE for a
+  missing value (NaN, None);
+- a number left as None in a ProfileRecord is NaN (or MISSING_CODE) in
+  the array and None again in the record read back;
+- age and wthr_value, which are not rounded, stay float64; dob is
+  datetime64[D] (NaT for none);
+- the text results (zone2-4 and level) are not stored at all: they are
+  functions of age and WBS and are rebuilt from them (so a record without
+  a WBS reads back with level "N/A", as score_submissions() labels it).
+
+Per record (CPython 3.11, 64-bit):
+
+- RECORD_DTYPE row: 134 bytes;
+- ProfileRecord: 416 bytes for the instance, about 1.3 KB with its floats,
+  date and zone strings (small ints and option strings are shared);
+- the same submission as a dict: 1.6 KB for the dict, about 2.4 KB with
+  its values (keys shared).
+
+    rows = from_columns(submissions, score_submissions(submissions))
+    rows["wbs"].mean()
+    record = ProfileRecord.from_row(rows[0])
+"""
+from dataclasses import dataclass, fields
+from datetime import date
+
+import numpy as np
+
+from batch import ANALYSIS_COLUMNS, INPUT_COLUMNS, get_heart_rate_zones, get_wbs_level
+from fields import FIELDS, GENDERS
+from scoring import ACTIVITY_MAP
+
+MISSING_CODE = 255
+
+# Options behind each coded column, in code order.
+CHOICES = {
+    "intensity": FIELDS["intensity"].options,
+    "gender": GENDERS,
+    "activity_str": tuple(ACTIVITY_MAP),
+}
+
+# Decimals of the float32 results (score_submissions() rounds them this far).
+_RESULT_DECIMALS = {
+    "bmi": 1, "bmr": 0, "tdee": 0,
+    "wthr_score": 3, "dqs": 3, "hs": 3, "exercise_score": 3, "sqs": 3,
+    "protein_needs_grams": 0, "circadian_alignment_score": 1, "burnout_risk_score": 1,
+    "p_score": 1, "m_score": 1, "e_score": 1, "wbs": 1,
+}
+
+# Results rebuilt from age and WBS instead of stored.
+DERIVED_COLUMNS = ("zone2", "zone3", "zone4", "level")
+
+
+def _decimals(step):
+    return len(f"{step}".partition(".")[2].rstrip("0"))
+
+
+def _layout():
+    """(name, dtype, decimals) per stored column; decimals None means stored exactly."""
+    layout = []
+    for name in INPUT_COLUMNS:
+        field = FIELDS[name]
+        if field.options is not None:
+            layout.append((name, "u1", None))
+        elif float(field.step).is_integer() and float(field.low).is_integer() and 0 <= field.low and field.high < MISSING_CODE:
+            layout.append((name, "u1", None))
+        else:
+            layout.append((name, "f4", _decimals(field.step)))
+    layout += [("gender", "u1", None), ("activity_str", "u1", None), ("dob", "M8[D]", None)]
+    for name in ANALYSIS_COLUMNS:
+        if name in _RESULT_DECIMALS:
+            layout.append((name, "f4", _RESULT_DECIMALS[name]))
+        elif name not in DERIVED_COLUMNS:
+            layout.append((name, "f8", None))
+    return tuple(layout)
+
+
+LAYOUT = _layout()
+RECORD_DTYPE = np.dtype([(name, dtype) for name, dtype, _ in LAYOUT])
+# Whole-number inputs, stored as uint8.
+WHOLE_COLUMNS = tuple(name for name, dtype, _ in LAYOUT if dtype == "u1" and name not in CHOICES)
+
+
+@dataclass(slots=True)
+class ProfileRecord:
+    """One submission and its analysis; the results default to None until scored."""
+
+    weight_kg: float
+    height_cm: float
+    waist_cm: float
+    f_exercise_freq: int
+    intensity: str
+    sleep_h: float
+    sleep_q: int
+    bedtime_consistency_score: int
+    water_liters: float
+    fruit_veg_servings: int
+    whole_grains_freq: int
+    processed_freq: int
+    l_stress: int
+    md_mindful_days: int
+    a_focus_hours: float
+    learn_hrs: int
+    purpose_score: int
+    screen_hrs: float
+    c_social_connection: int
+    i_meaningful_interactions: int
+    sm_mood_stability: int
+    resilience_score: int
+    gratitude_days: int
+    nature_hrs: float
+    gender: str
+    activity_str: str
+    dob: date | None = None
+    age: float | None = None
+    bmi: float | None = None
+    bmr: float | None = None
+    tdee: float | None = None
+    wthr_value: float | None = None
+    wthr_score: float | None = None
+    dqs: float | None = None
+    hs: float | None = None
+    exercise_score: float | None = None
+    sqs: float | None = None
+    protein_needs_grams: float | None = None
+    zone2: str | None = None
+    zone3: str | None = None
+    zone4: str | None = None
+    circadian_alignment_score: float | None = None
+    burnout_risk_score: float | None = None
+    p_score: float | None = None
+    m_score: float | None = None
+    e_score: float | None = None
+    wbs: float | None = None
+    level: str | None = None
+
+    @classmethod
+    def from_row(cls, row):
+        """The record held in one RECORD_DTYPE row (or a 0-d/1-row array)."""
+        return from_array(np.asarray(row, dtype=RECORD_DTYPE).reshape(1))[0]
+
+    def to_row(self):
+        """This record as a 0-d RECORD_DTYPE array."""
+        return to_array([self])[0]
+
+
+RECORD_FIELDS = tuple(field.name for field in fields(ProfileRecord))
+
+
+# --- Columns <-> structured array ---
+def _encode(values, options):
+    values = np.asarray(values, dtype=object)
+    codes = np.full(values.shape, MISSING_CODE, dtype=np.uint8)
+    for code, option in enumerate(options):
+        codes[values == option] = code
+    return codes
+
+
+def _decode(codes, options):
+    table = np.asarray(list(options) + [None] * (MISSING_CODE + 1 - len(options)), dtype=object)
+    return table[codes]
+
+
+def from_columns(inputs, results=None):
+    """
+    Packs submissions into a structured array.
+
+    Parameters:
+    - inputs (DataFrame or mapping): One column per name in
+      batch.SUBMISSION_COLUMNS ("dob" may be missing if results has "age").
+    - results (mapping): score_submissions() output for the same rows; its
+      columns are NaN where omitted.
+
+    Returns:
+    - ndarray: One RECORD_DTYPE row per submission.
+    """
+    results = results if results is not None else {}
+    n = len(inputs[INPUT_COLUMNS[0]])
+    rows = np.zeros(n, dtype=RECORD_DTYPE)
+    for name, dtype, _ in LAYOUT:
+        source = results if name in ANALYSIS_COLUMNS else inputs
+        if name in CHOICES:
+            rows[name] = _encode(source[name], CHOICES[name])
+        elif name == "dob":
+            rows[name] = np.asarray(source[name], dtype="M8[D]") if name in source else np.datetime64("NaT")
+        elif name in WHOLE_COLUMNS:
+            values = np.asarray(source[name], dtype=float)
+            rows[name] = np.where(np.isnan(values), MISSING_CODE, values).astype(np.uint8)
+        elif name in source:
+            rows[name] = np.asarray(source[name], dtype=float)
+        else:
+            rows[name] = np.nan
+    return rows
+
+
+def to_columns(rows):
+    """
+    Unpacks a structured array into columns, rounded back to their exact values.
+
+    Returns:
+    - dict: One array per name in RECORD_FIELDS (text and choices as object
+      arrays, dob as datetime64[D], whole-number inputs as int64 or, if any
+      is missing, float64 with NaN; the rest float64).
+    """
+    columns = {}
+    for name, dtype, decimals in LAYOUT:
+        values = rows[name]
+        if name in CHOICES:
+            columns[name] = _decode(values, CHOICES[name])
+        elif dtype == "u1":
+            missing = values == MISSING_CODE
+            columns[name] = np.where(missing, np.nan, values) if missing.any() else values.astype(np.int64)
+        elif decimals is not None:
+            columns[name] = np.round(values.astype(float), decimals)
+        else:
+            columns[name] = values.copy()
+    columns["zone2"], columns["zone3"], columns["zone4"] = get_heart_rate_zones(columns["age"])
+    columns["level"] = get_wbs_level(columns["wbs"])
+    return {name: columns[name] for name in RECORD_FIELDS}
+
+
+# --- Records <-> structured array ---
+def to_array(records):
+    """Packs ProfileRecords into one RECORD_DTYPE row each; results left as None become NaN."""
+    records = list(records)
+    columns = {}
+    for name in RECORD_FIELDS:
+        values = [getattr(record, name) for record in records]
+        if name not in CHOICES and name not in DERIVED_COLUMNS and name != "dob":
+            values = [np.nan if value is None else value for value in values]
+        columns[name] = values
+    return from_columns(columns, columns)
+
+
+def from_array(rows):
+    """ProfileRecords for every row of a RECORD_DTYPE array; missing numbers (NaN, MISSING_CODE) become None."""
+    columns = to_columns(rows)
+    lists = []
+    for name in RECORD_FIELDS:
+        values = columns[name].tolist()
+        if columns[name].dtype.kind == "f":
+            whole = name in WHOLE_COLUMNS
+            values = [None if value != value else int(value) if whole else value for value in values]
+        lists.append(values)
+    return [ProfileRecord(*values) for values in zip(*lists)]
@@ -0,0 +1,57 @@
+"""Per-process resources shared by doc.py and the pages/ scripts, and the background maintenance thread.
+
+st.cache_resource keys a cached function by the module that defines it, so
+a getter defined here is one instance per server process whichever page
+calls it first. A copy in each page would be one instance per page, each
+saving over the same file.
+
+Upkeep that the results page does not read back (appending to the
+submission log and folding the new row into the cohort aggregates, catching
+the "people like you" index up with the history database) runs on one
+background thread through run_in_background(), so a submit does not wait
+for it. Jobs run one at a time in the order queued; a job that raises is
+logged and the rest carry on.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from timing import TIMER
+
+
+# --- Submission Log & Cohorts ---
+@st.cache_resource
+def get_submission_log():
+    """One SubmissionLog per server process; processes append to the same WELLBEING_SUBMISSION_LOG file."""
+    from submission_log import SubmissionLog  # NumPy-backed; loaded on first use
+    return SubmissionLog(os.environ.get("WELLBEING_SUBMISSION_LOG", "wellbeing_submissions.log"))
+
+
+@st.cache_resource
+def get_cohort_aggregates():
+    """One CohortAggregates per server process, loaded from WELLBEING_COHORT_STATS and saved back to it."""
+    from cohort_stats import CohortAggregates  # NumPy-backed; loaded on first use
+    return CohortAggregates.load(os.environ.get("WELLBEING_COHORT_STATS", "wellbeing_cohorts.npz"), get_submission_log())
+
+
+# --- Background Maintenance ---
+@st.cache_resource(on_release=lambda executor: executor.shutdown(wait=True))
+def get_maintenance_executor():
+    """The one thread that runs run_in_background() jobs; clearing the cache finishes the queued ones first."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="wellbeing-maintenance")
+
+
+def run_in_background(stage, job, *args):
+    """Queues ``job(*args)`` on the maintenance thread, timed as ``stage``; returns its Future."""
+    return get_maintenance_executor().submit(_run_job, stage, job, *args)
+
+
+def _run_job(stage, job, *args):
+    try:
+        with TIMER.stage(stage):
+            return job(*args)
+    except Exception:
+        logging.getLogger("wellbeing.maintenance").exception("Background job %r failed", stage)
+        raise
@@ -0,0 +1,112 @@
+"""Bounded, thread-safe LRU/TTL cache for analysis results.
+
+Streamlit runs one script thread per session, so a single ResultCache held
+by ``st.cache_resource`` is shared by every session in the server process.
+Entries are keyed by profile_key(), a canonical hash of the form inputs plus
+age, so repeated profiles (the default slider values, for example) skip the
+score math and figure building entirely.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def _normalize(value):
+    """Canonical JSON-safe form of one input value; 7, 7.0 and np.float64(7) all hash alike."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    try:
+        return round(float(value), 6)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def profile_key(inputs, age):
+    """SHA-256 hex digest of the form inputs and age, independent of dict order."""
+    canonical = {name: _normalize(value) for name, value in inputs.items()}
+    canonical["age"] = _normalize(age)
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Least-recently-used cache with an optional time-to-live per entry.
+
+    Parameters:
+    - max_entries (int): Entries kept before the least recently used is evicted.
+    - ttl_seconds (float or None): Entry lifetime; None keeps entries until evicted.
+    - clock (callable): Monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600.0, clock=time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for ``key``, computing and storing it on a miss.
+
+        ``compute`` runs outside the lock, so two sessions missing on the same
+        key at once may both compute it; the later result wins.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,263 @@
+"""Headless scoring core for the Holistic Well-Being Analyzer.
+
+Pure-Python calculation functions shared by the Streamlit page (doc.py),
+the batch tools and any worker that only needs the numbers. This module
+must stay free of Streamlit, Plotly, pandas and NumPy imports so that it is
+cheap to import and has no side effects.
+"""
+from datetime import datetime
+
+# Activity level -> TDEE multiplier, as offered in the form's activity selectbox.
+ACTIVITY_MAP = {
+    "Sedentary (Office job, little/no formal exercise)": 1.2,
+    "Lightly Active (Light exercise/sports 1-3 days/wk or active job)": 1.375,
+    "Moderately Active (Moderate exercise/sports 3-5 days/wk)": 1.55,
+    "Very Active (Intense exercise/sports 6-7 days/wk)": 1.725,
+    "Extra Active (Very intense exercise daily or highly physical job)": 1.9,
+}
+
+# Activity level -> grams of protein per kg body weight, used by calculate_protein_needs.
+PROTEIN_PER_KG = {
+    "Sedentary (Office job, little/no formal exercise)": 0.8,
+    "Lightly Active (Light exercise/sports 1-3 days/wk or active job)": 1.0,
+    "Moderately Active (Moderate exercise/sports 3-5 days/wk)": 1.2,
+    "Very Active (Intense exercise/sports 6-7 days/wk)": 1.5,
+    "Extra Active (Very intense exercise daily or highly physical job)": 1.8,
+}
+
+# Exercise intensity -> multiplier applied by calculate_exercise_score.
+INTENSITY_MULTIPLIERS = {"Light": 0.8, "Moderate": 1.0, "Vigorous": 1.2}
+
+# --- Calculation Functions ---
+def calculate_bmi(weight_kg, height_cm):
+    if not weight_kg or not height_cm or height_cm == 0: return None
+    height_m = height_cm / 100.0
+    try:
+        bmi = weight_kg / (height_m ** 2)
+        return round(bmi, 1) 
+    except ZeroDivisionError:
+        return None
+
+def calculate_bmr(weight_kg, height_cm, age, gender):
+    if not all([weight_kg, height_cm, age is not None, gender]): return None
+    try:
+        weight_kg, height_cm, age = float(weight_kg), float(height_cm), int(age)
+        if gender.lower() == 'male':
+            bmr = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
+        elif gender.lower() == 'female':
+            bmr = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
+        else: 
+             bmr_m = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
+             bmr_f = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
+             bmr = (bmr_m + bmr_f) / 2
+        return round(bmr)
+    except (TypeError, ValueError):
+        return None
+
+def calculate_tdee(bmr, activity_multiplier):
+    if bmr is None or activity_multiplier is None: return None
+    return round(bmr * activity_multiplier)
+
+def calculate_wthr_score(waist_cm, height_cm):
+    if not waist_cm or not height_cm or height_cm == 0: return 0.0
+    wthr_value = waist_cm / height_cm
+    if wthr_value <= 0.4: return 1.0
+    if wthr_value >= 0.6: return 0.0
+    return round((0.6 - wthr_value) / 0.2, 3)
+
+def calculate_dqs(fruit_veg, whole_grains, processed_foods):
+    term1_fruit_veg = min(1.0, fruit_veg / 8.0)
+    term2_whole_grains = whole_grains / 5.0
+    term3_processed = processed_foods / 5.0 
+    return round(min(1.0, (term1_fruit_veg + term2_whole_grains + term3_processed) / 3.0), 3)
+
+def calculate_hs(water_liters, weight_kg):
+    if not water_liters or not weight_kg or weight_kg == 0: return 0.0
+    target_water = weight_kg * 0.033
+    if target_water == 0: return 0.0
+    return round(min(1.0, water_liters / target_water), 3)
+
+def calculate_p_score(exercise_score, sqs, wthr_score, dqs, hs):
+    raw_p = (0.30 * exercise_score) + (0.25 * sqs) + (0.20 * wthr_score) + (0.20 * dqs) + (0.05 * hs)
+    return min(100.0, round(raw_p * 100, 1))
+
+def calculate_m_score(l_stress, a_focus, md_mindful, learn_hrs, purpose_score, screen_hrs):
+    stress_s = (10.0 - l_stress + 1.0) / 10.0
+    focus_s = min(1.0, a_focus / 6.0)
+    mindful_s = md_mindful / 7.0
+    pgs = (min(1.0, learn_hrs / 5.0) + (purpose_score / 10.0)) / 2.0
+    dws = max(0.0, (5.0 - screen_hrs) / 5.0)
+    raw_m = (0.25 * stress_s) + (0.20 * focus_s) + (0.20 * mindful_s) + (0.20 * pgs) + (0.15 * dws)
+    return min(100.0, round(raw_m * 100, 1))
+
+def calculate_e_score(c_social, i_interactions, sm_mood, resilience, gratitude, nature_hrs):
+    i_interactions_capped = min(float(i_interactions), 14.0) 
+    scs = ((c_social / 10.0) + (i_interactions_capped / 14.0)) / 2.0
+    mood_s = sm_mood / 10.0
+    rcs = resilience / 10.0
+    grat_s = gratitude / 7.0
+    nature_s = min(1.0, nature_hrs / 3.0)
+    raw_e = (0.25 * scs) + (0.20 * mood_s) + (0.25 * rcs) + (0.15 * grat_s) + (0.15 * nature_s)
+    return min(100.0, round(raw_e * 100, 1))
+
+def calculate_wbs(p, m, e):
+    return round((0.4 * p) + (0.3 * m) + (0.3 * e), 1)
+
+def get_wbs_interpretation(wbs_score):
+    if wbs_score is None: return "N/A", "Please complete all inputs to calculate your score.", "--subheader-color" 
+    if wbs_score >= 85:
+        return "Optimal", "Exceptional! Your well-being is thriving. Continue nurturing these positive habits.", "--success-color"
+    elif wbs_score >= 70:
+        return "Good", "You're doing well! Consider small tweaks in lower-scoring areas for even greater vitality.", "--info-color"
+    elif wbs_score >= 55:
+        return "Needs Improvement", "Your well-being shows potential for growth. Let's identify areas to focus on for a healthier you.", "--warning-color"
+    else:
+        return "At Risk", "Key areas of your well-being need attention. Small, consistent steps can lead to significant improvements.", "--danger-color"
+
+def get_age(dob_date_obj): 
+    if not dob_date_obj: return None
+    today = datetime.now().date()
+    return today.year - dob_date_obj.year - ((today.month, today.day) < (dob_date_obj.month, dob_date_obj.day))
+
+def get_expert_insight(sub_score_percentage, category_name, low_threshold=50, mid_threshold=75):
+    if sub_score_percentage < low_threshold:
+        return f"**🎯 Focus Area: {category_name}** - This significantly impacts your well-being. Try setting one small, achievable goal, like adding a 10-minute walk if it's exercise, or trying a 5-minute meditation for stress."
+    elif sub_score_percentage < mid_threshold:
+        return f"**🌱 Growth Opportunity: {category_name}** - You're on the right track! Consider how you might enhance this. For sleep, could you establish a more consistent bedtime? For diet, perhaps add one more serving of vegetables daily."
+    else:
+        return f"**👍 Strength Area: {category_name}** - Excellent work here! Reflect on what's working well and continue these positive habits. Can you inspire others with your approach to {category_name.lower()}?"
+
+# Function for Activity-Adjusted Protein Needs (simplified for prototype)
+def calculate_protein_needs(weight_kg, activity_level):
+    """
+    Calculates estimated daily protein needs in grams based on weight and activity.
+    Ranges are general guidelines based on common fitness recommendations.
+    """
+    if not weight_kg:
+        return None
+
+    # Grams of protein per kg body weight; anything unlisted counts as "Extra Active"
+    protein_per_kg = PROTEIN_PER_KG.get(activity_level, 1.8)
+
+    return round(weight_kg * protein_per_kg)
+
+# Function for Heart Rate Zones (simplified based on max heart rate formula)
+def get_heart_rate_zones(age):
+    """
+    Calculates estimated max heart rate and target zones for exercise.
+    Based on 220 - age for MHR.
+    """
+    if not age or age <= 0:
+        return None, None, None
+
+    mhr = 220 - age
+    # Common zones:
+    # Zone 2 (Moderate): 60-70% of MHR (Fat burning, aerobic base)
+    # Zone 3 (Aerobic): 70-80% of MHR (Improved cardiovascular fitness)
+    # Zone 4 (Threshold): 80-90% of MHR (High intensity, anaerobic threshold)
+    zone2_low = round(mhr * 0.60)
+    zone2_high = round(mhr * 0.70)
+    zone3_low = round(mhr * 0.70)
+    zone3_high = round(mhr * 0.80)
+    zone4_low = round(mhr * 0.80)
+    zone4_high = round(mhr * 0.90)
+
+    return f"{zone2_low}-{zone2_high}", f"{zone3_low}-{zone3_high}", f"{zone4_low}-{zone4_high}"
+
+# Function for Circadian Rhythm Alignment (qualitative for now)
+def calculate_circadian_alignment_score(wake_time, sleep_consistency_score):
+    """
+    Scores based on consistency and alignment with natural light cycles.
+    Higher score for consistent early wake-up and good sleep consistency.
+    """
+    score = 0
+    if wake_time:
+        wake_hour = wake_time.hour
+        # Ideal wake time is generally considered before 8 AM
+        if wake_hour >= 5 and wake_hour <= 7:
+            score += 0.5
+        elif wake_hour >= 8 and wake_hour <= 9:
+            score += 0.2
+            
+    score += (sleep_consistency_score / 10) * 0.5 # Scale 1-10 to 0-0.5
+    return round(score * 100, 1) # Return as percentage
+
+# Function to assess burnout risk (conceptual, based on stress, sleep, work focus)
+def calculate_burnout_risk(l_stress, sleep_h, a_focus_hours):
+    """
+    Estimates burnout risk based on stress, sleep duration, and focused work.
+    Higher stress, less sleep, and excessive focused work increase risk.
+    Scores 0-100, where higher is more risk.
+    """
+    stress_factor = (l_stress / 10.0) * 0.4 # More stress, higher factor
+    sleep_factor = (1.0 - (min(sleep_h, 8.0) / 8.0)) * 0.3 # Less sleep, higher factor (ideal 7-8 hrs)
+    work_factor = (max(0.0, a_focus_hours - 8.0) / 4.0) * 0.3 # Over 8 hrs focused work, increases factor
+
+    raw_risk = (stress_factor + sleep_factor + work_factor)
+    return min(100.0, round(raw_risk * 100, 1))
+
+# --- Enhance existing score functions for nuance ---
+def calculate_sqs(sleep_h, sleep_q, bedtime_consistency_score): # Added bedtime_consistency_score
+    term1_sleep_duration = min(1.0, sleep_h / 8.0) # Ideal 8 hours
+    term2_sleep_quality = sleep_q / 10.0
+    term3_consistency = bedtime_consistency_score / 10.0 # New factor
+    return round((term1_sleep_duration + term2_sleep_quality + term3_consistency) / 3.0, 3) # Average 3 terms
+
+def calculate_exercise_score(frequency_per_week, intensity_level):
+    """
+    Calculates an exercise score based on frequency and intensity.
+    Scores are normalized between 0 and 1.
+
+    Parameters:
+    - frequency_per_week (int): Number of days per week exercised (0-7).
+    - intensity_level (str): Intensity of exercise ("Light", "Moderate", "Vigorous").
+
+    Returns:
+    - float: Normalized exercise score (0.0 to 1.0).
+    """
+    score = 0.0
+
+    # Base score on frequency
+    if frequency_per_week == 0:
+        score = 0.0
+    elif frequency_per_week <= 2:
+        score = 0.3
+    elif frequency_per_week <= 4:
+        score = 0.6
+    elif frequency_per_week <= 6:
+        score = 0.85
+    else: # 7 days
+        score = 1.0
+
+    # Adjust score based on intensity (Vigorous can exceed 1.0 initially, capped below)
+    score *= INTENSITY_MULTIPLIERS.get(intensity_level, 1.0)
+
+    # Cap the score at 1.0 to ensure normalization
+    return min(1.0, score)
+
+# --- Expert Insight Refinement (more specific, multi-point advice) ---
+def get_expert_insight_detailed(sub_score_percentage, category_name, low_threshold=50, mid_threshold=75):
+    if sub_score_percentage < low_threshold:
+        return f"""
+        **🎯 Focus Area: {category_name}**
+        Your score suggests this area needs significant attention. Prioritize **one small, consistent change**:
+        * **Physical:** Start with a 15-minute walk daily, or swap one sugary drink for water.
+        * **Mental:** Try 5 minutes of mindful breathing, or limit social media before bed.
+        * **Emotional:** Reach out to one friend, or list 3 things you're grateful for each morning.
+        """
+    elif sub_score_percentage < mid_threshold:
+        return f"""
+        **🌱 Growth Opportunity: {category_name}**
+        You're building positive momentum! Let's elevate this area with a **next-level goal**:
+        * **Physical:** Aim for 30 minutes of moderate exercise 3-4 times/week, or add a daily serving of whole grains.
+        * **Mental:** Explore guided meditation apps, or dedicate specific "deep work" blocks for focus.
+        * **Emotional:** Plan regular social meet-ups, or journal about your emotions once a week.
+        """
+    else:
+        return f"""
+        **🌟 Strength Area: {category_name}**
+        Outstanding! You've cultivated strong habits here. To maintain and deepen this strength:
+        * **Physical:** Consider trying a new challenging workout, or explore advanced nutrition topics.
+        * **Mental:** Share your mindfulness practices with others, or delve into advanced learning.
+        * **Emotional:** Volunteer or mentor to further deepen your connections and sense of purpose.
+        """
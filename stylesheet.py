@@ -0,0 +1,245 @@
+"""Builds the page stylesheet once per process from the files in css/.
+
+The sources are concatenated in order, comments and whitespace are removed,
+declarations that a later rule with the same selector overrides are dropped,
+and same-selector rules are merged where nothing in between could be
+affected (the repeated ``:root`` variable blocks, for example). The result
+goes out as one style-only ``st.html`` element per run; Streamlit's message
+cache sends elements of ``global.minCachedMessageSize`` bytes or more (10 kB
+by default) only once per session and a short hash reference on reruns.
+
+    python stylesheet.py    # prints the per-delta byte report
+
+Overriding assumes every browser understands every value, i.e. the sources
+carry no same-selector fallback declarations for older browsers.
+"""
+import os
+import re
+from functools import lru_cache
+
+CSS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "css")
+
+# Cascade order: later files win over earlier ones.
+SOURCES = ("base.css", "results.css")
+
+
+# --- Parsing ---
+def _strip_comments(css):
+    """Removes /* ... */ comments, leaving quoted strings intact."""
+    out = []
+    i, n = 0, len(css)
+    while i < n:
+        char = css[i]
+        if char in "\"'":
+            end = i + 1
+            while end < n and css[end] != char:
+                end += 2 if css[end] == "\\" else 1
+            out.append(css[i:end + 1])
+            i = end + 1
+        elif css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _split_outside(text, separator):
+    """Splits on ``separator`` outside quotes, parentheses and brackets."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _outside_strings(text, transform):
+    """Applies ``transform`` to the parts of ``text`` that are not quoted strings."""
+    pieces = re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", text)
+    return "".join(piece if i % 2 else transform(piece) for i, piece in enumerate(pieces))
+
+
+def _minify_selector(selector):
+    def squeeze(part):
+        part = re.sub(r"\s+", " ", part)
+        return re.sub(r"\s*([>+~,])\s*", r"\1", part)
+    return _outside_strings(selector.strip(), squeeze)
+
+
+def _minify_value(value):
+    def squeeze(part):
+        part = re.sub(r"\s+", " ", part)
+        return re.sub(r"\s*,\s*", ",", part)
+    return _outside_strings(value.strip(), squeeze)
+
+
+def _parse(css):
+    """Top-level items: ("rule", selector, [(prop, value, important), ...]) or ("at", text)."""
+    items = []
+    i, n = 0, len(css)
+    while i < n:
+        brace = css.find("{", i)
+        semicolon = css.find(";", i)
+        if brace < 0:
+            break
+        prelude = css[i:brace].strip()
+        if prelude.startswith("@") and 0 <= semicolon < brace:  # @import/@charset
+            items.append(("at", _minify_value(css[i:semicolon]) + ";"))
+            i = semicolon + 1
+            continue
+        depth, end = 0, brace
+        while end < n:
+            if css[end] == "{":
+                depth += 1
+            elif css[end] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        body = css[brace + 1:end]
+        if prelude.startswith("@"):
+            # @media/@keyframes/...: kept as-is apart from whitespace, never merged across.
+            items.append(("at", _minify_value(prelude) + "{" + minify(body) + "}"))
+        elif prelude:
+            declarations = []
+            for declaration in _split_outside(body, ";"):
+                prop, sep, value = declaration.partition(":")
+                if not sep or not prop.strip():
+                    continue
+                value = _minify_value(value)
+                important = value.lower().endswith("!important")
+                if important:
+                    value = value[:-len("!important")].rstrip(" !")
+                declarations.append((prop.strip().lower(), value, important))
+            items.append(("rule", _minify_selector(prelude), declarations))
+        i = end + 1
+    return items
+
+
+# --- Deduplication ---
+def _dedupe(items):
+    """Drops overridden declarations and merges same-selector rules in place."""
+    for i, item in enumerate(items):
+        if item[0] != "rule":
+            continue
+        selector, declarations = item[1], item[2]
+
+        # Exact repeats inside one rule; the last copy is the one that counts.
+        kept = []
+        for declaration in reversed(declarations):
+            if declaration not in kept:
+                kept.append(declaration)
+        declarations[:] = kept[::-1]
+
+        later = [other for other in items[i + 1:] if other[0] == "rule" and other[1] == selector]
+        if not later:
+            continue
+        # Same selector means same specificity, so a later declaration of the
+        # same property wins unless only the earlier one is !important.
+        overridden = {}
+        for other in later:
+            for prop, _, important in other[2]:
+                overridden[prop] = overridden.get(prop, False) or important
+        declarations[:] = [d for d in declarations if not (d[0] in overridden and overridden[d[0]] >= d[2])]
+
+        # Move what is left into the next same-selector rule when no rule in
+        # between touches those properties, so the cascade is unchanged.
+        target = items.index(later[0], i + 1)
+        props = {d[0] for d in declarations}
+        between = items[i + 1:target]
+        if all(other[0] == "rule" and not props & {d[0] for d in other[2]} for other in between):
+            later[0][2][:0] = declarations
+            declarations.clear()
+    return [item for item in items if item[0] == "at" or item[2]]
+
+
+def _serialize(items):
+    out = []
+    for item in items:
+        if item[0] == "at":
+            out.append(item[1])
+        else:
+            body = ";".join(f"{prop}:{value}{'!important' if important else ''}" for prop, value, important in item[2])
+            out.append(f"{item[1]}{{{body}}}")
+    return "".join(out)
+
+
+def minify(css):
+    """Minified, deduplicated form of a stylesheet string."""
+    return _serialize(_dedupe(_parse(_strip_comments(css))))
+
+
+# --- Page stylesheet ---
+def read_sources(names=SOURCES):
+    sources = []
+    for name in names:
+        with open(os.path.join(CSS_DIR, name), encoding="utf-8") as f:
+            sources.append(f.read())
+    return sources
+
+
+@lru_cache(maxsize=None)
+def page_css():
+    """The merged stylesheet for the app, built once per process."""
+    return minify("\n".join(read_sources()))
+
+
+def inject():
+    """Adds the page stylesheet to the current run as a style-only element."""
+    import streamlit as st
+    st.html(f"<style>{page_css()}</style>")
+
+
+# --- Delta size report ---
+def _delta_bytes(element, body):
+    """Bytes of one new-element delta on the first run and on later reruns of a session."""
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+
+    msg = ForwardMsg()
+    msg.metadata.delta_path[:] = [0, 0]
+    proto = getattr(msg.delta.new_element, element)
+    proto.body = body
+    if element == "markdown":
+        proto.allow_html = True
+    populate_hash_if_needed(msg)
+    first = msg.ByteSize()
+    rerun = create_reference_msg(msg).ByteSize() if msg.metadata.cacheable else first
+    return first, rerun
+
+
+def delta_report():
+    """
+    Compares the CSS cost per websocket delta of the old inline blocks with the merged sheet.
+
+    Returns:
+    - dict: "before" and "after" lists of (label, first_run_bytes, rerun_bytes).
+    """
+    before = [
+        (f"st.markdown block {i + 1} ({name})", *_delta_bytes("markdown", f"\n<style>\n{source}</style>\n"))
+        for i, (name, source) in enumerate(zip(SOURCES, read_sources()))
+    ]
+    after = [("st.html merged sheet", *_delta_bytes("html", f"<style>{page_css()}</style>"))]
+    return {"before": before, "after": after}
+
+
+if __name__ == "__main__":
+    report = delta_report()
+    for label in ("before", "after"):
+        rows = report[label]
+        print(f"{label}:")
+        for name, first, rerun in rows:
+            print(f"  {name:<40} first run {first:>7,} B  rerun {rerun:>7,} B")
+        print(f"  {'total':<40} first run {sum(r[1] for r in rows):>7,} B  rerun {sum(r[2] for r in rows):>7,} B")
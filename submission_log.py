@@ -0,0 +1,221 @@
+"""Append-only binary log of every scored submission, for fast full-history scans.
+
+The file is a fixed HEADER_SIZE header followed by one LOG_DTYPE row per
+submission: its recorded_at time plus a records.RECORD_DTYPE row. Rows are
+only ever appended, never rewritten, so readers memory-map the file and get
+zero-copy NumPy views: ``log.rows()["wbs"].mean()`` streams straight from
+the page cache without parsing a thing.
+
+The header holds the magic, the row layout (a log written with another
+layout refuses to open) and a time index: the recorded_at of the first row
+of every block of BLOCK_ROWS rows. recorded_at never decreases (the writer
+clamps it to the last row's), so rows(since=..., until=...) finds a time
+range by bisecting the index and then a single block, touching a few pages
+however long the log is.
+
+Appends are whole rows written under a lock (and an flock across processes
+where fcntl exists); a torn row left by a crash is ignored by readers and
+overwritten by the next append.
+
+    log = SubmissionLog("wellbeing_submissions.log")
+    log.record(form_inputs)                           # scores and appends one submission
+    recent = log.rows(since=datetime.now() - timedelta(days=30))
+    recent["wbs"].mean(), np.bincount(recent["gender"])
+"""
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from batch import SUBMISSION_COLUMNS, score_submissions
+from records import RECORD_DTYPE, from_columns
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+LOG_DTYPE = np.dtype([("recorded_at", "<f8")] + RECORD_DTYPE.descr)
+
+MAGIC = b"WBSLOG01"
+HEADER_SIZE = 65536
+BLOCK_ROWS = 65536
+
+# Header: magic, header size, block rows, layout length, layout JSON; the index starts at _INDEX_OFFSET.
+_HEADER = struct.Struct("<8sIII")
+_INDEX_OFFSET = 4096
+INDEX_CAPACITY = (HEADER_SIZE - _INDEX_OFFSET) // 8
+
+
+def _timestamp(value):
+    """Unix seconds for a datetime or a number."""
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _layout_json():
+    return json.dumps(LOG_DTYPE.descr).encode("utf-8")
+
+
+def _new_header():
+    layout = _layout_json()
+    header = bytearray(HEADER_SIZE)
+    header[:_HEADER.size] = _HEADER.pack(MAGIC, HEADER_SIZE, BLOCK_ROWS, len(layout))
+    header[_HEADER.size:_HEADER.size + len(layout)] = layout
+    header[_INDEX_OFFSET:] = np.full(INDEX_CAPACITY, np.inf, dtype="<f8").tobytes()
+    return bytes(header)
+
+
+class SubmissionLog:
+    """
+    One append-only log file, shared by every session and process that opens it.
+
+    Parameters:
+    - path (str): Log file; created with an empty header if missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path):
+            self._create()
+        self._file = open(path, "r+b")
+        self._lock = threading.Lock()
+        self._map, self._map_rows = None, 0
+        self._check_header()
+
+    def _create(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_new_header())
+        try:
+            os.link(tmp_path, self.path)  # atomic, and never replaces a log another process just created
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def _check_header(self):
+        self._file.seek(0)
+        header = self._file.read(_INDEX_OFFSET)
+        magic, header_size, block_rows, layout_length = _HEADER.unpack_from(header)
+        if magic != MAGIC or header_size != HEADER_SIZE or block_rows != BLOCK_ROWS:
+            raise ValueError(f"{self.path} is not a submission log")
+        if header[_HEADER.size:_HEADER.size + layout_length] != _layout_json():
+            raise ValueError(f"{self.path} was written with a different record layout")
+
+    def close(self):
+        with self._lock:
+            self._map = None
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __len__(self):
+        return max(0, os.path.getsize(self.path) - HEADER_SIZE) // LOG_DTYPE.itemsize
+
+    # --- Writing ---
+    @contextmanager
+    def _exclusive(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def append(self, rows, recorded_at=None):
+        """
+        Appends RECORD_DTYPE rows (see records.from_columns()).
+
+        Parameters:
+        - rows (ndarray): RECORD_DTYPE rows.
+        - recorded_at (float, datetime or array): Unix time per row (an array of
+          floats), or one for all of them (default: now). Times earlier than
+          the last logged one are raised to it.
+
+        Returns:
+        - int: Row number of the first appended row.
+        """
+        rows = np.asarray(rows, dtype=RECORD_DTYPE).reshape(-1)
+        out = np.empty(len(rows), dtype=LOG_DTYPE)
+        for name in RECORD_DTYPE.names:
+            out[name] = rows[name]
+        recorded_at = time.time() if recorded_at is None else recorded_at
+        times = _timestamp(recorded_at) if isinstance(recorded_at, datetime) else np.asarray(recorded_at, dtype=float)
+        times = np.broadcast_to(times, len(rows))
+        with self._exclusive():
+            start = len(self)
+            first_block, end_block = -(-start // BLOCK_ROWS), -(-(start + len(rows)) // BLOCK_ROWS)
+            if end_block > INDEX_CAPACITY:
+                raise OverflowError(f"{self.path} is full ({INDEX_CAPACITY * BLOCK_ROWS} rows)")
+            last = self._read_time(start - 1) if start else -np.inf
+            out["recorded_at"] = np.maximum.accumulate(np.maximum(times, last))
+            self._file.seek(HEADER_SIZE + start * LOG_DTYPE.itemsize)
+            self._file.write(out.tobytes())
+            self._file.truncate()  # drops a torn row a crashed writer may have left
+            for block in range(first_block, end_block):
+                self._file.seek(_INDEX_OFFSET + block * 8)
+                self._file.write(struct.pack("<d", out["recorded_at"][block * BLOCK_ROWS - start]))
+            self._file.flush()
+        return start
+
+    def record(self, inputs, recorded_at=None, today=None):
+        """Scores one submission (a dict over batch.SUBMISSION_COLUMNS; "age" may replace "dob") and appends it."""
+        columns = {name: [inputs[name]] for name in SUBMISSION_COLUMNS + ("age",) if name in inputs}
+        return self.append(from_columns(columns, score_submissions(columns, today=today)), recorded_at)
+
+    def _read_time(self, row):
+        self._file.seek(HEADER_SIZE + row * LOG_DTYPE.itemsize)
+        return struct.unpack("<d", self._file.read(8))[0]
+
+    # --- Reading ---
+    def rows(self, since=None, until=None):
+        """
+        Zero-copy view of the logged rows, optionally limited to a time range.
+
+        Parameters:
+        - since, until (datetime or float): Keep rows with since <= recorded_at < until.
+
+        Returns:
+        - ndarray: LOG_DTYPE rows backed by the memory-mapped file (read-only).
+        """
+        data = self._mapped()
+        start = 0 if since is None else self._seek(data, _timestamp(since))
+        stop = len(data) if until is None else self._seek(data, _timestamp(until))
+        return data[start:max(start, stop)]
+
+    def _mapped(self):
+        """A read-only map of every whole row, remapped when the log has grown."""
+        count = len(self)
+        with self._lock:
+            if self._map is None or count != self._map_rows:
+                self._map = (np.memmap(self.path, dtype=LOG_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+                             if count else np.empty(0, dtype=LOG_DTYPE))
+                self._map_rows = count
+            return self._map
+
+    def block_index(self, count=None):
+        """recorded_at of the first row of every block holding rows (from the header, filled in if mid-append)."""
+        count = len(self) if count is None else count
+        blocks = -(-count // BLOCK_ROWS)
+        index = np.fromfile(self.path, dtype="<f8", count=blocks, offset=_INDEX_OFFSET)
+        pending = np.flatnonzero(np.isinf(index))
+        if len(pending):
+            index[pending] = self._mapped()["recorded_at"][pending * BLOCK_ROWS]
+        return index
+
+    def _seek(self, data, timestamp):
+        """First row number with recorded_at >= timestamp."""
+        index = self.block_index(len(data))
+        block = int(np.searchsorted(index, timestamp, side="left")) - 1
+        if block < 0:
+            return 0
+        start = block * BLOCK_ROWS
+        times = data["recorded_at"][start:start + BLOCK_ROWS]
+        return start + int(np.searchsorted(times, timestamp, side="left"))
@@ -0,0 +1,59 @@
+"""WBS response surface over two inputs, the rest held at the user's answers.
+
+wbs_surface() lays every value of input ``x`` against every value of input
+``y`` (from fields.FIELDS), broadcasts the pair into one flat batch with the
+other inputs repeated, scores it in a single batch.score_batch() call and
+reshapes the WBS back into a grid. Inputs with more than MAX_AXIS_POINTS
+slider positions (weight in 0.1 kg steps, say) are sampled evenly along
+their range, so a grid never exceeds MAX_AXIS_POINTS ** 2 rows.
+
+surface_key() identifies a surface by the input pair and a hash of the
+other inputs, for caching in a result_cache.ResultCache.
+"""
+import numpy as np
+
+from batch import INPUT_COLUMNS, score_batch
+from fields import FIELDS, domain
+from result_cache import profile_key
+
+MAX_AXIS_POINTS = 121
+
+
+def axis_values(name, max_points=MAX_AXIS_POINTS):
+    """The slider positions of ``name``, evenly thinned to at most ``max_points``."""
+    values = domain(name)
+    if len(values) <= max_points:
+        return values
+    keep = np.unique(np.round(np.linspace(0, len(values) - 1, max_points)).astype(int))
+    return [values[i] for i in keep]
+
+
+def surface_key(inputs, x, y):
+    """Cache key of a surface: the pair plus a hash of every other input."""
+    fixed = {name: value for name, value in inputs.items() if name in INPUT_COLUMNS and name not in (x, y)}
+    return f"{x}|{y}|{profile_key(fixed, None)}"
+
+
+def wbs_surface(inputs, x, y, max_points=MAX_AXIS_POINTS):
+    """
+    WBS for every combination of two inputs.
+
+    Parameters:
+    - inputs (dict): A form submission with every name in batch.INPUT_COLUMNS.
+    - x, y (str): The two input names, both in fields.FIELDS and different.
+    - max_points (int): Most values per axis.
+
+    Returns:
+    - tuple: (x values, y values, WBS rows as nested lists, one row per y value).
+    """
+    if x == y:
+        raise ValueError("wbs_surface needs two different inputs")
+    x_values, y_values = axis_values(x, max_points), axis_values(y, max_points)
+    x_grid = np.asarray(x_values, dtype=object)[None, :]
+    y_grid = np.asarray(y_values, dtype=object)[:, None]
+    shape = (len(y_values), len(x_values))
+    columns = {name: np.broadcast_to(np.asarray(inputs[name], dtype=object), shape) for name in INPUT_COLUMNS}
+    columns[x] = np.broadcast_to(x_grid, shape)
+    columns[y] = np.broadcast_to(y_grid, shape)
+    wbs = score_batch({name: column.ravel() for name, column in columns.items()})["wbs"]
+    return x_values, y_values, wbs.reshape(shape).tolist()
@@ -0,0 +1,37 @@
+"""validate_profile() accepts only values the page's form can produce."""
+import pytest
+
+from api import validate_profile
+from fields import FIELDS, GENDERS
+from scoring import ACTIVITY_MAP
+
+
+def _profile(**changes):
+    profile = {name: field.options[0] if field.options else field.low for name, field in FIELDS.items()}
+    profile.update(gender=GENDERS[0], activity_str=next(iter(ACTIVITY_MAP)), age=35)
+    profile.update(changes)
+    return profile
+
+
+def _errors(profile):
+    return {error["field"]: error["message"] for error in validate_profile(profile)[1]}
+
+
+def test_form_values_are_valid():
+    assert _errors(_profile()) == {}
+    assert _errors(_profile(age=35.0)) == {}
+
+
+@pytest.mark.parametrize("age", (35.5, 0.1, 129.99))
+def test_fractional_age_is_rejected(age):
+    assert _errors(_profile(age=age)) == {"age": "must be a whole number"}
+
+
+@pytest.mark.parametrize("age", (-1, 131, "35", None))
+def test_age_out_of_range_or_not_a_number(age):
+    assert _errors(_profile(age=age)) == {"age": "must be a number between 0 and 130"}
+
+
+def test_off_step_values_are_rejected():
+    assert _errors(_profile(sleep_q=7.3)) == {"sleep_q": "must be a whole number"}
+    assert _errors(_profile(sleep_h=7.3)) == {"sleep_h": "must be in steps of 0.5"}
@@ -0,0 +1,63 @@
+"""The trend chart sends at most TREND_MAX_POINTS points to the browser, however long the history."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from charts import TREND_MAX_POINTS, create_time_series_chart
+from downsample import downsample
+
+LENGTHS = (1, 2, 3, TREND_MAX_POINTS, TREND_MAX_POINTS + 1, 200_000)
+METHODS = ("lttb", "minmax", None)
+
+
+def _history(n, seed=0):
+    """``n`` daily-ish submissions with noise and a few spikes and dips."""
+    rng = np.random.default_rng(seed)
+    dates = [datetime(2020, 1, 1) + timedelta(hours=6 * i) for i in range(n)]
+    scores = np.clip(60 + 10 * np.sin(np.arange(n) / 50) + rng.normal(0, 3, n), 0, 100)
+    if n > 10:
+        scores[rng.integers(n, size=3)] = [99.5, 1.5, 97.0]
+    return dates, scores.tolist()
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("n", LENGTHS)
+def test_trend_chart_point_count_is_bounded(n, method):
+    dates, scores = _history(n)
+    trace = create_time_series_chart(dates, scores, method=method)["data"][0]
+    assert len(trace["x"]) <= TREND_MAX_POINTS
+    assert len(trace["x"]) == len(trace["y"])
+    assert trace["x"] == sorted(trace["x"])
+    if n <= TREND_MAX_POINTS:
+        assert trace["x"] == dates and trace["y"] == scores
+    assert trace["x"][-1] == dates[-1]
+
+
+@pytest.mark.parametrize("method", ("lttb", "minmax"))
+@pytest.mark.parametrize("n", LENGTHS)
+def test_downsampling_keeps_the_ends(n, method):
+    dates, scores = _history(n)
+    trace = create_time_series_chart(dates, scores, method=method)["data"][0]
+    assert trace["x"][0] == dates[0]
+    assert trace["y"][0] == scores[0] and trace["y"][-1] == scores[-1]
+
+
+@pytest.mark.parametrize("n", LENGTHS)
+def test_minmax_keeps_the_global_extremes(n):
+    dates, scores = _history(n)
+    trace = create_time_series_chart(dates, scores, method="minmax")["data"][0]
+    assert min(trace["y"]) == min(scores)
+    assert max(trace["y"]) == max(scores)
+
+
+@pytest.mark.parametrize("n", LENGTHS)
+def test_downsample_without_method_keeps_every_point(n):
+    dates, scores = _history(n)
+    assert downsample(dates, scores, TREND_MAX_POINTS, method=None) == (dates, scores)
+
+
+def test_downsample_rejects_unknown_method():
+    dates, scores = _history(TREND_MAX_POINTS + 1)
+    with pytest.raises(ValueError):
+        downsample(dates, scores, TREND_MAX_POINTS, method="mean")
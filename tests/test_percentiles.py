@@ -0,0 +1,35 @@
+"""Sketch counts persist per process file and survive a restart that gets the same PID."""
+from pathlib import Path
+
+from percentiles import ALL_USERS, PercentileService, cohort_key
+
+
+def _record(service, scores):
+    for score in scores:
+        service.record({"wbs": score}, age=34, gender="Female")
+
+
+def test_reopening_with_the_same_pid_keeps_the_counts(tmp_path):
+    service = PercentileService(str(tmp_path))
+    _record(service, [float(score) for score in range(50)])
+    service.flush()
+
+    reopened = PercentileService(str(tmp_path))  # same host and PID, so the same file
+    assert reopened.percentile("wbs", 25.0) == service.percentile("wbs", 25.0)
+    assert reopened.percentile("wbs", 25.0, cohort_key(34, "Female"))[1] == 50
+
+    _record(reopened, [99.0])
+    reopened.flush()
+    assert PercentileService(str(tmp_path)).percentile("wbs", 25.0)[1] == 51
+
+
+def test_other_process_files_are_merged_not_adopted(tmp_path):
+    other = PercentileService(str(tmp_path))
+    _record(other, [10.0, 20.0])
+    other.flush()
+    (tmp_path / "sketch-otherhost-1.json").write_text(Path(other._own_path).read_text())
+
+    service = PercentileService(str(tmp_path))
+    assert service.percentile("wbs", 15.0, ALL_USERS) == (50.0, 4)
+    service.flush()
+    assert PercentileService(str(tmp_path)).percentile("wbs", 15.0)[1] == 4
@@ -0,0 +1,36 @@
+"""ProfileRecord <-> RECORD_DTYPE round trips, including the results left unset."""
+from dataclasses import replace
+from datetime import date
+
+import numpy as np
+
+from fields import FIELDS, GENDERS
+from records import ANALYSIS_COLUMNS, ProfileRecord, from_array, to_array
+from scoring import ACTIVITY_MAP
+
+
+def _unscored(**changes):
+    inputs = {name: field.options[0] if field.options else field.low for name, field in FIELDS.items()}
+    inputs.update(gender=GENDERS[0], activity_str=next(iter(ACTIVITY_MAP)))
+    return replace(ProfileRecord(**inputs), **changes)
+
+
+def test_unscored_record_reads_back_with_none_results():
+    record = _unscored()
+    (back,) = from_array(to_array([record]))
+    assert back == replace(record, level="N/A")  # level is rebuilt from the (missing) WBS
+    assert all(getattr(back, name) is None for name in ANALYSIS_COLUMNS if name != "level")
+
+
+def test_partly_scored_record_keeps_its_numbers_and_its_gaps():
+    record = _unscored(dob=date(1990, 5, 17), age=35.0, bmi=22.9, wbs=62.5, sleep_q=None)
+    (back,) = from_array(to_array([record]))
+    assert (back.age, back.bmi, back.wbs, back.dob) == (35.0, 22.9, 62.5, date(1990, 5, 17))
+    assert back.sleep_q is None and back.tdee is None and back.p_score is None
+    assert back.level is not None and back.zone2 is not None
+
+
+def test_nan_results_are_not_left_as_nan():
+    rows = to_array([_unscored(), _unscored(wbs=70.0)])
+    assert np.isnan(rows["wbs"][0])
+    assert [record.wbs for record in from_array(rows)] == [None, 70.0]
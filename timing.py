@@ -0,0 +1,136 @@
+"""Per-stage wall-clock timing for the analysis run.
+
+Wrap each stage in ``with timer.stage("name"):``. While the timer is enabled,
+every stage keeps a rolling window of its most recent durations in process,
+from which snapshot() reports percentiles; to_json() and to_prometheus()
+export the same numbers as a JSON log line or as Prometheus text exposition
+(a summary per stage). When disabled, stage() returns one shared no-op
+context manager, so instrumented code costs an attribute check per stage.
+
+The page's timer is ``TIMER``, enabled by WELLBEING_TIMING=1. doc.py then
+logs to_json() after every analysis (logger "wellbeing.timing"), rewrites
+the file named by WELLBEING_TIMING_PROM_FILE if set, and shows the
+Prometheus snapshot in the sidebar.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_DISABLED = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.observe(self.name, time.perf_counter() - self.start)
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of an already sorted, non-empty list."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class StageTimer:
+    """
+    Rolling per-stage duration windows.
+
+    Parameters:
+    - enabled (bool): When False, stage() and observe() do nothing.
+    - window (int): Most recent durations kept per stage for the percentiles.
+    """
+
+    def __init__(self, enabled=True, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}  # name -> deque of seconds
+        self._counts = {}  # name -> (count, total seconds), over the whole process lifetime
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager that records the wall time of its block under ``name``."""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            count, total = self._counts.get(name, (0, 0.0))
+            self._counts[name] = (count + 1, total + seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def snapshot(self):
+        """
+        Percentiles of the rolling window per stage, in milliseconds.
+
+        Returns:
+        - dict: stage -> {"count", "total_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}.
+        """
+        with self._lock:
+            windows = {name: sorted(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        stats = {}
+        for name, ordered in windows.items():
+            count, total = counts[name]
+            entry = {"count": count, "total_ms": total * 1000}
+            for q in QUANTILES:
+                entry[f"p{round(q * 100)}_ms"] = _quantile(ordered, q) * 1000
+            entry["max_ms"] = ordered[-1] * 1000
+            stats[name] = entry
+        return stats
+
+    def to_json(self):
+        """One-line JSON log record of snapshot()."""
+        return json.dumps({"event": "stage_timings", "time": time.time(), "stages": self.snapshot()}, sort_keys=True)
+
+    def to_prometheus(self, metric="wellbeing_stage_seconds"):
+        """Prometheus text exposition: one summary (quantiles, _sum, _count) per stage."""
+        with self._lock:
+            windows = {name: sorted(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        lines = [
+            f"# HELP {metric} Wall time of each analysis stage (rolling window quantiles).",
+            f"# TYPE {metric} summary",
+        ]
+        for name in sorted(windows):
+            ordered = windows[name]
+            for q in QUANTILES:
+                lines.append(f'{metric}{{stage="{name}",quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            count, total = counts[name]
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, metric="wellbeing_stage_seconds"):
+        """Atomically writes to_prometheus() to ``path`` (for a node_exporter textfile collector)."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # one per writer, so none replaces a half-written file
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(metric))
+        os.replace(tmp_path, path)
+
+
+TIMER = StageTimer(enabled=os.environ.get("WELLBEING_TIMING", "") not in ("", "0"))
@@ -0,0 +1,64 @@
+"""What-if analysis: how the WBS responds to changing one form input.
+
+sensitivity() moves every input in fields.FIELDS one widget step down and
+one step up, scores the base submission and all of those variants in a
+single batch.score_batch() call, and ranks the inputs by how much the best
+of their two moves raises the WBS.
+
+    levers = sensitivity(form_inputs)
+    levers[0]   # Lever(name="sleep_h", label="Sleep hours/night", current=6.5, suggested=7.0, wbs_gain=1.1, ...)
+"""
+from collections import namedtuple
+
+from batch import INPUT_COLUMNS, score_batch
+from fields import FIELDS, step_value
+
+Lever = namedtuple("Lever", "name label current suggested wbs_gain pillar_gains habit")
+
+_PILLARS = ("p_score", "m_score", "e_score")
+
+
+def variants(inputs, moves=(-1, 1)):
+    """
+    Columns for score_batch(): row 0 is ``inputs``, then one row per (field, move) that changes the value.
+
+    Returns:
+    - tuple: (columns dict, list of (name, new value) for rows 1..n).
+    """
+    changes = []
+    for name in FIELDS:
+        for steps in moves:
+            value = step_value(name, inputs[name], steps)
+            if value != inputs[name]:
+                changes.append((name, value))
+    columns = {}
+    for column in INPUT_COLUMNS:
+        values = [inputs[column]] * (len(changes) + 1)
+        for row, (name, value) in enumerate(changes, start=1):
+            if name == column:
+                values[row] = value
+        columns[column] = values
+    return columns, changes
+
+
+def sensitivity(inputs):
+    """
+    Ranks the form inputs by the WBS gain of their best one-step change.
+
+    Parameters:
+    - inputs (dict): A form submission with every name in batch.INPUT_COLUMNS.
+
+    Returns:
+    - list: Lever tuples, best gain first; inputs whose every move lowers or
+      keeps the WBS are included with their least harmful move.
+    """
+    columns, changes = variants(inputs)
+    scores = score_batch(columns)
+    wbs = scores["wbs"]
+    best = {}
+    for row, (name, value) in enumerate(changes, start=1):
+        gain = round(float(wbs[row] - wbs[0]), 1)
+        if name not in best or gain > best[name].wbs_gain:
+            pillar_gains = {p: round(float(scores[p][row] - scores[p][0]), 1) for p in _PILLARS}
+            best[name] = Lever(name, FIELDS[name].label, inputs[name], value, gain, pillar_gains, FIELDS[name].habit)
+    return sorted(best.values(), key=lambda lever: (-lever.wbs_gain, lever.name))